@@ -20,6 +20,7 @@ class ConfigLoader:
         """
         self.config_path = Path(config_path)
         self.config: Dict[str, Any] = {}
+        self._api_client = None  # Shared APIClient, created on first API use
         # Load .env file - try current directory and parent directories
         env_loaded = load_dotenv()
         if not env_loaded:
@@ -30,6 +31,17 @@ class ConfigLoader:
                 load_dotenv(env_path)
         self._load_config()
     
+    def _get_api_client(self):
+        """
+        APIClient shared by every API lookup of this loader.
+        
+        Callers put src on sys.path first (utils.api_client is imported lazily).
+        """
+        if self._api_client is None:
+            from utils.api_client import APIClient
+            self._api_client = APIClient()
+        return self._api_client
+    
     def _load_config(self) -> None:
         """Load configuration from YAML file."""
         if not self.config_path.exists():
@@ -62,9 +74,7 @@ class ConfigLoader:
                 src_path = Path(__file__).parent.parent / 'src'
                 if str(src_path) not in sys.path:
                     sys.path.insert(0, str(src_path))
-                from utils.api_client import APIClient
-                api_client = APIClient()
-                credentials = api_client.get_mt5_credentials(user_id, mt5_account_id)
+                credentials = self._get_api_client().get_mt5_credentials(user_id, mt5_account_id)
                 
                 if credentials:
                     return {
@@ -200,9 +210,7 @@ class ConfigLoader:
                 src_path = Path(__file__).parent.parent / 'src'
                 if str(src_path) not in sys.path:
                     sys.path.insert(0, str(src_path))
-                from utils.api_client import APIClient
-                api_client = APIClient()
-                credentials = api_client.get_mt5_credentials(user_id, None)  # Get active account
+                credentials = self._get_api_client().get_mt5_credentials(user_id, None)  # Get active account
                 if credentials:
                     mt5_account_id = credentials.get('mt5_account_id')
             except Exception as e:
@@ -10,6 +10,20 @@ from typing import List, Dict, Any, Optional
 from uuid import uuid4
 from ..utils.types import Signal, Trade
 
+# orjson is optional: C-accelerated JSON encoding for jsonb parameters
+try:
+    import orjson
+
+    def _to_json(value: Any) -> str:
+        """Serialize a value for a %s::jsonb parameter."""
+        return orjson.dumps(value).decode('utf-8')
+except ImportError:
+    import json
+
+    def _to_json(value: Any) -> str:
+        """Serialize a value for a %s::jsonb parameter."""
+        return json.dumps(value, separators=(',', ':'))
+
 
 class Database:
     """PostgreSQL database operations for trade history and analytics with connection pooling."""
@@ -258,7 +272,7 @@ class Database:
                         trade.pnl,
                         trade.exit_reason,
                         int(trade.hold_time_seconds) if trade.hold_time_seconds else None,
-                        partial_exits,
+                        _to_json(partial_exits),
                         trade.lot_size,
                         trade.ticket,
                         self.user_id,
@@ -291,7 +305,7 @@ class Database:
                         trade.pnl,
                         trade.exit_reason,
                         int(trade.hold_time_seconds) if trade.hold_time_seconds else None,
-                        partial_exits
+                        _to_json(partial_exits)
                     ))
                 conn.commit()
         except Exception as e:
@@ -372,7 +386,7 @@ class Database:
                     SET partial_exits = %s::jsonb, lot_size = %s
                     WHERE ticket = %s AND user_id = %s AND mt5_account_id = %s
                 """, (
-                    existing_partial_exits,
+                    _to_json(existing_partial_exits),
                     remaining_lots,
                     ticket,
                     self.user_id,
@@ -548,6 +562,47 @@ class Database:
         finally:
             self._return_connection(conn)
     
+    def get_status_snapshot(self, recent_signals_limit: int = 5,
+                            trade_history_limit: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Get recent signals and trade history in one connection checkout.
+        
+        Equivalent to get_recent_signals() + get_trade_history(), but both
+        queries run back to back on the same pooled connection and cursor.
+        
+        Args:
+            recent_signals_limit: Number of signals to retrieve
+            trade_history_limit: Number of closed trades to retrieve
+        
+        Returns:
+            Dictionary with 'recent_signals' and 'trade_history' lists
+        """
+        conn = self._get_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM app.trading_signals 
+                    WHERE user_id = %s AND mt5_account_id = %s
+                    ORDER BY timestamp DESC 
+                    LIMIT %s
+                """, (self.user_id, self.mt5_account_id, recent_signals_limit))
+                recent_signals = [dict(row) for row in cursor.fetchall()]
+                
+                cursor.execute("""
+                    SELECT * FROM app.trades 
+                    WHERE user_id = %s AND mt5_account_id = %s 
+                      AND exit_time IS NOT NULL
+                    ORDER BY exit_time DESC 
+                    LIMIT %s
+                """, (self.user_id, self.mt5_account_id, trade_history_limit))
+                trade_history = [dict(row) for row in cursor.fetchall()]
+                
+                return {'recent_signals': recent_signals, 'trade_history': trade_history}
+        except Exception as e:
+            raise RuntimeError(f"Failed to get status snapshot: {e}")
+        finally:
+            self._return_connection(conn)
+    
     def get_trade_by_ticket(self, ticket: int) -> Optional[Dict[str, Any]]:
         """
         Get trade by ticket number.
@@ -556,7 +611,8 @@ class Database:
             ticket: Trade ticket number
         
         Returns:
-            Trade dictionary or None if not found
+            Trade dictionary or None if not found. Includes 'entry_ts'
+            (entry time as integer unix seconds) when entry_time is set.
         """
         conn = self._get_connection()
         try:
@@ -567,12 +623,47 @@ class Database:
                 """, (ticket, self.user_id, self.mt5_account_id))
                 
                 row = cursor.fetchone()
-                return dict(row) if row else None
+                if not row:
+                    return None
+                trade = dict(row)
+                # entry_time is a naive local timestamp (written from datetime.now()),
+                # so .timestamp() yields the same epoch scale as MT5 deal times
+                entry_time = trade.get('entry_time')
+                if isinstance(entry_time, datetime):
+                    trade['entry_ts'] = int(entry_time.timestamp())
+                return trade
         except Exception as e:
             raise RuntimeError(f"Failed to get trade by ticket: {e}")
         finally:
             self._return_connection(conn)
     
+    def get_trades_by_tickets(self, tickets: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Get several trades by ticket number in one round-trip.
+        
+        Args:
+            tickets: Trade ticket numbers
+        
+        Returns:
+            Dictionary of ticket -> trade dictionary for the tickets found
+        """
+        if not tickets:
+            return {}
+        
+        conn = self._get_connection()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                cursor.execute("""
+                    SELECT * FROM app.trades 
+                    WHERE ticket = ANY(%s) AND user_id = %s AND mt5_account_id = %s
+                """, (list(tickets), self.user_id, self.mt5_account_id))
+                
+                return {row['ticket']: dict(row) for row in cursor.fetchall()}
+        except Exception as e:
+            raise RuntimeError(f"Failed to get trades by tickets: {e}")
+        finally:
+            self._return_connection(conn)
+    
     def get_bot_config(self) -> Optional[Dict[str, Any]]:
         """
         Get bot configuration for the current user and MT5 account.
@@ -1,8 +1,12 @@
 """
 Records signals and trades to database.
 """
-from typing import Optional
+import queue
+import threading
+from dataclasses import replace
+from typing import Any, Callable, Optional, Set
 from datetime import datetime
+from uuid import uuid4
 from ..utils.types import Signal, Trade
 from ..analytics.database import Database
 from ..utils.logger import setup_logger
@@ -13,16 +17,71 @@ logger = setup_logger(__name__)
 class TradeRecorder:
     """Records trading activity to database."""
     
-    def __init__(self, database: Database, symbol: str = 'XAUUSD'):
+    def __init__(self, database: Database, symbol: str = 'XAUUSD', async_writes: bool = False):
         """
         Initialize trade recorder.
         
         Args:
             database: Database instance
             symbol: Trading symbol (default: XAUUSD)
+            async_writes: If True, writes are queued and executed in order by a
+                background writer thread instead of blocking the caller
         """
         self.database = database
         self.symbol = symbol
+        
+        # Signal IDs whose INSERT failed; trades must not reference them (FK)
+        self._failed_signal_ids: Set[str] = set()
+        
+        self._write_queue: Optional[queue.Queue] = None
+        self._writer_thread: Optional[threading.Thread] = None
+        if async_writes:
+            self._write_queue = queue.Queue()
+            self._writer_thread = threading.Thread(
+                target=self._writer_loop, name="trade-recorder-writer", daemon=True
+            )
+            self._writer_thread.start()
+    
+    def _submit(self, write: Callable[..., Any], *args: Any) -> None:
+        """Run a write inline, or hand it to the background writer."""
+        if self._write_queue is None:
+            write(*args)
+        else:
+            self._write_queue.put((write, args))
+    
+    def _writer_loop(self) -> None:
+        """Drain queued writes in FIFO order (signal -> entry -> exit stays ordered)."""
+        while True:
+            item = self._write_queue.get()
+            try:
+                if item is None:
+                    return
+                write, args = item
+                write(*args)
+            finally:
+                self._write_queue.task_done()
+    
+    def flush(self) -> None:
+        """Block until all queued writes have been executed."""
+        if self._write_queue is not None:
+            self._write_queue.join()
+    
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Drain pending writes and stop the background writer.
+        
+        Args:
+            timeout: Maximum seconds to wait for the writer to finish
+        """
+        if self._writer_thread is None:
+            return
+        self._write_queue.put(None)
+        self._writer_thread.join(timeout)
+        if self._writer_thread.is_alive():
+            logger.warning(f"Trade recorder writer did not drain within {timeout}s "
+                           f"({self._write_queue.qsize()} writes pending)")
+        self._writer_thread = None
+        self._write_queue = None
     
     def record_signal(self, signal: Signal) -> Optional[str]:
         """
@@ -32,15 +91,30 @@ class TradeRecorder:
             signal: Signal object
         
         Returns:
-            Signal ID (UUID string) or None
+            Signal ID (UUID string) or None. With async writes the ID is generated
+            client-side so trades can link to it before the INSERT completes.
         """
+        if self._write_queue is None:
+            try:
+                signal_id = self.database.record_signal(signal)
+                logger.debug(f"Recorded signal: {signal.direction} {signal.entry_type} (confidence={signal.confidence:.1f}%)")
+                return signal_id
+            except Exception as e:
+                logger.error(f"Error recording signal: {e}", exc_info=True)
+                return None
+        
+        signal_id = str(uuid4())
+        # Queue a snapshot: the caller keeps adjusting confidence after recording
+        self._write_queue.put((self._write_signal, (replace(signal), signal_id)))
+        return signal_id
+    
+    def _write_signal(self, signal: Signal, signal_id: str) -> None:
         try:
-            signal_id = self.database.record_signal(signal)
+            self.database.record_signal(signal, signal_id=signal_id)
             logger.debug(f"Recorded signal: {signal.direction} {signal.entry_type} (confidence={signal.confidence:.1f}%)")
-            return signal_id
         except Exception as e:
+            self._failed_signal_ids.add(signal_id)
             logger.error(f"Error recording signal: {e}", exc_info=True)
-            return None
     
     def record_trade_entry(self, ticket: int, signal: Signal, entry_price: float,
                           lot_size: float, stop_loss: float, take_profit: float,
@@ -57,22 +131,27 @@ class TradeRecorder:
             take_profit: Take profit price
             signal_id: Optional signal ID to link trade to signal
         """
+        trade = Trade(
+            ticket=ticket,
+            symbol=self.symbol,
+            direction=signal.direction,
+            entry_price=entry_price,
+            lot_size=lot_size,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            entry_time=datetime.now(),
+            exit_time=None,
+            pnl=0.0,
+            exit_reason=None
+        )
+        self._submit(self._write_trade_entry, trade, signal_id)
+    
+    def _write_trade_entry(self, trade: Trade, signal_id: Optional[str]) -> None:
         try:
-            trade = Trade(
-                ticket=ticket,
-                symbol=self.symbol,
-                direction=signal.direction,
-                entry_price=entry_price,
-                lot_size=lot_size,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                entry_time=datetime.now(),
-                exit_time=None,
-                pnl=0.0,
-                exit_reason=None
-            )
+            if signal_id in self._failed_signal_ids:
+                signal_id = None
             self.database.record_trade(trade, signal_id=signal_id)
-            logger.info(f"Recorded trade entry: ticket={ticket}, {signal.direction} {lot_size} lots @ {entry_price}, signal_id={signal_id}")
+            logger.info(f"Recorded trade entry: ticket={trade.ticket}, {trade.direction} {trade.lot_size} lots @ {trade.entry_price}, signal_id={signal_id}")
         except Exception as e:
             logger.error(f"Error recording trade entry: {e}", exc_info=True)
     
@@ -88,8 +167,13 @@ class TradeRecorder:
             hold_time_seconds: Time position was held
             exit_reason: Reason for exit
         """
+        # Exit time is taken now, not when the queued write runs
+        self._submit(self._write_trade_exit, ticket, exit_price, pnl,
+                     datetime.now(), exit_reason, hold_time_seconds)
+    
+    def _write_trade_exit(self, ticket: int, exit_price: float, pnl: float, exit_time: datetime,
+                          exit_reason: str, hold_time_seconds: float) -> None:
         try:
-            exit_time = datetime.now()
             self.database.update_trade_exit(
                 ticket, exit_price, pnl, exit_time, exit_reason, hold_time_seconds
             )
@@ -107,9 +191,11 @@ class TradeRecorder:
             closed_percent: Percentage closed
             remaining_lots: Remaining lot size
         """
+        self._submit(self._write_partial_close, ticket, closed_percent, remaining_lots)
+    
+    def _write_partial_close(self, ticket: int, closed_percent: float, remaining_lots: float) -> None:
         try:
             self.database.update_trade_partial_close(ticket, closed_percent, remaining_lots)
             logger.debug(f"Updated partial close: ticket={ticket}, closed={closed_percent}%, remaining={remaining_lots} lots")
         except Exception as e:
             logger.error(f"Error updating partial close: {e}", exc_info=True)
-
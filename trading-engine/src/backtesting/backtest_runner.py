@@ -168,7 +168,7 @@ class BacktestRunner:
             
             # Check trading window
             session_info = self.session_manager.is_trading_window(current_time)
-            if not session_info['active']:
+            if not session_info.active:
                 # Still monitor positions even outside trading hours
                 self._monitor_positions()
                 return
@@ -247,7 +247,7 @@ class BacktestRunner:
             
             # Check for neutral trend adjustments
             alignment_result = signal.alignment_result
-            is_neutral_trend = alignment_result and alignment_result.get('is_neutral_trend', False)
+            is_neutral_trend = alignment_result is not None and alignment_result.is_neutral_trend
             
             # Get stop loss percent (adjust for neutral trends)
             signal_config = self.config.get('signals', {})
@@ -268,7 +268,7 @@ class BacktestRunner:
             )
             
             # Apply risk multiplier from session and neutral trend adjustment
-            risk_percent = cb_state.adjusted_risk_percent * session_info['risk_multiplier'] * position_size_multiplier
+            risk_percent = cb_state.adjusted_risk_percent * session_info.risk_multiplier * position_size_multiplier
             
             # Calculate lot size
             lot_size = self.position_sizer.calculate_lot_size(
@@ -302,7 +302,7 @@ class BacktestRunner:
             
             validation = self.risk_validator.validate_signal(
                 signal, market_data_dict, account_info, self.config,
-                session_info['session_type']
+                session_info.session_type
             )
             
             if not validation['valid']:
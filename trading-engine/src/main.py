@@ -1,14 +1,24 @@
 """
 Main entry point and execution loop for trading engine.
 """
+import asyncio
+import logging
+import re
+import string
 import time
 import sys
 import os
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
+try:
+    import uvloop  # type: ignore
+except ImportError:  # Optional: asyncio's default event loop is used instead
+    uvloop = None
+
 # Load environment variables first, before any other imports
 # Try loading from current directory and trading-engine directory
 trading_engine_dir = Path(__file__).parent.parent
@@ -34,9 +44,11 @@ from src.utils.types import MarketData
 from src.market_data.mt5_connector import MT5Connector
 from src.market_data.candle_processor import CandleProcessor
 from src.market_data.indicators import (
-    calculate_ema, calculate_rsi, calculate_atr, identify_swing_points,
-    calculate_atr_average
+    make_ema, make_rsi, make_atr, identify_swing_points, calculate_atr_average,
+    detect_momentum_run, IndicatorBuffers
 )
+from src.market_data.incremental_indicators import IncrementalIndicators
+from src.utils.jit import NUMBA_AVAILABLE
 from src.signals.signal_generator import SignalGenerator
 from src.risk.position_sizer import PositionSizer
 from src.risk.risk_validator import RiskValidator
@@ -51,6 +63,32 @@ from src.analytics.performance_tracker import PerformanceTracker
 
 logger = setup_logger(__name__)
 
+_BANNER = "=" * 80
+
+# Candles fetched per timeframe each cycle (EMA21 needs 21, plus headroom)
+CANDLE_FETCH_COUNT = 30
+
+# MT5 close-deal comment patterns (e.g. "[tp 2650.10]", "[sl 2640.00]")
+_TP_RE = re.compile(r'tp|take profit', re.IGNORECASE)
+_SL_RE = re.compile(r'sl|stop loss', re.IGNORECASE)
+
+# Interval between INFO-level "still alive" messages on idle cycles
+HEARTBEAT_INTERVAL_SECONDS = 300
+
+# Per-cycle status block rendered by _display_status
+_STATUS_TEMPLATE = string.Template("""
+=== Trading Engine Status ===
+Time: $local_time (Local) | $utc_time (GMT)
+Equity: $$$equity | Balance: $$$balance
+Open Positions: $open_positions
+Trading Window: $window_status
+Circuit Breaker: $cb_status
+  - Adjusted Risk: $adjusted_risk% | Confidence Threshold: $adjusted_confidence%
+Recent Signals: $recent_signals (last 5 cycles)
+Trade History: $total_trades total | Last 5: ${recent_wins}W / ${recent_losses}L
+Last Signal Outcome: $signal_outcome
+""")
+
 
 class ExecutionLoop:
     """30-second cycle orchestrator."""
@@ -67,6 +105,26 @@ class ExecutionLoop:
         self.cycle_interval = self.execution_config.get('cycle_interval_seconds', 30)
         self.symbol = config.get('symbol', 'XAUUSD')
         
+        # Indicator functions specialized once for the configured periods
+        indicator_config = config.get('indicators', {})
+        self._ema = make_ema(indicator_config.get('ema_period', 21))
+        self._rsi = make_rsi(indicator_config.get('rsi_period', 14))
+        self._atr = make_atr(indicator_config.get('atr_period', 14))
+        self.swing_lookback = indicator_config.get('swing_lookback', 10)
+        self._indicator_buffers = IndicatorBuffers.allocate(CANDLE_FETCH_COUNT)
+        
+        # Incremental mode advances EMA/RSI/ATR by newly closed candles only
+        self._m1_indicators: Optional[IncrementalIndicators] = None
+        self._m5_indicators: Optional[IncrementalIndicators] = None
+        if indicator_config.get('incremental', False):
+            periods = (
+                indicator_config.get('ema_period', 21),
+                indicator_config.get('rsi_period', 14),
+                indicator_config.get('atr_period', 14)
+            )
+            self._m1_indicators = IncrementalIndicators(*periods, window=CANDLE_FETCH_COUNT)
+            self._m5_indicators = IncrementalIndicators(*periods, window=CANDLE_FETCH_COUNT)
+        
         # Initialize components
         self.mt5_connector = MT5Connector()
         self.candle_processor = CandleProcessor()
@@ -84,12 +142,19 @@ class ExecutionLoop:
         )
         self.circuit_breaker = CircuitBreaker(config, self.database)
         self.order_executor = OrderExecutor(config, self.mt5_connector)
-        self.position_manager = PositionManager(config, self.order_executor, self.database, self.symbol)
+        # DB writes run on a background writer so inserts never block the cycle
+        self.trade_recorder = TradeRecorder(self.database, self.symbol, async_writes=True)
+        # Exits recorded by the position manager share the same writer
+        self.position_manager = PositionManager(config, self.order_executor, self.database,
+                                                self.symbol, trade_recorder=self.trade_recorder)
         self.session_manager = SessionManager(config)
         self.volatility_filter = VolatilityFilter(config)
-        self.trade_recorder = TradeRecorder(self.database, self.symbol)
         self.performance_tracker = PerformanceTracker(self.database)
         
+        # DB reads are overlapped with MT5 calls on this pool. MT5 itself is
+        # only ever called from the loop thread (its API is not thread-safe).
+        self._io_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="engine-io")
+        
         self.running = False
         self.starting_equity = 0.0
         
@@ -98,6 +163,15 @@ class ExecutionLoop:
         
         # Track last signal outcome for status display
         self.last_signal_outcome: Optional[Dict[str, Any]] = None
+        
+        # Last rendered status (see _display_status) and when to re-show it regardless
+        self._last_status_key: Optional[Tuple] = None
+        self._next_status_refresh_at = 0.0
+        
+        # Heartbeat scheduling: run() raises the flag once per interval, the
+        # idle branches of run_cycle() consume it
+        self._next_heartbeat_at = 0.0
+        self._heartbeat_due = True
     
     def initialize_system(self) -> bool:
         """
@@ -121,6 +195,8 @@ class ExecutionLoop:
                 logger.error("Failed to connect to MT5")
                 return False
             
+            self._warmup_indicators()
+            
             # Get starting equity
             account_info = self.mt5_connector.get_account_info()
             if account_info:
@@ -143,6 +219,19 @@ class ExecutionLoop:
             logger.error(f"Initialization error: {e}", exc_info=True)
             return False
     
+    def _warmup_indicators(self) -> None:
+        """
+        Run each indicator once on dummy data of the live shape.
+        
+        With numba installed this loads/compiles the kernels at startup so the
+        first live cycle is not delayed by JIT compilation.
+        """
+        dummy = [float(i) for i in range(CANDLE_FETCH_COUNT)]
+        self._ema(dummy)
+        self._rsi(dummy)
+        self._atr(dummy, dummy, dummy)
+        logger.info(f"Indicator kernels warmed (numba={'on' if NUMBA_AVAILABLE else 'off'})")
+    
     def fetch_market_data(self) -> Optional[MarketData]:
         """
         Fetch and process market data.
@@ -153,24 +242,25 @@ class ExecutionLoop:
         try:
             # Fetch M1 and M5 candles
             # Fetch 30 candles to ensure we have enough for EMA21 (needs 21) and other indicators
-            m1_candles = self.mt5_connector.get_candles(self.symbol, 1, 30)  # M1, 30 candles
-            m5_candles = self.mt5_connector.get_candles(self.symbol, 5, 30)  # M5, 30 candles
+            m1_batch = self.mt5_connector.get_candle_batch(self.symbol, 1, CANDLE_FETCH_COUNT)
+            m5_batch = self.mt5_connector.get_candle_batch(self.symbol, 5, CANDLE_FETCH_COUNT)
             
-            if not m1_candles or not m5_candles:
+            if m1_batch is None or m5_batch is None:
                 logger.warning("Failed to fetch candles")
                 return None
             
-            # Validate and clean
-            if not self.candle_processor.validate_candles(m1_candles, 10):
+            # Validate (batches are already typed, so no cleaning pass is needed)
+            if not self.candle_processor.validate_batch(m1_batch, 10):
                 logger.warning("M1 candles validation failed")
                 return None
             
-            if not self.candle_processor.validate_candles(m5_candles, 10):
+            if not self.candle_processor.validate_batch(m5_batch, 10):
                 logger.warning("M5 candles validation failed")
                 return None
             
-            m1_candles = self.candle_processor.clean_candles(m1_candles)
-            m5_candles = self.candle_processor.clean_candles(m5_candles)
+            # Strategy code works on candle dicts; indicators use the arrays directly
+            m1_candles = m1_batch.to_candles()
+            m5_candles = m5_batch.to_candles()
             
             # Get current price
             price_data = self.mt5_connector.get_current_price(self.symbol)
@@ -178,19 +268,25 @@ class ExecutionLoop:
                 return None
             
             # Calculate indicators
-            m5_closes = [c['close'] for c in m5_candles]
-            m1_closes = [c['close'] for c in m1_candles]
-            
-            m5_ema21 = calculate_ema(m5_closes, 21)
-            m1_rsi = calculate_rsi(m1_closes, 14)
-            m5_rsi = calculate_rsi(m5_closes, 14)
-            
-            m5_highs = [c['high'] for c in m5_candles]
-            m5_lows = [c['low'] for c in m5_candles]
-            atr_values = calculate_atr(m5_highs, m5_lows, m5_closes, 14)
+            if self._m5_indicators is not None:
+                m1_values = self._m1_indicators.update(m1_candles)
+                m5_values = self._m5_indicators.update(m5_candles)
+                m5_ema21 = m5_values['ema']
+                m1_rsi = m1_values['rsi']
+                m5_rsi = m5_values['rsi']
+                atr_values = m5_values['atr']
+            else:
+                buffers = self._indicator_buffers
+                m5_ema21 = self._ema(m5_batch.close, out=buffers.m5_ema)
+                m1_rsi = self._rsi(m1_batch.close, out=buffers.m1_rsi)
+                m5_rsi = self._rsi(m5_batch.close, out=buffers.m5_rsi)
+                atr_values = self._atr(m5_batch.high, m5_batch.low, m5_batch.close, out=buffers.m5_atr)
             atr_average = calculate_atr_average(atr_values, 20) if atr_values else 0.0
             
-            swing_points = identify_swing_points(m5_candles, 10)
+            swing_points = identify_swing_points(m5_batch, self.swing_lookback)
+            
+            # Exit momentum check, computed once per cycle instead of per position
+            momentum_3bear, momentum_3bull = detect_momentum_run(m1_batch, 3)
             
             indicators = {
                 'm5_ema21': m5_ema21,
@@ -198,7 +294,9 @@ class ExecutionLoop:
                 'm5_rsi': m5_rsi,
                 'atr': atr_values[-1] if atr_values else 0.0,
                 'atr_average': atr_average,
-                'swing_points': swing_points
+                'swing_points': swing_points,
+                'momentum_3bear': momentum_3bear,
+                'momentum_3bull': momentum_3bull
             }
             
             current_price = (price_data['bid'] + price_data['ask']) / 2
@@ -210,7 +308,9 @@ class ExecutionLoop:
                 bid=price_data['bid'],
                 ask=price_data['ask'],
                 spread=price_data['spread'],
-                indicators=indicators
+                indicators=indicators,
+                m1_batch=m1_batch,
+                m5_batch=m5_batch
             )
         
         except Exception as e:
@@ -223,8 +323,8 @@ class ExecutionLoop:
             # Check if trading is enabled in bot config
             bot_config = self.database.get_bot_config()
             if bot_config and not bot_config.get('is_trading_active', False):
-                # Log at INFO level every 10th cycle (every 5 minutes) to avoid spam
-                if int(time.time()) % 300 < 30:  # Log roughly every 5 minutes
+                # Log at INFO level once per heartbeat interval to avoid spam
+                if self._consume_heartbeat():
                     logger.info("Trading is disabled in bot configuration (is_trading_active = false)")
                 else:
                     logger.debug("Trading is disabled in bot configuration")
@@ -234,16 +334,20 @@ class ExecutionLoop:
             
             # Check session
             session_info = self.session_manager.is_trading_window()
-            if not session_info['active']:
-                # Log at INFO level every 10th cycle (every 5 minutes) to avoid spam
-                if int(time.time()) % 300 < 30:  # Log roughly every 5 minutes
-                    logger.info(f"Not in trading window: {session_info['reason']}")
+            if not session_info.active:
+                # Log at INFO level once per heartbeat interval to avoid spam
+                if self._consume_heartbeat():
+                    logger.info(f"Not in trading window: {session_info.reason}")
                 else:
-                    logger.debug(f"Not in trading window: {session_info['reason']}")
+                    logger.debug("Not in trading window: %s", session_info.reason)
                 # Still monitor positions even outside trading hours
                 self._monitor_positions()
                 return
             
+            # Circuit breaker inputs come from the DB; load them while MT5 data is fetched
+            trade_history_future = self._io_pool.submit(self.database.get_trade_history, limit=10)
+            daily_pnl_future = self._io_pool.submit(self.performance_tracker.calculate_daily_pnl)
+            
             # Fetch market data
             market_data = self.fetch_market_data()
             if not market_data:
@@ -251,17 +355,17 @@ class ExecutionLoop:
                 return
             
             # Check circuit breaker
-            trade_history = self.database.get_trade_history(limit=10)
-            daily_pnl = self.performance_tracker.calculate_daily_pnl()
+            trade_history = trade_history_future.result()
+            daily_pnl = daily_pnl_future.result()
             halt_check = self.circuit_breaker.check_halts(trade_history, daily_pnl, self.starting_equity)
             
             if halt_check['halted']:
-                logger.warning(f"Trading halted: {halt_check['reason']}")
-                self._monitor_positions()
+                logger.warning("Trading halted: %s", halt_check['reason'])
+                self._monitor_positions(market_data)
                 return
             
-            # Monitor existing positions
-            self._monitor_positions()
+            # Monitor existing positions (reuse this cycle's market data)
+            self._monitor_positions(market_data)
             
             # Check for existing positions
             open_positions = self.mt5_connector.get_open_positions(self.symbol)
@@ -273,18 +377,20 @@ class ExecutionLoop:
             m5_data = {
                 'candles': market_data.m5_candles,
                 'ema21': market_data.indicators['m5_ema21'],
-                'swing_points': market_data.indicators['swing_points']
+                'swing_points': market_data.indicators['swing_points'],
+                'batch': market_data.m5_batch
             }
             m1_data = {
                 'candles': market_data.m1_candles,
-                'rsi': market_data.indicators['m1_rsi']
+                'rsi': market_data.indicators['m1_rsi'],
+                'batch': market_data.m1_batch
             }
             
             signal = self.signal_generator.generate_signal(m5_data, m1_data, market_data.indicators)
             
             if not signal:
                 # Log at INFO level occasionally to show the bot is checking
-                if int(time.time()) % 300 < 30:  # Log roughly every 5 minutes
+                if self._consume_heartbeat():
                     logger.info("No signal generated - market conditions not met")
                 else:
                     logger.debug("No signal generated")
@@ -302,14 +408,17 @@ class ExecutionLoop:
             min_confidence = cb_state.adjusted_confidence_threshold
             
             if signal.confidence < min_confidence:
-                logger.info("=" * 80)
-                logger.info(f"❌ TRADE REJECTED: Circuit Breaker Confidence Threshold")
-                logger.info(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                logger.info(f"   Signal Confidence: {signal.confidence:.1f}% < Circuit Breaker Threshold: {min_confidence}%")
-                logger.info(f"   Gap: {min_confidence - signal.confidence:.1f}% below required")
-                logger.info(f"   Circuit Breaker State: Risk={cb_state.adjusted_risk_percent:.2f}%, Confidence Threshold={min_confidence:.1f}%")
-                logger.info(f"   Reason: Signal generated but filtered by circuit breaker after recent losses")
-                logger.info("=" * 80)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("\n".join([
+                        _BANNER,
+                        "❌ TRADE REJECTED: Circuit Breaker Confidence Threshold",
+                        f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                        f"   Signal Confidence: {signal.confidence:.1f}% < Circuit Breaker Threshold: {min_confidence}%",
+                        f"   Gap: {min_confidence - signal.confidence:.1f}% below required",
+                        f"   Circuit Breaker State: Risk={cb_state.adjusted_risk_percent:.2f}%, Confidence Threshold={min_confidence:.1f}%",
+                        "   Reason: Signal generated but filtered by circuit breaker after recent losses",
+                        _BANNER,
+                    ]))
                 self.last_signal_outcome = {
                     'status': 'rejected',
                     'stage': 'circuit_breaker',
@@ -323,10 +432,12 @@ class ExecutionLoop:
             # Risk validation
             account_info = self.mt5_connector.get_account_info()
             if not account_info:
-                logger.error("=" * 80)
-                logger.error(f"❌ TRADE REJECTED: Failed to get account info")
-                logger.error(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                logger.error("=" * 80)
+                logger.error("\n".join([
+                    _BANNER,
+                    "❌ TRADE REJECTED: Failed to get account info",
+                    f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                    _BANNER,
+                ]))
                 self.last_signal_outcome = {
                     'status': 'rejected',
                     'stage': 'account_info',
@@ -340,12 +451,15 @@ class ExecutionLoop:
                 market_data.indicators['atr_average']
             )
             if not atr_validation['valid']:
-                logger.info("=" * 80)
-                logger.info(f"❌ TRADE REJECTED: ATR Validation Failed")
-                logger.info(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                logger.info(f"   ATR: {market_data.indicators['atr']:.2f} | ATR Average: {market_data.indicators['atr_average']:.2f}")
-                logger.info(f"   Reason: {atr_validation.get('reason', 'Unknown ATR issue')}")
-                logger.info("=" * 80)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("\n".join([
+                        _BANNER,
+                        "❌ TRADE REJECTED: ATR Validation Failed",
+                        f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                        f"   ATR: {market_data.indicators['atr']:.2f} | ATR Average: {market_data.indicators['atr_average']:.2f}",
+                        f"   Reason: {atr_validation.get('reason', 'Unknown ATR issue')}",
+                        _BANNER,
+                    ]))
                 self.last_signal_outcome = {
                     'status': 'rejected',
                     'stage': 'atr_validation',
@@ -360,14 +474,17 @@ class ExecutionLoop:
             if atr_validation['confidence_adjustment'] < 0:
                 signal.confidence += atr_validation['confidence_adjustment']
                 if signal.confidence < min_confidence:
-                    logger.info("=" * 80)
-                    logger.info(f"❌ TRADE REJECTED: ATR-Adjusted Confidence Too Low")
-                    logger.info(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                    logger.info(f"   Original Confidence: {original_confidence:.1f}%")
-                    logger.info(f"   ATR Adjustment: {atr_validation['confidence_adjustment']:.1f}%")
-                    logger.info(f"   Adjusted Confidence: {signal.confidence:.1f}% < Threshold: {min_confidence:.1f}%")
-                    logger.info(f"   ATR: {market_data.indicators['atr']:.2f} | ATR Average: {market_data.indicators['atr_average']:.2f}")
-                    logger.info("=" * 80)
+                    if logger.isEnabledFor(logging.INFO):
+                        logger.info("\n".join([
+                            _BANNER,
+                            "❌ TRADE REJECTED: ATR-Adjusted Confidence Too Low",
+                            f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                            f"   Original Confidence: {original_confidence:.1f}%",
+                            f"   ATR Adjustment: {atr_validation['confidence_adjustment']:.1f}%",
+                            f"   Adjusted Confidence: {signal.confidence:.1f}% < Threshold: {min_confidence:.1f}%",
+                            f"   ATR: {market_data.indicators['atr']:.2f} | ATR Average: {market_data.indicators['atr_average']:.2f}",
+                            _BANNER,
+                        ]))
                     self.last_signal_outcome = {
                         'status': 'rejected',
                         'stage': 'atr_adjusted_confidence',
@@ -389,17 +506,20 @@ class ExecutionLoop:
             
             validation = self.risk_validator.validate_signal(
                 signal, market_data_dict, account_info, self.config,
-                session_info['session_type']
+                session_info.session_type
             )
             
             if not validation['valid']:
-                logger.info("=" * 80)
-                logger.info(f"❌ TRADE REJECTED: Risk Validation Failed")
-                logger.info(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                logger.info(f"   Reason: {validation.get('reason', 'Unknown risk issue')}")
-                logger.info(f"   Market Conditions: Spread={market_data.spread:.2f}, ATR={market_data.indicators['atr']:.2f}")
-                logger.info(f"   Account: Equity=${account_info.equity:.2f}, Balance=${account_info.balance:.2f}")
-                logger.info("=" * 80)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("\n".join([
+                        _BANNER,
+                        "❌ TRADE REJECTED: Risk Validation Failed",
+                        f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                        f"   Reason: {validation.get('reason', 'Unknown risk issue')}",
+                        f"   Market Conditions: Spread={market_data.spread:.2f}, ATR={market_data.indicators['atr']:.2f}",
+                        f"   Account: Equity=${account_info.equity:.2f}, Balance=${account_info.balance:.2f}",
+                        _BANNER,
+                    ]))
                 self.last_signal_outcome = {
                     'status': 'rejected',
                     'stage': 'risk_validation',
@@ -411,7 +531,7 @@ class ExecutionLoop:
             
             # Check for neutral trend adjustments
             alignment_result = signal.alignment_result
-            is_neutral_trend = alignment_result and alignment_result.get('is_neutral_trend', False)
+            is_neutral_trend = alignment_result is not None and alignment_result.is_neutral_trend
             
             # Get stop loss percent (adjust for neutral trends)
             signal_config = self.config.get('signals', {})
@@ -433,7 +553,7 @@ class ExecutionLoop:
             )
             
             # Apply risk multiplier from session and neutral trend adjustment
-            risk_percent = cb_state.adjusted_risk_percent * session_info['risk_multiplier'] * position_size_multiplier
+            risk_percent = cb_state.adjusted_risk_percent * session_info.risk_multiplier * position_size_multiplier
             
             lot_size = self.position_sizer.calculate_lot_size(
                 account_info.equity, risk_percent, stop_distance, self.symbol
@@ -453,18 +573,22 @@ class ExecutionLoop:
             )
             
             # Log execution attempt with full details
-            logger.info("=" * 80)
-            logger.info(f"🚀 ATTEMPTING TRADE EXECUTION")
-            logger.info(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-            logger.info(f"   Confidence: {signal.confidence:.1f}% (Threshold: {min_confidence:.1f}%)")
-            logger.info(f"   Position: {lot_size:.3f} lots | Risk: {risk_percent:.2f}% (${account_info.equity * risk_percent / 100:.2f})")
-            logger.info(f"   Stop Loss: ${stop_loss:.2f} ({abs(signal.price - stop_loss):.2f} points)")
-            logger.info(f"   Take Profit: ${take_profit:.2f} ({abs(take_profit - signal.price):.2f} points)")
-            logger.info(f"   Risk/Reward: {abs(take_profit - signal.price) / abs(signal.price - stop_loss):.2f}:1")
-            logger.info(f"   Market: Spread={market_data.spread:.2f}, ATR={market_data.indicators['atr']:.2f}")
-            if is_neutral_trend:
-                logger.info(f"   ⚠️  Neutral Trend: Using tighter SL ({stop_percent}%) and reduced size ({position_size_multiplier}x)")
-            logger.info("=" * 80)
+            if logger.isEnabledFor(logging.INFO):
+                lines = [
+                    _BANNER,
+                    "🚀 ATTEMPTING TRADE EXECUTION",
+                    f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                    f"   Confidence: {signal.confidence:.1f}% (Threshold: {min_confidence:.1f}%)",
+                    f"   Position: {lot_size:.3f} lots | Risk: {risk_percent:.2f}% (${account_info.equity * risk_percent / 100:.2f})",
+                    f"   Stop Loss: ${stop_loss:.2f} ({abs(signal.price - stop_loss):.2f} points)",
+                    f"   Take Profit: ${take_profit:.2f} ({abs(take_profit - signal.price):.2f} points)",
+                    f"   Risk/Reward: {abs(take_profit - signal.price) / abs(signal.price - stop_loss):.2f}:1",
+                    f"   Market: Spread={market_data.spread:.2f}, ATR={market_data.indicators['atr']:.2f}",
+                ]
+                if is_neutral_trend:
+                    lines.append(f"   ⚠️  Neutral Trend: Using tighter SL ({stop_percent}%) and reduced size ({position_size_multiplier}x)")
+                lines.append(_BANNER)
+                logger.info("\n".join(lines))
             
             # Execute order
             result = self.order_executor.place_order(
@@ -472,13 +596,16 @@ class ExecutionLoop:
             )
             
             if result['success']:
-                logger.info("=" * 80)
-                logger.info(f"✅ TRADE EXECUTED SUCCESSFULLY")
-                logger.info(f"   Ticket: {result['ticket']} | Direction: {signal.direction.upper()}")
-                logger.info(f"   Entry Price: ${result['price']:.2f} | Lot Size: {lot_size:.3f}")
-                logger.info(f"   Stop Loss: ${stop_loss:.2f} | Take Profit: ${take_profit:.2f}")
-                logger.info(f"   Risk: {risk_percent:.2f}% (${account_info.equity * risk_percent / 100:.2f})")
-                logger.info("=" * 80)
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("\n".join([
+                        _BANNER,
+                        "✅ TRADE EXECUTED SUCCESSFULLY",
+                        f"   Ticket: {result['ticket']} | Direction: {signal.direction.upper()}",
+                        f"   Entry Price: ${result['price']:.2f} | Lot Size: {lot_size:.3f}",
+                        f"   Stop Loss: ${stop_loss:.2f} | Take Profit: ${take_profit:.2f}",
+                        f"   Risk: {risk_percent:.2f}% (${account_info.equity * risk_percent / 100:.2f})",
+                        _BANNER,
+                    ]))
                 self.trade_recorder.record_trade_entry(
                     result['ticket'], signal, result['price'], lot_size, stop_loss, take_profit, signal_id=signal_id
                 )
@@ -490,11 +617,13 @@ class ExecutionLoop:
                     'lot_size': lot_size
                 }
             else:
-                logger.warning("=" * 80)
-                logger.warning(f"❌ ORDER EXECUTION FAILED")
-                logger.warning(f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}")
-                logger.warning(f"   Error: {result.get('error', 'Unknown error')}")
-                logger.warning("=" * 80)
+                logger.warning("\n".join([
+                    _BANNER,
+                    "❌ ORDER EXECUTION FAILED",
+                    f"   Signal: {signal.direction.upper()} {signal.entry_type} @ ${signal.price:.2f}",
+                    f"   Error: {result.get('error', 'Unknown error')}",
+                    _BANNER,
+                ]))
                 self.last_signal_outcome = {
                     'status': 'execution_failed',
                     'signal': f"{signal.direction.upper()} {signal.entry_type}",
@@ -504,8 +633,26 @@ class ExecutionLoop:
         except Exception as e:
             logger.error(f"Error in execution cycle: {e}", exc_info=True)
     
-    def _monitor_positions(self) -> None:
-        """Monitor and manage open positions."""
+    def _consume_heartbeat(self) -> bool:
+        """
+        Check and clear the heartbeat flag.
+        
+        Returns:
+            True if an INFO-level heartbeat should be logged this cycle
+        """
+        if self._heartbeat_due:
+            self._heartbeat_due = False
+            return True
+        return False
+    
+    def _monitor_positions(self, market_data: Optional[MarketData] = None) -> None:
+        """
+        Monitor and manage open positions.
+        
+        Args:
+            market_data: Market data already fetched this cycle; fetched on demand
+                if None (e.g. outside the trading window)
+        """
         try:
             import MetaTrader5 as mt5
             
@@ -529,29 +676,25 @@ class ExecutionLoop:
                             if close_deals:
                                 close_deal = close_deals[-1]  # Most recent close
                                 
-                                # Get entry time from database
+                                # Get entry time from database (integer epoch seconds)
                                 trade = self.database.get_trade_by_ticket(ticket)
                                 
-                                if trade and trade.get('entry_time'):
-                                    entry_time = datetime.fromisoformat(
-                                        trade['entry_time'].replace('Z', '+00:00').replace('+00:00', '')
-                                    )
+                                if trade and trade.get('entry_ts') is not None:
+                                    entry_ts = trade['entry_ts']
                                 else:
                                     # Fallback: use deal time minus estimated hold time
-                                    entry_time = datetime.fromtimestamp(close_deal.time) - timedelta(minutes=2)
+                                    entry_ts = close_deal.time - 120
                                 
-                                exit_time = datetime.fromtimestamp(close_deal.time)
-                                hold_time_seconds = (exit_time - entry_time).total_seconds()
+                                hold_time_seconds = close_deal.time - entry_ts
                                 
                                 # Calculate total P&L from all close deals for this position
                                 total_pnl = sum(d.profit for d in close_deals)
                                 
                                 # Determine exit reason
-                                exit_reason = 'stop_loss'  # Default
-                                comment = str(close_deal.comment or '').lower()
-                                if 'tp' in comment or 'take profit' in comment:
+                                comment = close_deal.comment or ''
+                                if _TP_RE.search(comment):
                                     exit_reason = 'take_profit'
-                                elif 'sl' in comment or 'stop loss' in comment:
+                                elif _SL_RE.search(comment):
                                     exit_reason = 'stop_loss'
                                 else:
                                     exit_reason = 'mt5_auto_close'
@@ -566,6 +709,9 @@ class ExecutionLoop:
                                 )
                                 
                                 logger.info(f"Recorded MT5 auto-close: ticket={ticket}, P&L=${total_pnl:.2f}, reason={exit_reason}")
+                                
+                                # Closing deal confirmed: release its partial-exit tracking
+                                self.position_manager.forget_position(ticket)
                             else:
                                 logger.warning(f"No close deal found for position {ticket}")
                         else:
@@ -578,8 +724,9 @@ class ExecutionLoop:
                 self.previous_open_positions = set()
                 return
             
-            # Fetch market data for exit evaluation
-            market_data = self.fetch_market_data()
+            # Fetch market data for exit evaluation (unless the caller already has it)
+            if market_data is None:
+                market_data = self.fetch_market_data()
             if not market_data:
                 # Update tracking even if market data fetch fails
                 self.previous_open_positions = current_open_tickets
@@ -595,17 +742,15 @@ class ExecutionLoop:
             )
             
             # Record exits from position manager
+            positions_by_ticket = {p['ticket']: p for p in open_positions}
             for action in exit_actions:
                 if action['action'] == 'close' and action['result']['success']:
                     # Get position info to calculate P&L
-                    position = next(
-                        (p for p in open_positions if p['ticket'] == action['ticket']),
-                        None
-                    )
+                    position = positions_by_ticket.get(action['ticket'])
                     if position:
                         exit_price = action['result'].get('price', market_data.current_price)
                         pnl = position['profit']
-                        hold_time = (datetime.now() - position['time']).total_seconds()
+                        hold_time = time.time() - position['time_ts']
                         
                         self.trade_recorder.record_trade_exit(
                             action['ticket'], exit_price, pnl, hold_time, action['reason']
@@ -617,23 +762,52 @@ class ExecutionLoop:
         except Exception as e:
             logger.error(f"Error monitoring positions: {e}", exc_info=True)
     
+    def _run_one_cycle(self) -> None:
+        """Run a trading cycle followed by the status display."""
+        cycle_start = time.monotonic()
+        if cycle_start >= self._next_heartbeat_at:
+            self._heartbeat_due = True
+            self._next_heartbeat_at = cycle_start + HEARTBEAT_INTERVAL_SECONDS
+        
+        self.run_cycle()
+        
+        # Display status
+        self._display_status()
+    
+    def _advance_deadline(self, next_deadline: float) -> Tuple[float, float]:
+        """
+        Move the cycle deadline forward one slot, skipping slots already missed.
+        
+        Cycles run on a fixed monotonic schedule (immune to wall-clock jumps);
+        an overrun skips the missed slots instead of drifting every later wake-up.
+        
+        Args:
+            next_deadline: Deadline (time.monotonic()) of the cycle that just ran
+        
+        Returns:
+            Tuple of (new deadline, seconds to sleep until it)
+        """
+        next_deadline += self.cycle_interval
+        now = time.monotonic()
+        if next_deadline <= now:
+            skipped = int((now - next_deadline) // self.cycle_interval) + 1
+            logger.warning(f"Cycle overran its slot by {now - next_deadline:.1f}s "
+                           f"- skipping {skipped} cycle(s)")
+            next_deadline += skipped * self.cycle_interval
+        return next_deadline, next_deadline - now
+    
     def run(self) -> None:
         """Main execution loop."""
         self.running = True
         logger.info("Starting trading engine execution loop")
         
         try:
+            next_deadline = time.monotonic()
             while self.running:
-                cycle_start = time.time()
-                
-                self.run_cycle()
-                
-                # Display status
-                self._display_status()
+                self._run_one_cycle()
                 
                 # Sleep until next cycle
-                elapsed = time.time() - cycle_start
-                sleep_time = max(0, self.cycle_interval - elapsed)
+                next_deadline, sleep_time = self._advance_deadline(next_deadline)
                 time.sleep(sleep_time)
         
         except KeyboardInterrupt:
@@ -643,23 +817,52 @@ class ExecutionLoop:
         finally:
             self.shutdown()
     
+    async def run_async(self) -> None:
+        """
+        Main execution loop on an asyncio event loop.
+        
+        Pacing happens on the event loop (free for other tasks between cycles);
+        each cycle runs on a single dedicated worker thread so all MT5 calls
+        stay serialized on one thread.
+        """
+        self.running = True
+        logger.info("Starting trading engine execution loop (asyncio%s)",
+                    ", uvloop" if uvloop is not None else "")
+        
+        event_loop = asyncio.get_running_loop()
+        cycle_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="engine-cycle")
+        try:
+            next_deadline = time.monotonic()
+            while self.running:
+                await event_loop.run_in_executor(cycle_executor, self._run_one_cycle)
+                
+                # Sleep until next cycle
+                next_deadline, sleep_time = self._advance_deadline(next_deadline)
+                await asyncio.sleep(sleep_time)
+        
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            logger.info("Received interrupt signal, shutting down...")
+        except Exception as e:
+            logger.error(f"Fatal error in execution loop: {e}", exc_info=True)
+        finally:
+            # Let an in-flight cycle finish before MT5/DB are torn down
+            cycle_executor.shutdown(wait=True)
+            self.shutdown()
+    
     def _display_status(self) -> None:
         """Display current system status."""
+        # Nothing below is observable unless INFO is emitted; skip the MT5/DB reads too
+        if not logger.isEnabledFor(logging.INFO):
+            return
+        
         try:
-            account_info = self.mt5_connector.get_account_info()
+            account_info = self.mt5_connector.get_account_info_cached()
             open_positions = self.mt5_connector.get_open_positions(self.symbol)
             cb_state = self.circuit_breaker.get_current_state()
-            recent_signals = self.database.get_recent_signals(limit=5)
             
             # Check trading window
             session_info = self.session_manager.is_trading_window()
-            window_status = "✅ ACTIVE" if session_info['active'] else f"❌ CLOSED ({session_info['reason']})"
-            
-            # Get trade history for context
-            trade_history = self.database.get_trade_history(limit=10)
-            total_trades = len(trade_history)
-            recent_wins = sum(1 for t in trade_history[:5] if t.get('pnl', 0) > 0)
-            recent_losses = sum(1 for t in trade_history[:5] if t.get('pnl', 0) < 0)
+            window_status = "✅ ACTIVE" if session_info.active else f"❌ CLOSED ({session_info.reason})"
             
             # Add last signal outcome information
             signal_outcome_info = ""
@@ -680,29 +883,62 @@ class ExecutionLoop:
             else:
                 signal_outcome_info = "⏸️  No signal activity yet"
             
-            from datetime import timezone
-            status = f"""
-=== Trading Engine Status ===
-Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')} (Local) | {datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')} (GMT)
-Equity: ${account_info.equity:.2f} | Balance: ${account_info.balance:.2f}
-Open Positions: {len(open_positions)}
-Trading Window: {window_status}
-Circuit Breaker: {'HALTED' if cb_state.halted else 'ACTIVE'} {f'({cb_state.reason})' if cb_state.halted else ''}
-  - Adjusted Risk: {cb_state.adjusted_risk_percent}% | Confidence Threshold: {cb_state.adjusted_confidence_threshold}%
-Recent Signals: {len(recent_signals)} (last 5 cycles)
-Trade History: {total_trades} total | Last 5: {recent_wins}W / {recent_losses}L
-Last Signal Outcome: {signal_outcome_info}
-"""
-            logger.info(status)
+            # Skip re-rendering an unchanged status (still shown once per heartbeat interval).
+            # Closed trades move the balance, so trade history changes are covered by the key.
+            status_key = (
+                round(account_info.equity, 2), round(account_info.balance, 2), len(open_positions),
+                cb_state.halted, cb_state.reason, cb_state.adjusted_risk_percent,
+                cb_state.adjusted_confidence_threshold, window_status, signal_outcome_info
+            )
+            now = time.monotonic()
+            if status_key == self._last_status_key and now < self._next_status_refresh_at:
+                return
+            
+            snapshot = self.database.get_status_snapshot(recent_signals_limit=5, trade_history_limit=10)
+            recent_signals = snapshot['recent_signals']
+            
+            # Get trade history for context
+            trade_history = snapshot['trade_history']
+            total_trades = len(trade_history)
+            recent_wins = 0
+            recent_losses = 0
+            for t in trade_history[:5]:
+                pnl = t.get('pnl', 0)
+                if pnl > 0:
+                    recent_wins += 1
+                elif pnl < 0:
+                    recent_losses += 1
+            
+            now_utc = datetime.now(timezone.utc)
+            logger.info(_STATUS_TEMPLATE.substitute(
+                local_time=now_utc.astimezone().strftime('%Y-%m-%d %H:%M:%S'),
+                utc_time=now_utc.strftime('%Y-%m-%d %H:%M:%S'),
+                equity=f"{account_info.equity:.2f}",
+                balance=f"{account_info.balance:.2f}",
+                open_positions=len(open_positions),
+                window_status=window_status,
+                cb_status=f"HALTED ({cb_state.reason})" if cb_state.halted else "ACTIVE",
+                adjusted_risk=cb_state.adjusted_risk_percent,
+                adjusted_confidence=cb_state.adjusted_confidence_threshold,
+                recent_signals=len(recent_signals),
+                total_trades=total_trades,
+                recent_wins=recent_wins,
+                recent_losses=recent_losses,
+                signal_outcome=signal_outcome_info
+            ))
+            self._last_status_key = status_key
+            self._next_status_refresh_at = now + HEARTBEAT_INTERVAL_SECONDS
         
         except Exception as e:
-            logger.debug(f"Error displaying status: {e}")
+            logger.debug("Error displaying status: %s", e)
     
     def shutdown(self) -> None:
         """Shutdown system gracefully."""
         logger.info("Shutting down trading engine...")
         self.running = False
         self.mt5_connector.disconnect()
+        self._io_pool.shutdown(wait=True)
+        self.trade_recorder.close()
         self.database.close()
         logger.info("Shutdown complete")
 
@@ -734,7 +970,12 @@ def main():
             sys.exit(1)
         
         # Run main loop
-        loop.run()
+        if loop.execution_config.get('async_loop', False):
+            if uvloop is not None:
+                uvloop.install()
+            asyncio.run(loop.run_async())
+        else:
+            loop.run()
     
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
@@ -3,6 +3,8 @@ OHLC data processing and validation.
 """
 from typing import List, Dict, Any, Optional
 from datetime import datetime
+import numpy as np
+from ..utils.types import CandleBatch
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -24,7 +26,7 @@ class CandleProcessor:
             True if valid, False otherwise
         """
         if not candles or len(candles) < min_count:
-            logger.warning(f"Insufficient candles: {len(candles) if candles else 0} < {min_count}")
+            logger.warning("Insufficient candles: %d < %d", len(candles) if candles else 0, min_count)
             return False
         
         for i, candle in enumerate(candles):
@@ -32,23 +34,55 @@ class CandleProcessor:
             required_fields = ['time', 'open', 'high', 'low', 'close']
             for field in required_fields:
                 if field not in candle:
-                    logger.warning(f"Candle {i} missing field: {field}")
+                    logger.warning("Candle %d missing field: %s", i, field)
                     return False
             
             # Validate price relationships
             if not (candle['low'] <= candle['open'] <= candle['high'] and
                     candle['low'] <= candle['close'] <= candle['high']):
-                logger.warning(f"Candle {i} has invalid price relationships")
+                logger.warning("Candle %d has invalid price relationships", i)
                 return False
             
             # Check for zero or negative prices
             if any(price <= 0 for price in [candle['open'], candle['high'], 
                                            candle['low'], candle['close']]):
-                logger.warning(f"Candle {i} has invalid prices")
+                logger.warning("Candle %d has invalid prices", i)
                 return False
         
         return True
     
+    @staticmethod
+    def validate_batch(batch: CandleBatch, min_count: int = 1) -> bool:
+        """
+        Validate a CandleBatch in one vectorized pass.
+        
+        Field presence and types are guaranteed by the batch itself, so only
+        price relationships and positivity are checked.
+        
+        Args:
+            batch: Candle batch
+            min_count: Minimum number of candles required
+        
+        Returns:
+            True if valid, False otherwise
+        """
+        if len(batch) < min_count:
+            logger.warning("Insufficient candles: %d < %d", len(batch), min_count)
+            return False
+        
+        valid = ((batch.low <= batch.open) & (batch.open <= batch.high) &
+                 (batch.low <= batch.close) & (batch.close <= batch.high) &
+                 (batch.low > 0))
+        if valid.all():
+            return True
+        
+        i = int(np.argmin(valid))
+        if batch.low[i] <= 0:
+            logger.warning("Candle %d has invalid prices", i)
+        else:
+            logger.warning("Candle %d has invalid price relationships", i)
+        return False
+    
     @staticmethod
     def clean_candles(candles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -144,10 +178,10 @@ class CandleProcessor:
         Returns:
             Body ratio (0-1)
         """
-        range_size = CandleProcessor.calculate_range(candle)
+        range_size = candle['high'] - candle['low']
         if range_size == 0:
             return 0.0
-        return CandleProcessor.calculate_body_size(candle) / range_size
+        return abs(candle['close'] - candle['open']) / range_size
     
     @staticmethod
     def is_bullish(candle: Dict[str, Any]) -> bool:
@@ -186,7 +220,8 @@ class CandleProcessor:
         Returns:
             Upper wick size
         """
-        return candle['high'] - max(candle['open'], candle['close'])
+        open_, close = candle['open'], candle['close']
+        return candle['high'] - (open_ if open_ > close else close)
     
     @staticmethod
     def calculate_lower_wick(candle: Dict[str, Any]) -> float:
@@ -199,7 +234,8 @@ class CandleProcessor:
         Returns:
             Lower wick size
         """
-        return min(candle['open'], candle['close']) - candle['low']
+        open_, close = candle['open'], candle['close']
+        return (open_ if open_ < close else close) - candle['low']
     
     @staticmethod
     def calculate_max_wick(candle: Dict[str, Any]) -> float:
@@ -214,7 +250,7 @@ class CandleProcessor:
         """
         upper_wick = CandleProcessor.calculate_upper_wick(candle)
         lower_wick = CandleProcessor.calculate_lower_wick(candle)
-        return max(upper_wick, lower_wick)
+        return upper_wick if upper_wick > lower_wick else lower_wick
     
     @staticmethod
     def calculate_wick_ratio(candle: Dict[str, Any]) -> float:
@@ -227,10 +263,18 @@ class CandleProcessor:
         Returns:
             Wick ratio (0-1), where 1.0 means entire range is wick
         """
-        range_size = CandleProcessor.calculate_range(candle)
+        # Single read of each field; upper/lower wick inlined
+        high, low = candle['high'], candle['low']
+        range_size = high - low
         if range_size == 0:
             return 0.0
-        max_wick = CandleProcessor.calculate_max_wick(candle)
-        return max_wick / range_size
+        open_, close = candle['open'], candle['close']
+        if open_ > close:
+            upper_wick = high - open_
+            lower_wick = close - low
+        else:
+            upper_wick = high - close
+            lower_wick = open_ - low
+        return (upper_wick if upper_wick > lower_wick else lower_wick) / range_size
 
 
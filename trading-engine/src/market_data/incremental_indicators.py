@@ -0,0 +1,184 @@
+"""
+Rolling EMA/RSI/ATR state that advances only by newly closed candles.
+"""
+from collections import deque
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Deque
+from ..utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class IncrementalIndicators:
+    """
+    Incremental EMA, RSI and ATR for a single timeframe.
+    
+    Each cycle fetches a fixed window whose last candle is still forming, but
+    only one or two candles actually close between cycles. Closed candles are
+    folded into the running state exactly once (O(1) each); the forming candle
+    is evaluated provisionally on top of that state without being committed.
+    
+    The state is seeded the same way as the full-window functions in
+    indicators.py (SMA seed for EMA/ATR, simple gain/loss averages for RSI),
+    so the first update matches a full recompute. After that EMA and ATR keep
+    their full history instead of being re-seeded at the window start.
+    """
+    
+    def __init__(self, ema_period: int = 21, rsi_period: int = 14,
+                 atr_period: int = 14, window: int = 30):
+        """
+        Initialize indicator state.
+        
+        Args:
+            ema_period: EMA period
+            rsi_period: RSI period
+            atr_period: ATR period
+            window: Number of candles fetched per cycle; output series are capped
+                to the lengths a full recompute over this window would produce
+        """
+        self.ema_period = ema_period
+        self.rsi_period = rsi_period
+        self.atr_period = atr_period
+        self.window = window
+        
+        self._ema_multiplier = 2.0 / (ema_period + 1)
+        self._atr_decay = atr_period - 1
+        
+        self.reset()
+    
+    def reset(self) -> None:
+        """Drop all state; the next update re-seeds from its candle window."""
+        self.last_candle_time: Optional[datetime] = None
+        self.ema_last: Optional[float] = None
+        self.atr_last: Optional[float] = None
+        self._prev_close: Optional[float] = None
+        self._closes_seen = 0
+        self._ema_seed_sum = 0.0
+        self._atr_seed_sum = 0.0
+        self._rsi_deltas: Deque[float] = deque(maxlen=self.rsi_period)
+        
+        self._ema_history: Deque[float] = deque(maxlen=max(self.window - self.ema_period, 0))
+        self._rsi_history: Deque[float] = deque(maxlen=max(self.window - self.rsi_period - 1, 0))
+        self._atr_history: Deque[float] = deque(maxlen=max(self.window - self.atr_period - 1, 0))
+    
+    def update(self, candles: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+        """
+        Advance the state with the closed candles of a window and evaluate the forming one.
+        
+        Args:
+            candles: Candle window in chronological order; the last candle is
+                treated as still forming
+        
+        Returns:
+            Dictionary with 'ema', 'rsi' and 'atr' value lists (oldest first),
+            each ending with the provisional value for the forming candle
+        """
+        if not candles:
+            return {'ema': [], 'rsi': [], 'atr': []}
+        
+        closed = candles[:-1]
+        
+        # A gap (e.g. after a disconnect) means the window no longer overlaps our state
+        if (self.last_candle_time is not None and closed
+                and closed[0]['time'] > self.last_candle_time):
+            logger.debug("Candle gap after %s; re-seeding indicator state", self.last_candle_time)
+            self.reset()
+        
+        for candle in closed:
+            if self.last_candle_time is None or candle['time'] > self.last_candle_time:
+                self._commit(candle)
+        
+        forming = candles[-1]
+        if self.last_candle_time is not None and forming['time'] <= self.last_candle_time:
+            # Window did not advance past our state; nothing provisional to add
+            return {
+                'ema': list(self._ema_history),
+                'rsi': list(self._rsi_history),
+                'atr': list(self._atr_history)
+            }
+        
+        return self._evaluate_forming(forming)
+    
+    def _commit(self, candle: Dict[str, Any]) -> None:
+        """Fold one closed candle into the running state."""
+        close = candle['close']
+        self._closes_seen += 1
+        
+        # EMA: SMA seed over the first `ema_period` closes, then the recurrence
+        if self.ema_last is None:
+            self._ema_seed_sum += close
+            if self._closes_seen == self.ema_period:
+                self.ema_last = self._ema_seed_sum / self.ema_period
+                self._ema_history.append(self.ema_last)
+        else:
+            self.ema_last = (close - self.ema_last) * self._ema_multiplier + self.ema_last
+            self._ema_history.append(self.ema_last)
+        
+        if self._prev_close is not None:
+            # RSI: simple averages over the last `rsi_period` deltas
+            self._rsi_deltas.append(close - self._prev_close)
+            if len(self._rsi_deltas) == self.rsi_period:
+                self._rsi_history.append(self._rsi(self._rsi_deltas))
+            
+            # ATR: SMA seed over the first `atr_period` true ranges, then Wilder's smoothing
+            tr = self._true_range(candle, self._prev_close)
+            if self.atr_last is None:
+                self._atr_seed_sum += tr
+                if self._closes_seen - 1 == self.atr_period:
+                    self.atr_last = self._atr_seed_sum / self.atr_period
+                    self._atr_history.append(self.atr_last)
+            else:
+                self.atr_last = (self.atr_last * self._atr_decay + tr) / self.atr_period
+                self._atr_history.append(self.atr_last)
+        
+        self._prev_close = close
+        self.last_candle_time = candle['time']
+    
+    def _evaluate_forming(self, candle: Dict[str, Any]) -> Dict[str, List[float]]:
+        """Series for the committed state plus provisional values for the forming candle."""
+        close = candle['close']
+        ema_values = list(self._ema_history)
+        rsi_values = list(self._rsi_history)
+        atr_values = list(self._atr_history)
+        
+        if self.ema_last is not None:
+            ema_values.append((close - self.ema_last) * self._ema_multiplier + self.ema_last)
+        elif self._closes_seen + 1 == self.ema_period:
+            ema_values.append((self._ema_seed_sum + close) / self.ema_period)
+        
+        if self._prev_close is not None:
+            if len(self._rsi_deltas) >= self.rsi_period - 1:
+                deltas = list(self._rsi_deltas)[-(self.rsi_period - 1):] if self.rsi_period > 1 else []
+                deltas.append(close - self._prev_close)
+                rsi_values.append(self._rsi(deltas))
+            
+            tr = self._true_range(candle, self._prev_close)
+            if self.atr_last is not None:
+                atr_values.append((self.atr_last * self._atr_decay + tr) / self.atr_period)
+            elif self._closes_seen == self.atr_period:
+                atr_values.append((self._atr_seed_sum + tr) / self.atr_period)
+        
+        return {'ema': ema_values, 'rsi': rsi_values, 'atr': atr_values}
+    
+    def _rsi(self, deltas) -> float:
+        """RSI from a full window of price deltas."""
+        gain = 0.0
+        loss = 0.0
+        for d in deltas:
+            if d > 0:
+                gain += d
+            elif d < 0:
+                loss -= d
+        
+        total = gain + loss
+        if total == 0:
+            return 50.0  # Neutral RSI for flat market
+        # Same as 100 - 100 / (1 + gain/loss), and 100 when loss == 0
+        return 100.0 * gain / total
+    
+    @staticmethod
+    def _true_range(candle: Dict[str, Any], prev_close: float) -> float:
+        """True range of a candle given the previous close."""
+        high = candle['high']
+        low = candle['low']
+        return max(high - low, abs(high - prev_close), abs(low - prev_close))
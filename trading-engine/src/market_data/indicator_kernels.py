@@ -0,0 +1,109 @@
+"""
+Compiled indicator kernels (EMA, RSI, ATR) over float64 NumPy arrays.
+
+Kernels carry explicit signatures so numba compiles them eagerly instead of
+on the first live cycle: rsi_kernel at import (cached on disk), the EMA/ATR
+kernels when their per-period specialization is built. Callers
+are responsible for length checks; kernels assume enough data. Each kernel
+writes into a caller-supplied output array of exactly the result length
+(so steady-state callers can reuse buffers) and returns it. Kernels make a
+single pass over the input with no intermediate arrays; fastmath lets LLVM
+fuse the recurrences into FMAs.
+"""
+from ..utils.jit import njit
+
+
+@njit('float64[::1](float64[::1], int64, float64[::1])', cache=True, fastmath=True)
+def rsi_kernel(prices, period, out):
+    """
+    RSI using simple gain/loss averages over each `period`-delta window (out: n - period).
+    
+    Window sums are rolled forward in O(1) per bar. The number of non-zero
+    gains/losses in the window is tracked alongside so an all-zero side is
+    exactly zero rather than a rounding residue of add/subtract.
+    """
+    n_deltas = prices.shape[0] - 1
+    gain = 0.0
+    loss = 0.0
+    n_gain = 0
+    n_loss = 0
+    for k in range(n_deltas):
+        d = prices[k + 1] - prices[k]
+        if d > 0:
+            gain += d
+            n_gain += 1
+        elif d < 0:
+            loss -= d
+            n_loss += 1
+        if k >= period:
+            d = prices[k - period + 1] - prices[k - period]
+            if d > 0:
+                gain -= d
+                n_gain -= 1
+            elif d < 0:
+                loss += d
+                n_loss -= 1
+        if k < period - 1:
+            continue
+        if n_gain == 0:
+            gain = 0.0
+        if n_loss == 0:
+            loss = 0.0
+        if n_gain == 0 and n_loss == 0:
+            out[k - period + 1] = 50.0  # Flat market
+        else:
+            # Same as 100 - 100 / (1 + gain/loss), and 100 when loss == 0
+            out[k - period + 1] = 100.0 * gain / (gain + loss)
+    return out
+
+
+def specialize_ema_kernel(period):
+    """
+    Compile an EMA kernel with `period` and its derived constants frozen in.
+    
+    numba treats closure variables as compile-time constants, so the SMA
+    divisor and multiplier are folded and the seed loop has a fixed trip
+    count. Closures are not disk-cached; each specialization compiles once
+    per process (callers memoize per period).
+    """
+    multiplier = 2.0 / (period + 1)
+    inv_period = 1.0 / period
+    
+    @njit('float64[::1](float64[::1], float64[::1])', fastmath=True)
+    def kernel(prices, out):
+        n = prices.shape[0]
+        last = 0.0
+        for i in range(period):
+            last += prices[i]
+        last *= inv_period
+        out[0] = last
+        for i in range(period, n):
+            last = (prices[i] - last) * multiplier + last
+            out[i - period + 1] = last
+        return out
+    
+    return kernel
+
+
+def specialize_atr_kernel(period):
+    """Compile an ATR kernel with `period` and its Wilder constants frozen in (see specialize_ema_kernel)."""
+    inv_period = 1.0 / period
+    decay = period - 1.0
+    
+    @njit('float64[::1](float64[::1], float64[::1], float64[::1], float64[::1])', fastmath=True)
+    def kernel(high, low, close, out):
+        n = high.shape[0]
+        last = 0.0
+        for i in range(1, n):
+            tr = max(high[i] - low[i], max(abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1])))
+            if i < period:
+                last += tr
+            elif i == period:
+                last = (last + tr) * inv_period
+                out[0] = last
+            else:
+                last = (last * decay + tr) * inv_period
+                out[i - period] = last
+        return out
+    
+    return kernel
@@ -1,84 +1,239 @@
 """
 Technical indicator calculations: EMA, RSI, ATR, swing points, trend detection.
 """
-from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Tuple, Optional, Callable, Sequence, Union
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from ..utils.jit import NUMBA_AVAILABLE
+from ..utils.types import CandleBatch
 from ..utils.logger import setup_logger
+from .indicator_kernels import rsi_kernel, specialize_ema_kernel, specialize_atr_kernel
 
 logger = setup_logger(__name__)
 
 
-def calculate_ema(prices: List[float], period: int) -> List[float]:
+@dataclass
+class IndicatorBuffers:
     """
-    Calculate Exponential Moving Average.
+    Output arrays reused by the compiled indicator kernels across cycles.
+    
+    Each buffer must be at least as long as the indicator series it receives
+    (the candle count is always enough). The pure-Python fallback ignores them.
+    """
+    m5_ema: np.ndarray
+    m1_rsi: np.ndarray
+    m5_rsi: np.ndarray
+    m5_atr: np.ndarray
+    
+    @classmethod
+    def allocate(cls, size: int) -> 'IndicatorBuffers':
+        """
+        Allocate all buffers for a given candle window.
+        
+        Args:
+            size: Candles per timeframe fetched each cycle
+        
+        Returns:
+            IndicatorBuffers
+        """
+        return cls(*(np.empty(size, dtype=np.float64) for _ in range(4)))
+
+
+def _output(out: Optional[np.ndarray], length: int) -> np.ndarray:
+    """Leading `length` slice of a reusable buffer, or a fresh array if none fits."""
+    if out is not None and out.shape[0] >= length:
+        return out[:length]
+    return np.empty(length, dtype=np.float64)
+
+
+@lru_cache(maxsize=None)
+def make_ema(period: int) -> Callable[..., List[float]]:
+    """
+    Build an EMA function specialized for a fixed period.
+    
+    The period-dependent constants (multiplier, SMA divisor) are computed once
+    and captured by the returned closure. Factories are memoized, so repeated
+    calls with the same period return the same function. When numba is
+    available the closure dispatches to the compiled kernel.
     
     Args:
-        prices: List of price values
         period: EMA period
     
     Returns:
-        List of EMA values
+        Function mapping a list of prices (and an optional reusable output
+        buffer, see IndicatorBuffers) to a list of EMA values
     """
-    if len(prices) < period:
-        logger.warning(f"Insufficient data for EMA{period}: {len(prices)} < {period}")
-        return []
-    
-    ema_values = []
     multiplier = 2.0 / (period + 1)
+    inv_period = 1.0 / period
+    kernel = specialize_ema_kernel(period) if NUMBA_AVAILABLE else None
+    
+    def ema(prices: Sequence[float], out: Optional[np.ndarray] = None) -> List[float]:
+        if len(prices) < period:
+            logger.warning("Insufficient data for EMA%d: %d < %d", period, len(prices), period)
+            return []
+        
+        if NUMBA_AVAILABLE:
+            return kernel(np.ascontiguousarray(prices, dtype=np.float64),
+                          _output(out, len(prices) - period + 1)).tolist()
+        
+        values = np.asarray(prices, dtype=np.float64)
+        
+        # Start with SMA; the EMA recurrence itself is inherently sequential
+        last = float(values[:period].sum()) * inv_period
+        ema_values = [last]
+        append = ema_values.append
+        
+        # Calculate EMA for remaining values
+        for price in values[period:].tolist():
+            last = (price - last) * multiplier + last
+            append(last)
+        
+        return ema_values
+    
+    ema.__name__ = f"ema{period}"
+    return ema
+
+
+@lru_cache(maxsize=None)
+def make_rsi(period: int = 14) -> Callable[..., List[float]]:
+    """
+    Build an RSI function specialized for a fixed period (memoized per period).
+    
+    Args:
+        period: RSI period
     
-    # Start with SMA
-    sma = sum(prices[:period]) / period
-    ema_values.append(sma)
+    Returns:
+        Function mapping a list of closing prices (and an optional reusable
+        output buffer) to a list of RSI values (0-100)
+    """
+    min_length = period + 1
     
-    # Calculate EMA for remaining values
-    for price in prices[period:]:
-        ema = (price - ema_values[-1]) * multiplier + ema_values[-1]
-        ema_values.append(ema)
+    def rsi(prices: Sequence[float], out: Optional[np.ndarray] = None) -> List[float]:
+        if len(prices) < min_length:
+            logger.warning("Insufficient data for RSI%d: %d < %d", period, len(prices), min_length)
+            return []
+        
+        if NUMBA_AVAILABLE:
+            return rsi_kernel(np.ascontiguousarray(prices, dtype=np.float64), period,
+                              _output(out, len(prices) - period)).tolist()
+        
+        deltas = np.diff(np.asarray(prices, dtype=np.float64))
+        gains = np.where(deltas > 0, deltas, 0.0)
+        losses = np.where(deltas < 0, -deltas, 0.0)
+        
+        # Gain/loss totals over every `period`-delta window in one pass
+        gain = sliding_window_view(gains, period).sum(axis=1)
+        loss = sliding_window_view(losses, period).sum(axis=1)
+        
+        # 100 - 100 / (1 + gain/loss) == 100 * gain / (gain + loss); covers loss == 0
+        # (-> 100) directly, leaving only the flat window (both zero) as neutral 50
+        total = gain + loss
+        rsi_values = np.full_like(total, 50.0)
+        np.divide(100.0 * gain, total, out=rsi_values, where=total > 0)
+        
+        return rsi_values.tolist()
     
-    return ema_values
+    rsi.__name__ = f"rsi{period}"
+    return rsi
 
 
-def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+def calculate_true_range(high: Sequence[float], low: Sequence[float], close: Sequence[float]) -> np.ndarray:
     """
-    Calculate Relative Strength Index.
+    Calculate true range for every candle after the first.
     
     Args:
-        prices: List of closing prices
-        period: RSI period (default: 14)
+        high: High prices
+        low: Low prices
+        close: Closing prices
     
     Returns:
-        List of RSI values (0-100)
+        Array of len(high) - 1 true ranges
+    """
+    h = np.asarray(high, dtype=np.float64)
+    l = np.asarray(low, dtype=np.float64)
+    prev_close = np.asarray(close, dtype=np.float64)[:-1]
+    h = h[1:]
+    l = l[1:]
+    return np.maximum.reduce([h - l, np.abs(h - prev_close), np.abs(l - prev_close)])
+
+
+@lru_cache(maxsize=None)
+def make_atr(period: int = 14) -> Callable[..., List[float]]:
     """
-    if len(prices) < period + 1:
-        logger.warning(f"Insufficient data for RSI{period}: {len(prices)} < {period + 1}")
-        return []
+    Build an ATR function specialized for a fixed period (memoized per period).
     
-    rsi_values = []
-    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
+    Args:
+        period: ATR period
     
-    for i in range(period, len(deltas) + 1):
-        period_deltas = deltas[i-period:i]
+    Returns:
+        Function mapping (high, low, close) lists (and an optional reusable
+        output buffer) to a list of ATR values
+    """
+    inv_period = 1.0 / period
+    decay = period - 1
+    min_length = period + 1
+    kernel = specialize_atr_kernel(period) if NUMBA_AVAILABLE else None
+    
+    def atr(high: Sequence[float], low: Sequence[float], close: Sequence[float],
+            out: Optional[np.ndarray] = None) -> List[float]:
+        if len(high) < min_length or len(low) < min_length or len(close) < min_length:
+            logger.warning("Insufficient data for ATR%d", period)
+            return []
         
-        # Check for flat market (all deltas are zero)
-        if all(d == 0 for d in period_deltas):
-            rsi = 50  # Neutral RSI for flat market
-            rsi_values.append(rsi)
-            continue
+        if NUMBA_AVAILABLE:
+            return kernel(
+                np.ascontiguousarray(high, dtype=np.float64),
+                np.ascontiguousarray(low, dtype=np.float64),
+                np.ascontiguousarray(close, dtype=np.float64),
+                _output(out, len(high) - period)
+            ).tolist()
         
-        gains = [d for d in period_deltas if d > 0]
-        losses = [-d for d in period_deltas if d < 0]
+        true_ranges = calculate_true_range(high, low, close)
         
-        avg_gain = sum(gains) / period if gains else 0
-        avg_loss = sum(losses) / period if losses else 0
+        # Initial ATR is SMA of first period TRs
+        last = float(true_ranges[:period].sum()) * inv_period
+        atr_values = [last]
+        append = atr_values.append
         
-        if avg_loss == 0:
-            rsi = 100
-        else:
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
+        # Calculate subsequent ATRs using Wilder's smoothing
+        for tr in true_ranges[period:].tolist():
+            last = (last * decay + tr) * inv_period
+            append(last)
         
-        rsi_values.append(rsi)
+        return atr_values
+    
+    atr.__name__ = f"atr{period}"
+    return atr
+
+
+def calculate_ema(prices: List[float], period: int) -> List[float]:
+    """
+    Calculate Exponential Moving Average.
+    
+    Args:
+        prices: List of price values
+        period: EMA period
+    
+    Returns:
+        List of EMA values
+    """
+    return make_ema(period)(prices)
+
+
+def calculate_rsi(prices: List[float], period: int = 14) -> List[float]:
+    """
+    Calculate Relative Strength Index.
+    
+    Args:
+        prices: List of closing prices
+        period: RSI period (default: 14)
     
-    return rsi_values
+    Returns:
+        List of RSI values (0-100)
+    """
+    return make_rsi(period)(prices)
 
 
 def calculate_atr(high: List[float], low: List[float], close: List[float], period: int = 14) -> List[float]:
@@ -94,69 +249,77 @@ def calculate_atr(high: List[float], low: List[float], close: List[float], perio
     Returns:
         List of ATR values
     """
-    if len(high) < period + 1 or len(low) < period + 1 or len(close) < period + 1:
-        logger.warning(f"Insufficient data for ATR{period}")
-        return []
+    return make_atr(period)(high, low, close)
+
+
+def find_swing_points(highs: np.ndarray, lows: np.ndarray, strength: int = 1) -> Dict[str, List[float]]:
+    """
+    Find fractal pivots in high/low arrays.
     
-    true_ranges = []
-    for i in range(1, len(high)):
-        tr1 = high[i] - low[i]
-        tr2 = abs(high[i] - close[i-1])
-        tr3 = abs(low[i] - close[i-1])
-        true_ranges.append(max(tr1, tr2, tr3))
+    A swing high is a bar whose high is strictly above the highs of the
+    `strength` bars on each side; swing lows mirror this on the lows.
     
-    if len(true_ranges) < period:
-        return []
+    Args:
+        highs: High prices (oldest first)
+        lows: Low prices (oldest first)
+        strength: Bars required on each side of a pivot (1 = 3-bar fractal)
     
-    atr_values = []
-    # Initial ATR is SMA of first period TRs
-    atr = sum(true_ranges[:period]) / period
-    atr_values.append(atr)
+    Returns:
+        Dictionary with 'swing_highs' and 'swing_lows' lists
+    """
+    width = 2 * strength + 1
+    if len(highs) < width:
+        return {'swing_highs': [], 'swing_lows': []}
     
-    # Calculate subsequent ATRs using Wilder's smoothing
-    for i in range(period, len(true_ranges)):
-        atr = (atr * (period - 1) + true_ranges[i]) / period
-        atr_values.append(atr)
+    mid_highs = highs[strength:-strength]
+    mid_lows = lows[strength:-strength]
+    
+    if strength == 1:
+        swing_high_mask = (mid_highs > highs[:-2]) & (mid_highs > highs[2:])
+        swing_low_mask = (mid_lows < lows[:-2]) & (mid_lows < lows[2:])
+    else:
+        # Center must beat every other bar in its window; the center itself ties
+        high_windows = sliding_window_view(highs, width)
+        low_windows = sliding_window_view(lows, width)
+        swing_high_mask = (mid_highs[:, None] >= high_windows).all(axis=1) & \
+            ((mid_highs[:, None] == high_windows).sum(axis=1) == 1)
+        swing_low_mask = (mid_lows[:, None] <= low_windows).all(axis=1) & \
+            ((mid_lows[:, None] == low_windows).sum(axis=1) == 1)
     
-    return atr_values
+    return {
+        'swing_highs': mid_highs[swing_high_mask].tolist(),
+        'swing_lows': mid_lows[swing_low_mask].tolist()
+    }
 
 
-def identify_swing_points(candles: List[Dict[str, Any]], lookback: int = 10) -> Dict[str, List[float]]:
+def identify_swing_points(candles: Union[List[Dict[str, Any]], CandleBatch],
+                          lookback: int = 10) -> Dict[str, List[float]]:
     """
     Identify swing highs and lows on M5 timeframe.
     
     Args:
-        candles: List of candle dictionaries (last N candles)
+        candles: Candle dictionaries or a CandleBatch (last N candles)
         lookback: Number of candles to look back for swing identification
     
     Returns:
         Dictionary with 'swing_highs' and 'swing_lows' lists
     """
     if len(candles) < lookback:
-        logger.warning(f"Insufficient candles for swing points: {len(candles)} < {lookback}")
+        logger.warning("Insufficient candles for swing points: %d < %d", len(candles), lookback)
         return {'swing_highs': [], 'swing_lows': []}
     
-    swing_highs = []
-    swing_lows = []
-    
     # Use last 'lookback' candles
-    recent_candles = candles[-lookback:]
-    
-    for i in range(1, len(recent_candles) - 1):
-        # Check for swing high (higher than neighbors)
-        if (recent_candles[i]['high'] > recent_candles[i-1]['high'] and
-            recent_candles[i]['high'] > recent_candles[i+1]['high']):
-            swing_highs.append(recent_candles[i]['high'])
-        
-        # Check for swing low (lower than neighbors)
-        if (recent_candles[i]['low'] < recent_candles[i-1]['low'] and
-            recent_candles[i]['low'] < recent_candles[i+1]['low']):
-            swing_lows.append(recent_candles[i]['low'])
-    
-    return {
-        'swing_highs': swing_highs,
-        'swing_lows': swing_lows
-    }
+    if isinstance(candles, CandleBatch):
+        highs = candles.high[-lookback:]
+        lows = candles.low[-lookback:]
+    else:
+        recent_candles = candles[-lookback:]
+        count = len(recent_candles)
+        highs = np.fromiter((c['high'] for c in recent_candles), dtype=np.float64, count=count)
+        lows = np.fromiter((c['low'] for c in recent_candles), dtype=np.float64, count=count)
+    
+    # Swing high: higher than both neighbors; swing low: lower than both
+    return find_swing_points(highs, lows)
 
 
 def detect_trend(ema_values: List[float], lookback: int = 3) -> str:
@@ -206,3 +369,21 @@ def calculate_atr_average(atr_values: List[float], period: int = 20) -> float:
     
     return sum(atr_values[-period:]) / period
 
+
+
+def detect_momentum_run(candles: CandleBatch, length: int = 3) -> Tuple[bool, bool]:
+    """
+    Check whether the last `length` candles all closed in the same direction.
+    
+    Args:
+        candles: Candle batch (the last candle may still be forming)
+        length: Number of consecutive candles required
+    
+    Returns:
+        (all_bearish, all_bullish); both False if there are too few candles
+    """
+    if len(candles) < length:
+        return False, False
+    
+    body = candles.close[-length:] - candles.open[-length:]
+    return bool((body < 0).all()), bool((body > 0).all())
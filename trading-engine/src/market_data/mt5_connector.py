@@ -1,14 +1,18 @@
 """
 MetaTrader 5 API connection and data fetching.
 """
+import time
 import MetaTrader5 as mt5  # type: ignore
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-from ..utils.types import AccountInfo
+from ..utils.types import AccountInfo, CandleBatch
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# How often the terminal is actually probed; calls in between trust the last result
+HEALTH_CHECK_INTERVAL_SECONDS = 60.0
+
 
 class MT5Connector:
     """Handles MT5 connection and data operations."""
@@ -19,6 +23,10 @@ class MT5Connector:
         self.login = None
         self.password = None
         self.server = None
+        self.path = None
+        self._last_health_check = 0.0  # time.monotonic() of last terminal probe
+        self._point_cache: Dict[str, float] = {}  # symbol -> point size (static per symbol)
+        self._account_cache: Optional[Tuple[float, AccountInfo]] = None  # (time.monotonic(), info)
     
     def connect(self, login: int, password: str, server: str, path: str = None) -> bool:
         """
@@ -68,6 +76,7 @@ class MT5Connector:
         self.login = login
         self.password = password
         self.server = server
+        self.path = path
         
         authorized = mt5.login(login, password=password, server=server)
         if not authorized:
@@ -82,6 +91,7 @@ class MT5Connector:
             return False
         
         self.connected = True
+        self._last_health_check = time.monotonic()
         logger.info(f"Connected to MT5 account {login} on server {server}")
         logger.info(f"Balance: {account_info.balance}, Equity: {account_info.equity}")
         return True
@@ -91,16 +101,40 @@ class MT5Connector:
         if self.connected:
             mt5.shutdown()
             self.connected = False
+            self._account_cache = None
             logger.info("Disconnected from MT5")
     
     def is_connected(self) -> bool:
         """
         Check connection status.
         
+        The terminal is only probed every HEALTH_CHECK_INTERVAL_SECONDS (or
+        after a failed call); in between, the last known state is trusted.
+        A failed probe triggers one reconnect attempt with the stored credentials.
+        
         Returns:
             True if connected, False otherwise
         """
-        return self.connected and mt5.terminal_info() is not None
+        if not self.connected:
+            return False
+        
+        now = time.monotonic()
+        if now - self._last_health_check < HEALTH_CHECK_INTERVAL_SECONDS:
+            return True
+        
+        self._last_health_check = now
+        if mt5.terminal_info() is not None:
+            return True
+        
+        logger.warning(f"MT5 health check failed: {mt5.last_error()} - attempting reconnect")
+        self.connected = False
+        if self.login is None:
+            return False
+        return self.connect(self.login, self.password, self.server, self.path)
+    
+    def _invalidate_health(self) -> None:
+        """Force a terminal probe on the next is_connected() call."""
+        self._last_health_check = 0.0
     
     def get_candles(self, symbol: str, timeframe: int, count: int) -> List[Dict]:
         """
@@ -114,9 +148,24 @@ class MT5Connector:
         Returns:
             List of candle dictionaries with keys: time, open, high, low, close, volume
         """
+        batch = self.get_candle_batch(symbol, timeframe, count)
+        return batch.to_candles() if batch is not None else []
+    
+    def get_candle_batch(self, symbol: str, timeframe: int, count: int) -> Optional[CandleBatch]:
+        """
+        Fetch OHLC candle data as parallel arrays.
+        
+        Args:
+            symbol: Trading symbol (e.g., 'XAUUSD')
+            timeframe: Timeframe in minutes (1, 5, 15, etc.) or MT5 constant
+            count: Number of candles to fetch
+        
+        Returns:
+            CandleBatch, or None if no candles could be fetched
+        """
         if not self.is_connected():
             logger.error("MT5 not connected")
-            return []
+            return None
         
         # Map integer timeframes to MT5 constants
         timeframe_map = {
@@ -140,21 +189,11 @@ class MT5Connector:
         
         rates = mt5.copy_rates_from_pos(symbol, mt5_timeframe, 0, count)
         if rates is None or len(rates) == 0:
-            logger.warning(f"No candles retrieved for {symbol} on timeframe {timeframe}")
-            return []
-        
-        candles = []
-        for rate in rates:
-            candles.append({
-                'time': datetime.fromtimestamp(rate[0]),
-                'open': float(rate[1]),
-                'high': float(rate[2]),
-                'low': float(rate[3]),
-                'close': float(rate[4]),
-                'volume': int(rate[5])
-            })
+            logger.warning("No candles retrieved for %s on timeframe %s", symbol, timeframe)
+            self._invalidate_health()
+            return None
         
-        return candles
+        return CandleBatch.from_rates(rates)
     
     def get_current_price(self, symbol: str) -> Optional[Dict[str, float]]:
         """
@@ -173,15 +212,18 @@ class MT5Connector:
         tick = mt5.symbol_info_tick(symbol)
         if tick is None:
             logger.error(f"Failed to get tick for {symbol}: {mt5.last_error()}")
+            self._invalidate_health()
             return None
         
-        symbol_info = mt5.symbol_info(symbol)
-        if symbol_info is None:
-            logger.error(f"Failed to get symbol info for {symbol}")
-            return None
+        point = self._point_cache.get(symbol)
+        if point is None:
+            symbol_info = mt5.symbol_info(symbol)
+            if symbol_info is None:
+                logger.error(f"Failed to get symbol info for {symbol}")
+                return None
+            point = self._point_cache[symbol] = symbol_info.point
         
         # Calculate spread in points
-        point = symbol_info.point
         spread_points = (tick.ask - tick.bid) / point
         
         return {
@@ -205,9 +247,10 @@ class MT5Connector:
         account_info = mt5.account_info()
         if account_info is None:
             logger.error(f"Failed to get account info: {mt5.last_error()}")
+            self._invalidate_health()
             return None
         
-        return AccountInfo(
+        info = AccountInfo(
             equity=float(account_info.equity),
             balance=float(account_info.balance),
             margin=float(account_info.margin),
@@ -215,6 +258,26 @@ class MT5Connector:
             margin_level=float(account_info.margin_level) if account_info.margin_level else 0.0,
             currency=account_info.currency
         )
+        self._account_cache = (time.monotonic(), info)
+        return info
+    
+    def get_account_info_cached(self, ttl: float = 1.0) -> Optional[AccountInfo]:
+        """
+        Retrieve account information, reusing a recent snapshot.
+        
+        Intended for display/reporting; order decisions should call
+        get_account_info() for a fresh read.
+        
+        Args:
+            ttl: Maximum age in seconds of a reused snapshot
+        
+        Returns:
+            AccountInfo object or None if error
+        """
+        cached = self._account_cache
+        if cached is not None and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        return self.get_account_info()
     
     def get_open_positions(self, symbol: Optional[str] = None) -> List[Dict]:
         """
@@ -235,6 +298,7 @@ class MT5Connector:
             if mt5.last_error()[0] == mt5.RES_S_OK:  # No positions
                 return []
             logger.error(f"Failed to get positions: {mt5.last_error()}")
+            self._invalidate_health()
             return []
         
         result = []
@@ -249,6 +313,7 @@ class MT5Connector:
                 'tp': float(pos.tp),
                 'profit': float(pos.profit),
                 'time': datetime.fromtimestamp(pos.time),
+                'time_ts': int(pos.time),  # Raw epoch seconds for cheap hold-time math
                 'time_update': datetime.fromtimestamp(pos.time_update)
             })
         
@@ -0,0 +1,86 @@
+"""
+Pure exit-decision arithmetic, free of configuration parsing and side effects.
+
+eval_exit is the compiled scalar check for a single position (the explicit
+signature makes numba compile it at import, cached on disk; without numba it
+runs as plain Python). eval_exit_vec applies the same rules to arrays of
+positions with NumPy. Both return the codes below; ExitStrategy turns them
+into decisions and PositionManager acts on them. A NaN price must fail every
+comparison (hold) in both, so eval_exit is compiled without fastmath.
+"""
+from typing import Any, Tuple
+import numpy as np
+from ..utils.jit import njit
+
+# Result codes; the full-exit codes match EXIT_REASONS index + 1
+EXIT_HOLD = 0
+EXIT_TIME_LIMIT = 1
+EXIT_STOP_LOSS = 2
+EXIT_TAKE_PROFIT = 3
+EXIT_MOMENTUM_REVERSAL = 4
+ADJUST_BREAKEVEN = 5
+
+
+@njit('Tuple((int64, float64))(int64, float64, float64, float64, float64, float64, float64, float64, float64)',
+      cache=True)
+def eval_exit(ptype, po, sl, cp, rrr, buf, be_pct, time_limit_s, hold_s):
+    """
+    Time limit, stop loss, take profit and breakeven checks, cheapest first.
+
+    Returns (code, new_sl); new_sl is only meaningful for ADJUST_BREAKEVEN.
+    Breakeven is reported last so callers can still let a momentum reversal
+    take priority over it.
+    """
+    sign = 1 - 2 * ptype  # +1 buy, -1 sell
+    if hold_s >= time_limit_s:
+        return EXIT_TIME_LIMIT, 0.0
+    if sign * (cp - sl) <= 0:
+        return EXIT_STOP_LOSS, 0.0
+    tp = po + sign * abs(po - sl) * rrr
+    if sign * (cp - tp) >= 0:
+        return EXIT_TAKE_PROFIT, 0.0
+    profit_pct = sign * (cp - po) / po * 100.0
+    if profit_pct >= be_pct:
+        new_sl = po + sign * buf
+        if sign * (new_sl - sl) > 0:
+            return ADJUST_BREAKEVEN, new_sl
+    return EXIT_HOLD, 0.0
+
+
+def eval_exit_vec(types: np.ndarray, po: np.ndarray, sl: np.ndarray, cp: np.ndarray,
+                  time_up: np.ndarray, bearish_run: bool, bullish_run: bool,
+                  cfg: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exit codes for every open position at once, with eval_exit's priorities.
+    
+    Args:
+        types: Position types (0=buy, 1=sell)
+        po: Entry prices
+        sl: Current stop losses
+        cp: Current market price per position
+        time_up: Whether each position has reached its time limit
+        bearish_run: Last three M1 candles all bearish (exits buys)
+        bullish_run: Last three M1 candles all bullish (exits sells)
+        cfg: ExitConfig with the thresholds
+    
+    Returns:
+        (code, new_sl): int8 codes (EXIT_* / ADJUST_BREAKEVEN, 0 = hold) and the
+        breakeven stop loss per position (meaningful where code == ADJUST_BREAKEVEN)
+    """
+    sign = 1 - 2 * types.astype(np.int64)  # +1 buy, -1 sell
+    tp = po + sign * np.abs(po - sl) * cfg.rrr
+    profit_pct = (sign * (cp - po) / po) * 100.0
+    new_sl = po + sign * cfg.breakeven_buffer
+    
+    code = np.select(
+        [
+            time_up,
+            sign * (cp - sl) <= 0,
+            sign * (cp - tp) >= 0,
+            np.where(sign > 0, bearish_run, bullish_run),
+            (profit_pct >= cfg.breakeven_profit_percent) & (sign * (new_sl - sl) > 0)
+        ],
+        [EXIT_TIME_LIMIT, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_MOMENTUM_REVERSAL, ADJUST_BREAKEVEN],
+        EXIT_HOLD
+    ).astype(np.int8)
+    return code, new_sl
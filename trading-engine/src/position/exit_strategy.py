@@ -1,15 +1,91 @@
 """
 Multi-layered exit logic: TP, SL, time, momentum reversal, breakeven protection.
 """
-from typing import Dict, List, Any, Optional
-from datetime import datetime, timedelta
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple
+import numpy as np
 from ..utils.types import Position
 from ..market_data.candle_processor import CandleProcessor
 from ..market_data.indicators import calculate_rsi
+from ..position.exit_kernel import eval_exit, eval_exit_vec, EXIT_HOLD, ADJUST_BREAKEVEN
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Full-exit reasons in priority order; exit codes 1-4 are index + 1
+EXIT_REASONS = ('time_limit', 'stop_loss', 'take_profit', 'momentum_reversal')
+
+
+
+def _close_decision(reason: str) -> MappingProxyType:
+    """Read-only full-exit decision for a fixed reason."""
+    return MappingProxyType({
+        'should_exit': True,
+        'exit_type': reason,
+        'action': 'close',
+        'exit_reason': reason
+    })
+
+
+# Decisions with no per-call data are shared, read-only instances
+_EXIT_DECISIONS = tuple(_close_decision(reason) for reason in EXIT_REASONS)
+_EXIT_MOMENTUM = _EXIT_DECISIONS[EXIT_REASONS.index('momentum_reversal')]
+_EXIT_NONE = MappingProxyType({
+    'should_exit': False,
+    'exit_type': 'none',
+    'action': 'hold',
+    'exit_reason': None
+})
+_PARTIAL_NONE = MappingProxyType({
+    'should_partial_exit': False,
+    'close_percent': 0,
+    'move_sl_to_entry': False,
+    'reason': None
+})
+
+# Bound once so the momentum checks skip the class attribute lookup per candle
+_is_bearish = CandleProcessor.is_bearish
+_is_bullish = CandleProcessor.is_bullish
+
+
+@dataclass(frozen=True, slots=True)
+class ExitConfig:
+    """Exit thresholds parsed once from config, as plain floats in fixed slots."""
+    rrr: float
+    breakeven_buffer: float  # Price units
+    breakeven_profit_percent: float
+    time_limit_seconds: float
+    partial_exit_1_percent: float
+    partial_exit_1_close_percent: float
+    partial_exit_2_percent: float
+    partial_exit_2_close_percent: float
+    
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> 'ExitConfig':
+        """
+        Build exit thresholds from the configuration dictionary.
+        
+        Args:
+            config: Configuration dictionary
+        
+        Returns:
+            ExitConfig instance
+        """
+        exit_config = config.get('exit', {})
+        risk_config = config.get('risk', {})
+        return cls(
+            rrr=float(risk_config.get('risk_reward_ratio', {}).get('preferred', 1.2)),
+            breakeven_buffer=float(exit_config.get('breakeven_buffer_points', 2)) * 0.01,
+            breakeven_profit_percent=float(exit_config.get('breakeven_profit_percent', 0.15)),
+            time_limit_seconds=float(exit_config.get('time_limit_minutes', 15)) * 60,
+            partial_exit_1_percent=float(exit_config.get('partial_exit_1_percent', 0.20)),
+            partial_exit_1_close_percent=float(exit_config.get('partial_exit_1_close_percent', 50)),
+            partial_exit_2_percent=float(exit_config.get('partial_exit_2_percent', 0.35)),
+            partial_exit_2_close_percent=float(exit_config.get('partial_exit_2_close_percent', 30))
+        )
+
 
 class ExitStrategy:
     """Implements multi-layered exit strategy."""
@@ -34,9 +110,13 @@ class ExitStrategy:
         self.partial_exit_2_close_percent = self.exit_config.get('partial_exit_2_close_percent', 30)
         
         self.risk_reward_ratio = self.risk_config.get('risk_reward_ratio', {}).get('preferred', 1.2)
+        
+        # Hot paths read the pre-parsed floats instead of the attributes above
+        self.settings = ExitConfig.from_config(config)
+        self.breakeven_buffer_price = self.settings.breakeven_buffer
     
     def evaluate_exits(self, position: Position, market_data: Dict[str, Any],
-                       indicators: Dict[str, Any], entry_time: datetime) -> Dict[str, Any]:
+                       indicators: Dict[str, Any], entry_monotonic: float) -> Mapping[str, Any]:
         """
         Multi-layered exit evaluation (first condition met = exit).
         
@@ -44,10 +124,10 @@ class ExitStrategy:
             position: Open position
             market_data: Current market data with m1_candles
             indicators: Calculated indicators
-            entry_time: Position entry time
+            entry_monotonic: Position entry time on the time.monotonic() clock
         
         Returns:
-            Dictionary with:
+            Read-only mapping (shared between calls) with:
             {
                 should_exit: bool,
                 exit_type: str,
@@ -55,150 +135,158 @@ class ExitStrategy:
                 exit_reason: str | None (only set when should_exit = true)
             }
         """
-        current_time = datetime.now()
-        hold_time = current_time - entry_time
-        hold_time_minutes = hold_time.total_seconds() / 60
+        hold_time_seconds = time.monotonic() - entry_monotonic
         
-        current_price = market_data.get('current_price', position.price_open)
+        cfg = self.settings
+        pot = position.type
+        po = position.price_open
         m1_candles = market_data.get('m1_candles', [])
         
-        # Calculate current profit percentage
-        if position.type == 0:  # Buy position
-            profit_price = current_price - position.price_open
-            profit_percent = (profit_price / position.price_open) * 100
-        else:  # Sell position
-            profit_price = position.price_open - current_price
-            profit_percent = (profit_price / position.price_open) * 100
-        
-        # 1. Take Profit Check
-        stop_distance = abs(position.price_open - position.sl)
-        tp_distance = stop_distance * self.risk_reward_ratio
-        
-        if position.type == 0:  # Buy
-            tp_price = position.price_open + tp_distance
-            if current_price >= tp_price:
-                return {
-                    'should_exit': True,
-                    'exit_type': 'take_profit',
-                    'action': 'close',
-                    'exit_reason': 'take_profit'
-                }
-        else:  # Sell
-            tp_price = position.price_open - tp_distance
-            if current_price <= tp_price:
-                return {
-                    'should_exit': True,
-                    'exit_type': 'take_profit',
-                    'action': 'close',
-                    'exit_reason': 'take_profit'
-                }
-        
-        # 2. Time Limit Check
-        if hold_time_minutes >= self.time_limit_minutes:
-            return {
-                'should_exit': True,
-                'exit_type': 'time_limit',
-                'action': 'close',
-                'exit_reason': 'time_limit'
-            }
+        # 1-3. Time limit, stop loss, take profit (cheapest first) and the
+        # breakeven candidate, in the compiled kernel
+        code, new_sl = eval_exit(
+            pot, po, position.sl, market_data.get('current_price', po),
+            cfg.rrr, cfg.breakeven_buffer, cfg.breakeven_profit_percent,
+            cfg.time_limit_seconds, hold_time_seconds
+        )
+        if EXIT_HOLD < code < ADJUST_BREAKEVEN:
+            return _EXIT_DECISIONS[code - 1]
         
-        # 3. Stop Loss Check (handled by MT5, but we can check if price hit it)
-        if position.type == 0:  # Buy
-            if current_price <= position.sl:
-                return {
-                    'should_exit': True,
-                    'exit_type': 'stop_loss',
-                    'action': 'close',
-                    'exit_reason': 'stop_loss'
-                }
-        else:  # Sell
-            if current_price >= position.sl:
-                return {
-                    'should_exit': True,
-                    'exit_type': 'stop_loss',
-                    'action': 'close',
-                    'exit_reason': 'stop_loss'
-                }
-        
-        # 4. Momentum Reversal Check
-        if len(m1_candles) >= 3:
-            recent_candles = m1_candles[-3:]
-            
-            if position.type == 0:  # Buy position - check for bearish reversal
-                if all(CandleProcessor.is_bearish(c) for c in recent_candles):
-                    return {
-                        'should_exit': True,
-                        'exit_type': 'momentum_reversal',
-                        'action': 'close',
-                        'exit_reason': 'momentum_reversal'
-                    }
-            else:  # Sell position - check for bullish reversal
-                if all(CandleProcessor.is_bullish(c) for c in recent_candles):
-                    return {
-                        'should_exit': True,
-                        'exit_type': 'momentum_reversal',
-                        'action': 'close',
-                        'exit_reason': 'momentum_reversal'
-                    }
+        # 4. Momentum Reversal Check (buy: bearish run, sell: bullish run)
+        bearish_run, bullish_run = self._momentum_runs(m1_candles, indicators)
+        if bearish_run if pot == 0 else bullish_run:
+            return _EXIT_MOMENTUM
         
         # 5. Breakeven Protection (adjust SL, don't exit)
-        if profit_percent >= self.breakeven_profit_percent:
-            if position.type == 0:  # Buy
-                new_sl = position.price_open + (self.breakeven_buffer_points * 0.01)
-                if position.sl < new_sl:
-                    return {
-                        'should_exit': False,
-                        'exit_type': 'breakeven_protection',
-                        'action': 'adjust_sl',
-                        'exit_reason': None,
-                        'new_sl': new_sl
-                    }
-            else:  # Sell
-                new_sl = position.price_open - (self.breakeven_buffer_points * 0.01)
-                if position.sl > new_sl:
-                    return {
-                        'should_exit': False,
-                        'exit_type': 'breakeven_protection',
-                        'action': 'adjust_sl',
-                        'exit_reason': None,
-                        'new_sl': new_sl
-                    }
+        if code == ADJUST_BREAKEVEN:
+            return {
+                'should_exit': False,
+                'exit_type': 'breakeven_protection',
+                'action': 'adjust_sl',
+                'exit_reason': None,
+                'new_sl': new_sl
+            }
         
         # 6. Partial Exit Logic (check but don't exit fully)
         # This is handled separately in position_manager
         
         # No exit condition met
+        return _EXIT_NONE
+    
+    def evaluate_exits_batch(self, types: np.ndarray, price_open: np.ndarray,
+                             sl: np.ndarray, current_price: np.ndarray,
+                             time_up: np.ndarray, m1_candles: List[Dict[str, Any]],
+                             partials_done: np.ndarray,
+                             indicators: Optional[Dict[str, Any]] = None) -> Dict[str, np.ndarray]:
+        """
+        Evaluate full, breakeven and partial exits for all open positions at once.
+        
+        Same rules and priorities as evaluate_exits/check_partial_exit; the exit
+        arithmetic is exit_kernel.eval_exit_vec, so only positions that need an
+        action are visited in Python.
+        
+        Args:
+            types: Position types (0=buy, 1=sell)
+            price_open: Entry prices
+            sl: Current stop losses
+            current_price: Current market price per position
+            time_up: Whether each position has reached its time limit
+            m1_candles: M1 candles (momentum reversal check)
+            partials_done: Partial exits already taken per position (0, 1 or 2)
+            indicators: Optional indicators with precomputed momentum flags
+        
+        Returns:
+            Dictionary with:
+            {
+                exit_code: int8 array, 0 = hold, EXIT_REASONS index + 1 for a full
+                    exit, ADJUST_BREAKEVEN for a breakeven SL move,
+                new_sl: float array, breakeven SL (valid where ADJUST_BREAKEVEN),
+                partial_level: int8 array, 0 = none, 1/2 = partial exit 1/2
+            }
+        """
+        cfg = self.settings
+        bearish_run, bullish_run = self._momentum_runs(m1_candles, indicators)
+        
+        exit_code, new_sl = eval_exit_vec(
+            types, price_open, sl, current_price, time_up,
+            bearish_run, bullish_run, cfg
+        )
+        
+        sign = 1 - 2 * types.astype(np.int64)  # +1 buy, -1 sell
+        profit_percent = (sign * (current_price - price_open) / price_open) * 100
+        partial_level = np.select(
+            [
+                (partials_done == 0) & (profit_percent >= cfg.partial_exit_1_percent),
+                (partials_done == 1) & (profit_percent >= cfg.partial_exit_2_percent)
+            ],
+            [1, 2],
+            0
+        ).astype(np.int8)
+        
         return {
-            'should_exit': False,
-            'exit_type': 'none',
-            'action': 'hold',
-            'exit_reason': None
+            'exit_code': exit_code,
+            'new_sl': new_sl,
+            'partial_level': partial_level
         }
     
+    @staticmethod
+    def _momentum_runs(m1_candles: List[Dict[str, Any]],
+                       indicators: Optional[Dict[str, Any]]) -> Tuple[bool, bool]:
+        """
+        Whether the last three M1 candles are all bearish / all bullish.
+        
+        Uses the flags computed once per cycle by the market-data layer when
+        present, otherwise checks the candles (short-circuiting on the first
+        candle that breaks the run).
+        
+        Args:
+            m1_candles: M1 candles
+            indicators: Indicators, possibly with 'momentum_3bear'/'momentum_3bull'
+        
+        Returns:
+            (bearish_run, bullish_run)
+        """
+        if indicators and 'momentum_3bear' in indicators:
+            return indicators['momentum_3bear'], indicators['momentum_3bull']
+        
+        if len(m1_candles) < 3:
+            return False, False
+        c_last, c_prev, c_prev2 = m1_candles[-1], m1_candles[-2], m1_candles[-3]
+        bearish_run = _is_bearish(c_last) and _is_bearish(c_prev) and _is_bearish(c_prev2)
+        bullish_run = _is_bullish(c_last) and _is_bullish(c_prev) and _is_bullish(c_prev2)
+        return bearish_run, bullish_run
+    
     def check_partial_exit(self, position: Position, current_price: float,
-                          entry_time: datetime, partial_closed: bool = False) -> Dict[str, Any]:
+                          entry_monotonic: float, partials_done: int = 0) -> Mapping[str, Any]:
         """
         Check if partial exit conditions are met.
         
         Args:
             position: Open position
             current_price: Current market price
-            entry_time: Position entry time
-            partial_closed: Whether partial exit already executed
+            entry_monotonic: Position entry time on the time.monotonic() clock
+            partials_done: Partial exits already taken (0, 1 or 2; a bool
+                means whether the first one was taken)
         
         Returns:
-            Dictionary with partial exit recommendation
+            Read-only mapping with partial exit recommendation
         """
+        # Both partials taken: nothing left to check
+        if partials_done >= 2:
+            return _PARTIAL_NONE
+        
+        cfg = self.settings
+        po = position.price_open
+        
+        sign = 1 - 2 * position.type  # +1 buy, -1 sell
+        
         # Calculate profit percentage
-        if position.type == 0:  # Buy
-            profit_price = current_price - position.price_open
-            profit_percent = (profit_price / position.price_open) * 100
-        else:  # Sell
-            profit_price = position.price_open - current_price
-            profit_percent = (profit_price / position.price_open) * 100
+        profit_percent = (sign * (current_price - po) / po) * 100
         
         # First partial exit at 0.20% profit
-        if profit_percent >= self.partial_exit_1_percent and not partial_closed:
+        if not partials_done:
+            if profit_percent < cfg.partial_exit_1_percent:
+                return _PARTIAL_NONE
             return {
                 'should_partial_exit': True,
                 'close_percent': self.partial_exit_1_close_percent,
@@ -206,8 +294,8 @@ class ExitStrategy:
                 'reason': 'partial_exit_1'
             }
         
-        # Second partial exit at 0.35% profit (if first already done)
-        if profit_percent >= self.partial_exit_2_percent and partial_closed:
+        # Second partial exit at 0.35% profit (first already done)
+        if profit_percent >= cfg.partial_exit_2_percent:
             return {
                 'should_partial_exit': True,
                 'close_percent': self.partial_exit_2_close_percent,
@@ -215,12 +303,7 @@ class ExitStrategy:
                 'reason': 'partial_exit_2'
             }
         
-        return {
-            'should_partial_exit': False,
-            'close_percent': 0,
-            'move_sl_to_entry': False,
-            'reason': None
-        }
+        return _PARTIAL_NONE
 
 
 
@@ -1,10 +1,12 @@
 """
 Monitors open positions and manages exits.
 """
+import time
 from typing import Dict, List, Any, Optional
 from datetime import datetime
-from ..utils.types import Position
-from ..position.exit_strategy import ExitStrategy
+import numpy as np
+from ..position.exit_strategy import ExitStrategy, EXIT_REASONS
+from ..position.exit_kernel import ADJUST_BREAKEVEN
 from ..execution.order_executor import OrderExecutor
 from ..analytics.database import Database
 from ..analytics.trade_recorder import TradeRecorder
@@ -12,12 +14,19 @@ from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Seconds an MT5 positions snapshot is reused before querying the terminal again
+_POSITIONS_SNAPSHOT_TTL = 0.1
+
+# Initial number of partial-exit slots; doubled if more positions are tracked
+_PARTIAL_EXIT_SLOTS = 64
+
 
 class PositionManager:
     """Manages open positions and exit execution."""
     
     def __init__(self, config: Dict[str, Any], order_executor: OrderExecutor,
-                 database: Database, symbol: str = 'XAUUSD'):
+                 database: Database, symbol: str = 'XAUUSD',
+                 trade_recorder: Optional[TradeRecorder] = None):
         """
         Initialize position manager.
         
@@ -26,6 +35,9 @@ class PositionManager:
             order_executor: Order executor instance
             database: Database instance
             symbol: Trading symbol (default: XAUUSD)
+            trade_recorder: Shared trade recorder; pass one with async writes so
+                exit records are written behind the cycle (default: a
+                synchronous recorder of our own)
         """
         self.config = config
         self.order_executor = order_executor
@@ -34,10 +46,27 @@ class PositionManager:
         self.symbol = symbol
         
         # CRITICAL FIX: Initialize trade recorder to properly record exits
-        self.trade_recorder = TradeRecorder(database, symbol)
-        
-        # Track partial exits
-        self.partial_exits = {}  # ticket -> {closed_percent, remaining_lots}
+        self.trade_recorder = trade_recorder or TradeRecorder(database, symbol)
+        
+        # Track partial exits as parallel arrays indexed by a slot per ticket
+        self._pe_level = np.zeros(_PARTIAL_EXIT_SLOTS, dtype=np.int8)  # Partials taken: 0, 1, 2
+        self._pe_closed_pct = np.zeros(_PARTIAL_EXIT_SLOTS, dtype=np.float64)
+        self._pe_remaining = np.zeros(_PARTIAL_EXIT_SLOTS, dtype=np.float64)
+        self._ticket_to_slot: Dict[int, int] = {}
+        self._free_slots: List[int] = list(range(_PARTIAL_EXIT_SLOTS - 1, -1, -1))
+        
+        # Short-lived MT5 positions snapshot shared by lookups outside monitor_positions
+        self._pos_cache: Optional[List[Dict[str, Any]]] = None
+        self._pos_by_ticket: Dict[int, Dict[str, Any]] = {}
+        self._pos_cache_ts = 0.0
+        self._pos_cache_ttl = _POSITIONS_SNAPSHOT_TTL
+        
+        # Entry times from the database, keyed by ticket (dropped once closed)
+        self._entry_time_cache: Dict[int, datetime] = {}
+        # Same entry times on the time.monotonic() clock for hold-time math
+        self._entry_monotonic: Dict[int, float] = {}
+        # Monotonic time at which each position hits the exit time limit
+        self._deadlines: Dict[int, float] = {}
     
     def monitor_positions(self, positions: List[Dict[str, Any]], 
                          market_data: Dict[str, Any],
@@ -54,73 +83,91 @@ class PositionManager:
             List of exit actions taken
         """
         exit_actions = []
-        
-        for pos_dict in positions:
-            # Convert to Position object
-            position = Position(
-                ticket=pos_dict['ticket'],
-                symbol=pos_dict['symbol'],
-                type=pos_dict['type'],
-                volume=pos_dict['volume'],
-                price_open=pos_dict['price_open'],
-                sl=pos_dict['sl'],
-                tp=pos_dict['tp'],
-                profit=pos_dict['profit'],
-                time=pos_dict['time'],
-                partial_closed=pos_dict.get('partial_closed', False),
-                partial_closed_percent=pos_dict.get('partial_closed_percent', 0.0)
-            )
-            
-            # Get entry time from database or position
-            entry_time = self._get_entry_time(position.ticket, position.time)
-            
-            # Evaluate exit conditions
-            exit_eval = self.exit_strategy.evaluate_exits(
-                position, market_data, indicators, entry_time
-            )
-            
-            # Check partial exit
-            partial_info = self.partial_exits.get(position.ticket, {})
-            partial_closed = partial_info.get('closed', False)
-            
-            partial_exit = self.exit_strategy.check_partial_exit(
-                position, market_data.get('current_price', position.price_open),
-                entry_time, partial_closed
-            )
-            
-            # Execute actions
-            if exit_eval['should_exit']:
-                # Full exit
-                result = self.force_close(position.ticket, exit_eval['exit_reason'])
-                exit_actions.append({
-                    'ticket': position.ticket,
-                    'action': 'close',
-                    'reason': exit_eval['exit_reason'],
-                    'result': result
-                })
-            
-            elif exit_eval['action'] == 'adjust_sl':
-                # Adjust stop loss to breakeven
-                result = self.update_stop_loss(position.ticket, exit_eval['new_sl'])
-                exit_actions.append({
-                    'ticket': position.ticket,
-                    'action': 'adjust_sl',
-                    'new_sl': exit_eval['new_sl'],
-                    'result': result
-                })
-            
-            elif partial_exit['should_partial_exit']:
-                # Partial exit
-                close_percent = partial_exit['close_percent']
-                result = self.partial_close(position.ticket, close_percent, 
-                                          partial_exit['move_sl_to_entry'])
-                exit_actions.append({
-                    'ticket': position.ticket,
-                    'action': 'partial_close',
-                    'close_percent': close_percent,
-                    'reason': partial_exit['reason'],
-                    'result': result
-                })
+        if not positions:
+            return exit_actions
+        
+        self._warm_entry_time_cache(positions)
+        
+        # Structure-of-arrays view of the open positions
+        n = len(positions)
+        tickets = [p['ticket'] for p in positions]
+        types = np.fromiter((p['type'] for p in positions), dtype=np.int8, count=n)
+        price_open = np.fromiter((p['price_open'] for p in positions), dtype=np.float64, count=n)
+        sl = np.fromiter((p['sl'] for p in positions), dtype=np.float64, count=n)
+        slots = np.fromiter((self._ticket_to_slot.get(t, -1) for t in tickets),
+                            dtype=np.int64, count=n)
+        partials_done = np.where(slots >= 0, self._pe_level[slots], 0)
+        
+        # Time limit deadline from the database entry time (warmed above) or position
+        deadlines = np.fromiter(
+            (self._get_deadline(p['ticket'], p['time']) for p in positions),
+            dtype=np.float64, count=n
+        )
+        time_up = deadlines <= time.monotonic()
+        
+        current_price = market_data.get('current_price')
+        current_prices = price_open if current_price is None else np.full(n, current_price)
+        
+        # Evaluate exit conditions for all positions at once
+        evaluation = self.exit_strategy.evaluate_exits_batch(
+            types, price_open, sl, current_prices, time_up,
+            market_data.get('m1_candles', []), partials_done, indicators
+        )
+        exit_code = evaluation['exit_code']
+        new_sl = evaluation['new_sl']
+        partial_level = evaluation['partial_level']
+        
+        # Actions reuse this cycle's snapshot instead of re-querying MT5
+        pos_by_ticket = dict(zip(tickets, positions))
+        
+        # Plan every action from the masks first (precedence: close > adjust_sl > partial)
+        close_idx = np.flatnonzero((exit_code > 0) & (exit_code < ADJUST_BREAKEVEN))
+        sl_idx = np.flatnonzero(exit_code == ADJUST_BREAKEVEN)
+        partial_idx = np.flatnonzero((exit_code == 0) & (partial_level > 0))
+        
+        # Then issue them as one burst, most urgent first. The MT5 terminal
+        # connection is not thread-safe, so orders stay on this thread.
+        for i in close_idx:
+            # Full exit
+            ticket = tickets[i]
+            exit_reason = EXIT_REASONS[exit_code[i] - 1]
+            result = self.force_close(ticket, exit_reason, position_cache=pos_by_ticket)
+            exit_actions.append({
+                'ticket': ticket,
+                'action': 'close',
+                'reason': exit_reason,
+                'result': result
+            })
+        
+        for i in sl_idx:
+            # Adjust stop loss to breakeven
+            ticket = tickets[i]
+            target_sl = float(new_sl[i])
+            result = self.update_stop_loss(ticket, target_sl)
+            exit_actions.append({
+                'ticket': ticket,
+                'action': 'adjust_sl',
+                'new_sl': target_sl,
+                'result': result
+            })
+        
+        for i in partial_idx:
+            # Partial exit
+            ticket = tickets[i]
+            if partial_level[i] == 1:
+                close_percent = self.exit_strategy.partial_exit_1_close_percent
+            else:
+                close_percent = self.exit_strategy.partial_exit_2_close_percent
+            result = self.partial_close(ticket, close_percent,
+                                        move_sl_to_entry=partial_level[i] == 1,
+                                        position_cache=pos_by_ticket)
+            exit_actions.append({
+                'ticket': ticket,
+                'action': 'partial_close',
+                'close_percent': close_percent,
+                'reason': f'partial_exit_{partial_level[i]}',
+                'result': result
+            })
         
         return exit_actions
     
@@ -137,11 +184,13 @@ class PositionManager:
         """
         result = self.order_executor.update_stop_loss(ticket, new_sl)
         if result['success']:
+            self._invalidate_positions_snapshot()
             logger.info(f"Updated stop loss for ticket {ticket} to {new_sl}")
         return result
     
     def partial_close(self, ticket: int, percent: float, 
-                     move_sl_to_entry: bool = True) -> Dict[str, Any]:
+                     move_sl_to_entry: bool = True,
+                     position_cache: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Close portion of position.
         
@@ -149,13 +198,13 @@ class PositionManager:
             ticket: Position ticket
             percent: Percentage to close (e.g., 50 for 50%)
             move_sl_to_entry: Whether to move SL to entry after partial close
+            position_cache: Optional ticket -> position map from the current cycle
         
         Returns:
             Result dictionary
         """
         # Get position info
-        positions = self.order_executor.mt5_connector.get_open_positions()
-        position = next((p for p in positions if p['ticket'] == ticket), None)
+        position = self._find_position(ticket, position_cache)
         
         if not position:
             return {
@@ -171,32 +220,29 @@ class PositionManager:
         result = self.order_executor.close_position(ticket, close_volume)
         
         if result['success']:
+            self._invalidate_positions_snapshot()
+            
             # Update tracking
-            if ticket not in self.partial_exits:
-                self.partial_exits[ticket] = {'closed': False, 'remaining_lots': position['volume']}
+            slot = self._ticket_to_slot.get(ticket)
+            if slot is None:
+                slot = self._acquire_slot(ticket)
             
             remaining_lots = position['volume'] - close_volume
-            total_closed_percent = self.partial_exits[ticket].get('closed_percent', 0) + percent
+            total_closed_percent = float(self._pe_closed_pct[slot]) + percent
             
-            self.partial_exits[ticket] = {
-                'closed': True,
-                'closed_percent': total_closed_percent,
-                'remaining_lots': remaining_lots
-            }
+            self._pe_level[slot] = min(self._pe_level[slot] + 1, 2)
+            self._pe_closed_pct[slot] = total_closed_percent
+            self._pe_remaining[slot] = remaining_lots
             
-            # Update database
+            # Update database (queued when the recorder writes asynchronously)
             if self.database:
-                self.database.update_trade_partial_close(ticket, total_closed_percent, remaining_lots)
+                self.trade_recorder.update_trade_partial_close(ticket, total_closed_percent, remaining_lots)
             
             # Move SL to entry if requested
             if move_sl_to_entry:
                 entry_price = position['price_open']
-                buffer_points = self.exit_strategy.breakeven_buffer_points * 0.01
-                
-                if position['type'] == 0:  # Buy
-                    new_sl = entry_price + buffer_points
-                else:  # Sell
-                    new_sl = entry_price - buffer_points
+                sign = 1 - 2 * position['type']  # +1 buy, -1 sell
+                new_sl = entry_price + sign * self.exit_strategy.breakeven_buffer_price
                 
                 self.update_stop_loss(ticket, new_sl)
             
@@ -204,20 +250,21 @@ class PositionManager:
         
         return result
     
-    def force_close(self, ticket: int, reason: str) -> Dict[str, Any]:
+    def force_close(self, ticket: int, reason: str,
+                    position_cache: Optional[Dict[int, Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Emergency close position.
         
         Args:
             ticket: Position ticket
             reason: Reason for close
+            position_cache: Optional ticket -> position map from the current cycle
         
         Returns:
             Result dictionary
         """
         # CRITICAL FIX: Get position info BEFORE closing for exit recording
-        positions = self.order_executor.mt5_connector.get_open_positions()
-        position = next((p for p in positions if p['ticket'] == ticket), None)
+        position = self._find_position(ticket, position_cache)
         
         if not position:
             return {
@@ -228,18 +275,19 @@ class PositionManager:
         # Store info for recording
         entry_price = position['price_open']
         entry_time = self._get_entry_time(ticket, position['time'])
+        entry_monotonic = self._get_entry_monotonic(ticket, entry_time)
         current_pnl = position['profit']
         
         # Close the position
         result = self.order_executor.close_position(ticket)
         
         if result['success']:
+            self._invalidate_positions_snapshot()
             logger.info(f"Force closed position {ticket}: {reason}")
             
             # CRITICAL FIX: Record trade exit in database
             exit_price = result.get('price', entry_price)
-            exit_time = datetime.now()
-            hold_time_seconds = (exit_time - entry_time).total_seconds()
+            hold_time_seconds = time.monotonic() - entry_monotonic
             
             # Record the exit
             self.trade_recorder.record_trade_exit(
@@ -251,8 +299,7 @@ class PositionManager:
             )
             
             # Clean up partial exit tracking
-            if ticket in self.partial_exits:
-                del self.partial_exits[ticket]
+            self.forget_position(ticket)
         
         return result
     
@@ -263,7 +310,7 @@ class PositionManager:
         Returns:
             List of position dictionaries
         """
-        return self.order_executor.mt5_connector.get_open_positions()
+        return self._positions_snapshot()
     
     def _parse_datetime(self, dt_str: str) -> Optional[datetime]:
         """
@@ -281,31 +328,143 @@ class PositionManager:
         if not dt_str:
             return None
         
-        # Try ISO format first (Python 3.7+)
-        try:
-            return datetime.fromisoformat(dt_str.replace('Z', '+00:00'))
-        except (ValueError, AttributeError):
-            pass
-        
-        # Try SQLite datetime format
-        try:
-            return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
-        except (ValueError, AttributeError):
-            pass
-        
-        # Try SQLite datetime with microseconds
+        # Pick the parser from the string's shape instead of trying each in turn
         try:
-            return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S.%f')
-        except (ValueError, AttributeError):
+            if 'T' in dt_str:
+                # ISO format (Python 3.7+)
+                if dt_str.endswith('Z'):
+                    dt_str = dt_str[:-1] + '+00:00'
+                return datetime.fromisoformat(dt_str)
+            
+            n = len(dt_str)
+            if n == 19:
+                # SQLite datetime format
+                return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S')
+            if n == 26 and dt_str[19] == '.':
+                # SQLite datetime with microseconds
+                return datetime.strptime(dt_str, '%Y-%m-%d %H:%M:%S.%f')
+            # Anything else (UTC offsets, shorter fractions): ISO format
+            return datetime.fromisoformat(dt_str)
+        except (ValueError, TypeError, AttributeError):
             pass
         
         # If all parsing fails, return None
         logger.warning(f"Failed to parse datetime string: {dt_str}")
         return None
     
+    def _find_position(self, ticket: int,
+                       position_cache: Optional[Dict[int, Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up an open position by ticket.
+        
+        Args:
+            ticket: Position ticket
+            position_cache: Optional ticket -> position map; MT5 is queried when omitted
+        
+        Returns:
+            Position dictionary or None if not open
+        """
+        if position_cache:
+            return position_cache.get(ticket)
+        self._positions_snapshot()
+        return self._pos_by_ticket.get(ticket)
+    
+    def _positions_snapshot(self) -> List[Dict[str, Any]]:
+        """
+        Open positions from MT5, reused for a short TTL to deduplicate terminal calls.
+        
+        Refreshing the snapshot also rebuilds the ticket index used by _find_position.
+        
+        Returns:
+            List of position dictionaries
+        """
+        now = time.monotonic()
+        if self._pos_cache is None or now - self._pos_cache_ts >= self._pos_cache_ttl:
+            self._pos_cache = self.order_executor.mt5_connector.get_open_positions()
+            self._pos_by_ticket = {p['ticket']: p for p in self._pos_cache}
+            self._pos_cache_ts = now
+        return self._pos_cache
+    
+    def _invalidate_positions_snapshot(self) -> None:
+        """Drop the positions snapshot after an order changed the open positions."""
+        self._pos_cache = None
+        self._pos_by_ticket = {}
+    
+    def _acquire_slot(self, ticket: int) -> int:
+        """
+        Assign a cleared partial-exit slot to a ticket, growing the arrays if full.
+        
+        Args:
+            ticket: Position ticket
+        
+        Returns:
+            Slot index
+        """
+        if not self._free_slots:
+            size = len(self._pe_level)
+            self._pe_level = np.concatenate([self._pe_level, np.zeros(size, dtype=np.int8)])
+            self._pe_closed_pct = np.concatenate([self._pe_closed_pct, np.zeros(size)])
+            self._pe_remaining = np.concatenate([self._pe_remaining, np.zeros(size)])
+            self._free_slots = list(range(2 * size - 1, size - 1, -1))
+        
+        slot = self._free_slots.pop()
+        self._ticket_to_slot[ticket] = slot
+        return slot
+    
+    def _release_slot(self, ticket: int) -> None:
+        """Clear a ticket's partial-exit slot and return it to the free list."""
+        slot = self._ticket_to_slot.pop(ticket, None)
+        if slot is None:
+            return
+        self._pe_level[slot] = 0
+        self._pe_closed_pct[slot] = 0.0
+        self._pe_remaining[slot] = 0.0
+        self._free_slots.append(slot)
+    
+    def forget_position(self, ticket: int) -> None:
+        """
+        Drop partial-exit and entry-time tracking for a position confirmed closed.
+        
+        Only call this once the close is certain (our own close succeeded, or MT5
+        history has the closing deal): an empty positions list can also mean the
+        terminal call failed, and released state would let partial exits repeat.
+        
+        Args:
+            ticket: Position ticket
+        """
+        self._release_slot(ticket)
+        self._entry_time_cache.pop(ticket, None)
+        self._entry_monotonic.pop(ticket, None)
+        self._deadlines.pop(ticket, None)
+    
+    def _warm_entry_time_cache(self, positions: List[Dict[str, Any]]) -> None:
+        """
+        Load entry times for uncached positions in a single database query.
+        
+        Args:
+            positions: List of open positions from MT5
+        """
+        if not self.database:
+            return
+        
+        missing = [p['ticket'] for p in positions if p['ticket'] not in self._entry_time_cache]
+        if not missing:
+            return
+        
+        try:
+            trades = self.database.get_trades_by_tickets(missing)
+        except Exception as e:
+            logger.error(f"Error loading entry times: {e}")
+            return
+        
+        for ticket, trade in trades.items():
+            parsed_time = self._parse_datetime(trade.get('entry_time'))
+            if parsed_time is not None:
+                self._cache_entry_time(ticket, parsed_time)
+    
     def _get_entry_time(self, ticket: int, fallback_time: datetime) -> datetime:
         """
-        Get entry time from database or use fallback.
+        Get entry time from cache or database, or use fallback.
         
         Args:
             ticket: Position ticket
@@ -314,14 +473,44 @@ class PositionManager:
         Returns:
             Entry time
         """
+        cached = self._entry_time_cache.get(ticket)
+        if cached is not None:
+            return cached
+        
         if self.database:
             # Try to get from database
-            trades = self.database.get_trade_history(limit=100)
-            trade = next((t for t in trades if t.get('ticket') == ticket), None)
+            trade = self.database.get_trade_by_ticket(ticket)
             if trade and trade.get('entry_time'):
                 parsed_time = self._parse_datetime(trade['entry_time'])
                 if parsed_time is not None:
+                    self._cache_entry_time(ticket, parsed_time)
                     return parsed_time
         
         return fallback_time
-
+    
+    def _cache_entry_time(self, ticket: int, entry_time: datetime) -> None:
+        """Cache an entry time along with its monotonic-clock equivalent."""
+        self._entry_time_cache[ticket] = entry_time
+        entry_monotonic = self._to_monotonic(entry_time)
+        self._entry_monotonic[ticket] = entry_monotonic
+        self._deadlines[ticket] = entry_monotonic + self.exit_strategy.settings.time_limit_seconds
+    
+    def _get_entry_monotonic(self, ticket: int, fallback_time: datetime) -> float:
+        """Cached monotonic entry time, or the fallback time converted."""
+        entry_monotonic = self._entry_monotonic.get(ticket)
+        if entry_monotonic is None:
+            entry_monotonic = self._to_monotonic(fallback_time)
+        return entry_monotonic
+    
+    def _get_deadline(self, ticket: int, fallback_time: datetime) -> float:
+        """Cached time-limit deadline, or one derived from the fallback entry time."""
+        deadline = self._deadlines.get(ticket)
+        if deadline is None:
+            deadline = (self._get_entry_monotonic(ticket, fallback_time)
+                        + self.exit_strategy.settings.time_limit_seconds)
+        return deadline
+    
+    @staticmethod
+    def _to_monotonic(entry_time: datetime) -> float:
+        """Convert a wall-clock entry time to the time.monotonic() clock."""
+        return time.monotonic() - (datetime.now() - entry_time).total_seconds()
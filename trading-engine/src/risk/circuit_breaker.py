@@ -1,13 +1,23 @@
 """
 Multi-criteria circuit breaker system with graduated response.
 """
-from typing import Dict, List, Any, Optional
+import time
+from types import MappingProxyType
+from typing import Dict, List, Any, Mapping, Optional, Tuple, Union
 from datetime import datetime, timedelta
-from ..utils.types import CircuitBreakerState
+import numpy as np
+from ..utils.types import CircuitBreakerState, TradeHistory
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# The common "keep trading" result is a shared, read-only instance
+_NOT_HALTED = MappingProxyType({
+    'halted': False,
+    'reason': None,
+    'duration_minutes': 0
+})
+
 
 class CircuitBreaker:
     """Implements circuit breaker logic to halt trading under adverse conditions."""
@@ -31,34 +41,66 @@ class CircuitBreaker:
         self.stopouts_in_window = self.cb_config.get('stopouts_in_window', 4)
         self.stopout_window_size = self.cb_config.get('stopout_window_size', 5)
         self.halt_duration_minutes = self.cb_config.get('halt_duration_minutes', 60)
+        self._halt_duration_s = int(self.halt_duration_minutes * 60)
         
         self.graduated_response = self.cb_config.get('graduated_response', {})
+        after_1 = self.graduated_response.get('after_1_loss', {})
+        after_2 = self.graduated_response.get('after_2_losses', {})
+        self._after_1_conf = after_1.get('confidence_threshold', 70)
+        self._after_2_risk = after_2.get('risk_percent', 0.3)
+        self._after_2_conf = after_2.get('confidence_threshold', 75)
+        self._default_risk = config.get('risk', {}).get('risk_per_trade', 0.5)
+        self._default_conf = config.get('signals', {}).get('min_confidence', 60)
+        
+        # Bit masks selecting the newest N trades for each window check
+        self._consecutive_bits = (1 << self.consecutive_losses_threshold) - 1
+        self._window_bits = (1 << self.window_size) - 1
+        self._stopout_window_bits = (1 << self.stopout_window_size) - 1
+        self._max_window = max(self.consecutive_losses_threshold, self.window_size,
+                               self.stopout_window_size, 3)
+        self._bit_weights = np.left_shift(1, np.arange(self._max_window), dtype=np.int64)
         
         # Current state
         self.halted = False
         self.halt_reason = None
         self.halt_start_time = None
+        self.halt_start_monotonic: Optional[float] = None  # Elapsed-time math; halt_start_time is for records
         self.loss_count = 0
-        self.adjusted_risk_percent = config.get('risk', {}).get('risk_per_trade', 0.5)
-        self.adjusted_confidence_threshold = config.get('signals', {}).get('min_confidence', 60)
+        # (risk_percent, confidence_threshold) replaced as one tuple so a reader on
+        # another thread (status display) never pairs a new value with an old one
+        self._adjusted: Tuple[float, float] = (self._default_risk, self._default_conf)
+    
+    @property
+    def adjusted_risk_percent(self) -> float:
+        """Risk per trade after graduated response."""
+        return self._adjusted[0]
     
-    def check_halts(self, trade_history: List[Dict[str, Any]], 
-                   daily_pnl: float, starting_equity: float) -> Dict[str, Any]:
+    @property
+    def adjusted_confidence_threshold(self) -> float:
+        """Minimum signal confidence after graduated response."""
+        return self._adjusted[1]
+    
+    def check_halts(self, trade_history: Union[TradeHistory, List[Dict[str, Any]]], 
+                   daily_pnl: float, starting_equity: float) -> Mapping[str, Any]:
         """
         Evaluate halt conditions.
         
         Args:
-            trade_history: List of recent trades
+            trade_history: Recent trades, newest first (TradeHistory or trade dictionaries)
             daily_pnl: Daily profit/loss
             starting_equity: Starting equity for the day
         
         Returns:
             Dictionary with 'halted', 'reason', 'duration_minutes'
         """
+        halt_duration_minutes = self.halt_duration_minutes
+        if not isinstance(trade_history, TradeHistory):
+            trade_history = TradeHistory.from_trades(trade_history)
+        
         # Check if already halted and if halt period has expired
-        if self.halted and self.halt_start_time:
-            elapsed = (datetime.now() - self.halt_start_time).total_seconds() / 60
-            if elapsed >= self.halt_duration_minutes:
+        if self.halted and self.halt_start_monotonic is not None:
+            remaining_s = self._halt_duration_s - int(time.monotonic() - self.halt_start_monotonic)
+            if remaining_s <= 0:
                 # Halt period expired, check reset conditions
                 if self._check_reset_conditions(trade_history):
                     self._reset()
@@ -68,33 +110,43 @@ class CircuitBreaker:
                         'duration_minutes': 0
                     }
                 else:
+                    # Halt time is used up; only the reset conditions keep it active
                     return {
                         'halted': True,
                         'reason': self.halt_reason,
-                        'duration_minutes': int(self.halt_duration_minutes - elapsed)
+                        'duration_minutes': 0
                     }
         
+        n = len(trade_history)
+        
+        # Loss/stop-out flags for the longest window packed into bitmasks
+        # (bit i = i-th newest trade); each window check is a mask and popcount.
+        # No trades yet (startup): skip the scan entirely.
+        if n:
+            loss_mask, stopout_mask = self._outcome_masks(trade_history)
+        else:
+            loss_mask = stopout_mask = 0
+        
         # Check consecutive losses
-        if len(trade_history) >= self.consecutive_losses_threshold:
-            recent_trades = trade_history[:self.consecutive_losses_threshold]
-            if all(t.get('pnl', 0) < 0 for t in recent_trades):
+        if n >= self.consecutive_losses_threshold:
+            consecutive = self._consecutive_bits
+            if loss_mask & consecutive == consecutive:
                 self._trigger_halt('3_consecutive_losses')
                 return {
                     'halted': True,
                     'reason': '3_consecutive_losses',
-                    'duration_minutes': self.halt_duration_minutes
+                    'duration_minutes': halt_duration_minutes
                 }
         
         # Check losses in window
-        if len(trade_history) >= self.window_size:
-            recent_trades = trade_history[:self.window_size]
-            losses = sum(1 for t in recent_trades if t.get('pnl', 0) < 0)
+        if n >= self.window_size:
+            losses = (loss_mask & self._window_bits).bit_count()
             if losses >= self.losses_in_window:
                 self._trigger_halt('5_losses_in_7_trades')
                 return {
                     'halted': True,
                     'reason': '5_losses_in_7_trades',
-                    'duration_minutes': self.halt_duration_minutes
+                    'duration_minutes': halt_duration_minutes
                 }
         
         # Check daily drawdown
@@ -105,29 +157,24 @@ class CircuitBreaker:
                 return {
                     'halted': True,
                     'reason': 'daily_drawdown_3pct',
-                    'duration_minutes': self.halt_duration_minutes
+                    'duration_minutes': halt_duration_minutes
                 }
         
         # Check stop-out rate
-        if len(trade_history) >= self.stopout_window_size:
-            recent_trades = trade_history[:self.stopout_window_size]
-            stopouts = sum(1 for t in recent_trades if t.get('exit_reason') == 'stop_loss')
+        if n >= self.stopout_window_size:
+            stopouts = (stopout_mask & self._stopout_window_bits).bit_count()
             if stopouts >= self.stopouts_in_window:
                 self._trigger_halt('4_stopouts_in_5_trades')
                 return {
                     'halted': True,
                     'reason': '4_stopouts_in_5_trades',
-                    'duration_minutes': self.halt_duration_minutes
+                    'duration_minutes': halt_duration_minutes
                 }
         
         # Check for graduated response adjustments
-        self._adjust_risk_parameters(trade_history)
+        self._adjust_risk_parameters(loss_mask, n)
         
-        return {
-            'halted': False,
-            'reason': None,
-            'duration_minutes': 0
-        }
+        return _NOT_HALTED
     
     def _trigger_halt(self, reason: str) -> None:
         """Trigger a trading halt."""
@@ -135,6 +182,7 @@ class CircuitBreaker:
             self.halted = True
             self.halt_reason = reason
             self.halt_start_time = datetime.now()
+            self.halt_start_monotonic = time.monotonic()
             
             logger.warning(f"Circuit breaker triggered: {reason}")
             
@@ -150,34 +198,49 @@ class CircuitBreaker:
                     0.0
                 )
     
-    def _adjust_risk_parameters(self, trade_history: List[Dict[str, Any]]) -> None:
+    def _outcome_masks(self, trade_history: TradeHistory) -> Tuple[int, int]:
+        """
+        Pack loss and stop-out flags of the most recent trades into bitmasks.
+        
+        Args:
+            trade_history: Recent trades, newest first
+        
+        Returns:
+            (loss_mask, stopout_mask) with bit i set for the i-th newest trade
+        """
+        k = min(len(trade_history), self._max_window)
+        weights = self._bit_weights[:k]
+        loss_mask = int(weights @ (trade_history.pnl[:k] < 0))
+        stopout_mask = int(weights @ trade_history.stopped_out[:k])
+        return loss_mask, stopout_mask
+    
+    def _adjust_risk_parameters(self, loss_mask: int, n_trades: int) -> None:
         """
         Graduated response to losses.
         
         Args:
-            trade_history: Recent trade history
+            loss_mask: Loss bitmask of recent trades (bit i = i-th newest)
+            n_trades: Number of trades in the history
         """
-        if not trade_history:
+        if not n_trades:
             return
         
-        # Count recent losses
-        recent_losses = sum(1 for t in trade_history[:3] if t.get('pnl', 0) < 0)
+        # Count recent losses (last 3 trades)
+        recent_losses = (loss_mask & 0b111).bit_count()
         self.loss_count = recent_losses
         
         # After 1 loss: increase confidence threshold to 70%
         if recent_losses >= 1:
-            after_1 = self.graduated_response.get('after_1_loss', {})
-            self.adjusted_confidence_threshold = after_1.get('confidence_threshold', 70)
-            logger.info(f"Adjusted confidence threshold to {self.adjusted_confidence_threshold}% after 1 loss")
+            logger.info(f"Adjusted confidence threshold to {self._after_1_conf}% after 1 loss")
         
         # After 2 losses: reduce risk to 0.3%, confidence to 75%, tighten spread
         if recent_losses >= 2:
-            after_2 = self.graduated_response.get('after_2_losses', {})
-            self.adjusted_risk_percent = after_2.get('risk_percent', 0.3)
-            self.adjusted_confidence_threshold = after_2.get('confidence_threshold', 75)
-            logger.info(f"Adjusted risk to {self.adjusted_risk_percent}% and confidence to {self.adjusted_confidence_threshold}% after 2 losses")
+            self._adjusted = (self._after_2_risk, self._after_2_conf)
+            logger.info(f"Adjusted risk to {self._after_2_risk}% and confidence to {self._after_2_conf}% after 2 losses")
+        elif recent_losses == 1:
+            self._adjusted = (self._adjusted[0], self._after_1_conf)
     
-    def _check_reset_conditions(self, trade_history: List[Dict[str, Any]]) -> bool:
+    def _check_reset_conditions(self, trade_history: TradeHistory) -> bool:
         """
         Check if reset conditions are met.
         
@@ -190,41 +253,19 @@ class CircuitBreaker:
         if len(trade_history) < 2:
             return False
         
+        pnl_values = trade_history.pnl
+        
         # 2 consecutive wins
-        recent_2 = trade_history[:2]
-        if all(t.get('pnl', 0) > 0 for t in recent_2):
+        if pnl_values[0] > 0 and pnl_values[1] > 0:
             logger.info("Reset conditions met: 2 consecutive wins")
             return True
         
         # Single win with >1.5R profit
-        if len(trade_history) >= 1:
-            last_trade = trade_history[0]
-            if last_trade.get('pnl', 0) > 0:
-                # Calculate R (risk amount) from stop loss distance
-                entry_price = last_trade.get('entry_price', 0)
-                stop_loss = last_trade.get('stop_loss', 0)
-                lot_size = last_trade.get('lot_size', 0)
-                direction = last_trade.get('direction', 'buy')
-                pnl = last_trade.get('pnl', 0)
-                
-                if entry_price > 0 and stop_loss > 0 and lot_size > 0:
-                    # Calculate stop distance in price units
-                    if direction == 'buy':
-                        stop_distance_price = entry_price - stop_loss
-                    else:  # sell
-                        stop_distance_price = stop_loss - entry_price
-                    
-                    # For XAUUSD: point value = $1 per point per lot
-                    # R (risk amount) = stop_distance_points * point_value_per_lot * lot_size
-                    # Since stop_distance_price is already in price units, and 1 point = 0.01 for XAUUSD
-                    stop_distance_points = stop_distance_price / 0.01
-                    point_value_per_lot = 1.0  # $1 per point per lot for XAUUSD
-                    risk_amount_r = stop_distance_points * point_value_per_lot * lot_size
-                    
-                    # Check if profit >= 1.5R
-                    if risk_amount_r > 0 and pnl >= risk_amount_r * 1.5:
-                        logger.info(f"Reset conditions met: significant win (P&L={pnl:.2f} >= 1.5R={risk_amount_r * 1.5:.2f})")
-                        return True
+        pnl = float(pnl_values[0])
+        risk_amount_r = float(trade_history.risk_amount_r[0])
+        if risk_amount_r > 0 and pnl >= risk_amount_r * 1.5:
+            logger.info(f"Reset conditions met: significant win (P&L={pnl:.2f} >= 1.5R={risk_amount_r * 1.5:.2f})")
+            return True
         
         return False
     
@@ -233,11 +274,11 @@ class CircuitBreaker:
         self.halted = False
         self.halt_reason = None
         self.halt_start_time = None
+        self.halt_start_monotonic = None
         self.loss_count = 0
         
         # Reset to default parameters
-        self.adjusted_risk_percent = self.config.get('risk', {}).get('risk_per_trade', 0.5)
-        self.adjusted_confidence_threshold = self.config.get('signals', {}).get('min_confidence', 60)
+        self._adjusted = (self._default_risk, self._default_conf)
         
         logger.info("Circuit breaker reset to default parameters")
         
@@ -253,16 +294,18 @@ class CircuitBreaker:
                 0.0
             )
     
-    def reset_conditions(self, trade_history: List[Dict[str, Any]]) -> bool:
+    def reset_conditions(self, trade_history: Union[TradeHistory, List[Dict[str, Any]]]) -> bool:
         """
         Public method to check and apply reset conditions.
         
         Args:
-            trade_history: Recent trade history
+            trade_history: Recent trade history (TradeHistory or trade dictionaries)
         
         Returns:
             True if reset occurred
         """
+        if not isinstance(trade_history, TradeHistory):
+            trade_history = TradeHistory.from_trades(trade_history)
         if self._check_reset_conditions(trade_history):
             self._reset()
             return True
@@ -275,13 +318,14 @@ class CircuitBreaker:
         Returns:
             CircuitBreakerState object
         """
+        risk_percent, confidence_threshold = self._adjusted
         return CircuitBreakerState(
             halted=self.halted,
             reason=self.halt_reason,
             halt_start_time=self.halt_start_time,
             duration_minutes=self.halt_duration_minutes if self.halted else 0,
-            adjusted_risk_percent=self.adjusted_risk_percent,
-            adjusted_confidence_threshold=self.adjusted_confidence_threshold,
+            adjusted_risk_percent=risk_percent,
+            adjusted_confidence_threshold=confidence_threshold,
             loss_count=self.loss_count
         )
 
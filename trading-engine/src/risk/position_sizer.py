@@ -1,11 +1,17 @@
 """
 Position sizing based on risk percentage and stop distance.
 """
+import logging
 from typing import Dict, Any, Optional
 from ..utils.logger import setup_logger
+from .sizing_kernel import lot_size_kernel
 
 logger = setup_logger(__name__)
 
+# SAFETY CONTROLS: hard lot cap and maximum risk per trade, whatever the config says
+HARD_MAX_LOT = 0.10
+MAX_RISK_PERCENT = 2.0
+
 
 class PositionSizer:
     """Calculates lot size based on risk percentage."""
@@ -22,6 +28,14 @@ class PositionSizer:
         self.min_lot_size = self.risk_config.get('min_lot_size', 0.01)
         self.max_lot_size = self.risk_config.get('max_lot_size', 0.30)
         self.preferred_stop_percent = self.risk_config.get('stop_loss_range', {}).get('preferred', 0.30)
+        
+        # Fixed per deployment: micro-lot accounts (0.001 steps) round to 3 decimals,
+        # standard accounts to 2; the configured and hard caps combine into one
+        self._lot_precision = 3 if self.min_lot_size < 0.01 else 2
+        self._lot_cap = min(self.max_lot_size, HARD_MAX_LOT)
+        # Rounding is monotonic, so a clamped size stays >= a minimum that sits on
+        # the lot step; only an off-step minimum needs re-applying after rounding
+        self._min_lot_on_step = round(self.min_lot_size, self._lot_precision) == self.min_lot_size
     
     def calculate_lot_size(self, equity: float, risk_percent: float, 
                           stop_distance_points: float, symbol: str = "XAUUSD") -> float:
@@ -58,63 +72,42 @@ class PositionSizer:
             logger.warning("Stop distance too small, using minimum lot size")
             return self.min_lot_size
         
-        lots = risk_amount / (stop_distance_points * point_value_per_lot)
+        denom = stop_distance_points * point_value_per_lot
         
         # SAFETY CONTROL 1: Hard cap at 0.10 lot maximum
-        HARD_MAX_LOT = 0.10
-        if lots > HARD_MAX_LOT:
-            logger.warning(f"Calculated lot size {lots:.2f} exceeds HARD_MAX_LOT {HARD_MAX_LOT}, capping")
-            lots = HARD_MAX_LOT
-        
-        # Apply configured constraints FIRST (before rounding)
-        lots = max(self.min_lot_size, min(lots, self.max_lot_size))
-        
-        # Round based on minimum lot size precision
-        # If min_lot_size supports micro lots (0.001), round to 3 decimals
-        # Otherwise round to 2 decimals (0.01)
-        if self.min_lot_size < 0.01:
-            # Micro lots: round to 3 decimals (0.001 precision)
-            lots = round(lots, 3)
-        else:
-            # Standard lots: round to 2 decimals (0.01 precision)
-            lots = round(lots, 2)
-        
-        # Final safety check: ensure we never go below minimum
-        lots = max(self.min_lot_size, lots)
-        
-        # SAFETY CONTROL 2: Verify actual risk doesn't exceed 2%
-        actual_risk_amount = lots * stop_distance_points * point_value_per_lot
+        if risk_amount / denom > HARD_MAX_LOT:
+            logger.warning("Calculated lot size %.2f exceeds HARD_MAX_LOT %s, capping",
+                           risk_amount / denom, HARD_MAX_LOT)
+        
+        # SAFETY CONTROL 2: Risk is linear in lots, so the kernel applies the 2%
+        # max-risk limit as a lot cap together with the configured limits
+        min_lot_size = self.min_lot_size
+        lot_precision = self._lot_precision
+        lots = lot_size_kernel(equity, risk_percent, stop_distance_points, point_value_per_lot,
+                               min_lot_size, self._lot_cap, MAX_RISK_PERCENT)
+        
+        # Round to the lot step precision
+        lots = round(lots, lot_precision)
+        if not self._min_lot_on_step and lots < min_lot_size:
+            lots = min_lot_size
+        
+        actual_risk_amount = lots * denom
         actual_risk_percent = (actual_risk_amount / equity) * 100.0
         
         # SAFETY CONTROL 3: Log expected vs actual risk
-        # Use appropriate precision for lot size display
-        lot_precision = 3 if self.min_lot_size < 0.01 else 2
-        logger.info(f"[RISK CHECK] Lot Size: {lots:.{lot_precision}f} | Equity: ${equity:.2f} | "
-                   f"Stop Distance: {stop_distance_points:.1f}pts | "
-                   f"Risk Target: {risk_percent:.2f}% (${risk_amount:.2f}) | "
-                   f"Risk Actual: {actual_risk_percent:.2f}% (${actual_risk_amount:.2f})")
-        
-        # SAFETY CONTROL 4: Assert max risk <= 2%
-        MAX_RISK_PERCENT = 2.0
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("[RISK CHECK] Lot Size: %.*f | Equity: $%.2f | "
+                        "Stop Distance: %.1fpts | "
+                        "Risk Target: %.2f%% ($%.2f) | "
+                        "Risk Actual: %.2f%% ($%.2f)",
+                        lot_precision, lots, equity, stop_distance_points,
+                        risk_percent, risk_amount, actual_risk_percent, actual_risk_amount)
+        
+        # Only reachable when the minimum lot size alone exceeds the limit
+        # (or rounding to the lot step tips it over)
         if actual_risk_percent > MAX_RISK_PERCENT:
-            logger.error(f"[SAFETY VIOLATION] Actual risk {actual_risk_percent:.2f}% exceeds MAX {MAX_RISK_PERCENT}%!")
-            logger.error(f"[SAFETY VIOLATION] Reducing lot size to meet safety limit")
-            # Recalculate lot size to meet max risk
-            max_risk_amount = equity * (MAX_RISK_PERCENT / 100.0)
-            lots = max_risk_amount / (stop_distance_points * point_value_per_lot)
-            lots = max(self.min_lot_size, min(lots, self.max_lot_size))
-            # Round with appropriate precision
-            if self.min_lot_size < 0.01:
-                lots = round(lots, 3)
-            else:
-                lots = round(lots, 2)
-            lots = max(self.min_lot_size, lots)
-            
-            # Recalculate actual risk after adjustment
-            actual_risk_amount = lots * stop_distance_points * point_value_per_lot
-            actual_risk_percent = (actual_risk_amount / equity) * 100.0
-            
-            logger.warning(f"[SAFETY VIOLATION] Adjusted lot size to {lots:.2f} (risk now {actual_risk_percent:.2f}%)")
+            logger.error("[SAFETY VIOLATION] Actual risk %.2f%% exceeds MAX %s%% at lot size %.*f",
+                         actual_risk_percent, MAX_RISK_PERCENT, lot_precision, lots)
         
         return lots
     
@@ -140,7 +133,9 @@ class PositionSizer:
         # Add 3-point safety buffer
         stop_distance_points += 3.0
         
-        logger.debug(f"Stop distance: {stop_distance_points:.1f} points (from config: {stop_percent:.2f} → {stop_percent * 100:.0f} points)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Stop distance: %.1f points (from config: %.2f → %.0f points)",
+                         stop_distance_points, stop_percent, stop_percent * 100)
         
         return stop_distance_points
     
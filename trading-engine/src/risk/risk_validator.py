@@ -1,12 +1,33 @@
 """
 Pre-trade risk validation: spread, ATR, equity checks.
 """
-from typing import Dict, Any, Optional
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Sequence, Tuple, Union
+import numpy as np
 from ..utils.types import Signal, AccountInfo
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Reason codes returned by validate_signals_batch (index into VALIDATION_REASONS),
+# in the order validate_signal applies its checks
+VALID = 0
+REJECT_SPREAD = 1
+REJECT_ATR_SPIKE = 2
+REJECT_EQUITY = 3
+REJECT_MAX_POSITIONS = 4
+VALIDATION_REASONS = (
+    'All validation checks passed',
+    'Spread exceeds session limit',
+    'Extreme ATR spike (likely news event)',
+    'Invalid equity',
+    'Maximum positions already open'
+)
+
+# Passing results with fixed reasons are shared, read-only instances
+_VALID_RESULT = MappingProxyType({'valid': True, 'reason': VALIDATION_REASONS[VALID]})
+_EQUITY_OK = MappingProxyType({'valid': True, 'reason': 'Sufficient equity available'})
+
 
 class RiskValidator:
     """Validates signals before trade execution."""
@@ -23,10 +44,20 @@ class RiskValidator:
         self.atr_config = config.get('atr', {})
         self.execution_config = config.get('execution', {})
         self.max_positions = self.execution_config.get('max_concurrent_positions', 1)
+        
+        # Limits are fixed for the lifetime of the validator
+        self._max_spread = {
+            'prime': self.spread_config.get('prime_max', 25.0),
+            'acceptable': self.spread_config.get('acceptable_max', 35.0),
+            'default': self.spread_config.get('default_max', 30.0)
+        }
+        self._min_atr = self.atr_config.get('min_points', 6.0)
+        self._max_atr = self.atr_config.get('max_points', 12.0)
+        self._spike_mult = self.atr_config.get('spike_multiplier', 1.8)
     
     def validate_signal(self, signal: Signal, market_data: Dict[str, Any],
                         account_info: AccountInfo, config: Dict[str, Any],
-                        session_type: str = 'prime') -> Dict[str, Any]:
+                        session_type: str = 'prime') -> Mapping[str, Any]:
         """
         Pre-trade validation checks.
         
@@ -38,19 +69,19 @@ class RiskValidator:
             session_type: Session type ('prime' or 'acceptable')
         
         Returns:
-            Dictionary with 'valid' (bool) and 'reason' (str)
+            Mapping with 'valid' (bool) and 'reason' (str); a shared read-only
+            instance when all checks pass
         """
         # Check spread
         spread = market_data.get('spread', 0)
-        spread_check = self.check_spread(spread, session_type)
-        if not spread_check['valid']:
-            return spread_check
+        spread_failure = self._spread_failure(spread, session_type)
+        if spread_failure is not None:
+            return spread_failure
         
         # ATR is now scoring-based (handled in signal generator confidence calculation)
         # Only check for extreme spikes that indicate news events (reject those)
         atr_value = market_data.get('atr', 0)
         atr_average = market_data.get('atr_average', 0)
-        spike_multiplier = self.atr_config.get('spike_multiplier', 1.8)
         
         # Only reject extreme ATR spikes (2.5x+ = likely news event)
         if atr_average > 0 and atr_value > atr_average * 2.5:
@@ -75,10 +106,50 @@ class RiskValidator:
                 'reason': f'Maximum positions ({self.max_positions}) already open'
             }
         
-        return {
-            'valid': True,
-            'reason': 'All validation checks passed'
-        }
+        return _VALID_RESULT
+    
+    def validate_signals_batch(self, spread: np.ndarray, atr: np.ndarray,
+                               atr_average: np.ndarray, equity: np.ndarray,
+                               open_positions_count: np.ndarray,
+                               session_types: Union[str, Sequence[str]] = 'prime'
+                               ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply validate_signal's checks to many signals at once (backtesting/analysis).
+        
+        Args:
+            spread: Spread in points per signal
+            atr: ATR per signal
+            atr_average: Average ATR per signal
+            equity: Account equity per signal
+            open_positions_count: Number of open positions per signal
+            session_types: Session type per signal, or one for all
+        
+        Returns:
+            (valid, reason_code): boolean mask and int8 codes indexing
+            VALIDATION_REASONS (first failing check, VALID if none)
+        """
+        spread = np.asarray(spread, dtype=np.float64)
+        atr = np.asarray(atr, dtype=np.float64)
+        atr_average = np.asarray(atr_average, dtype=np.float64)
+        
+        if isinstance(session_types, str):
+            max_spread = self._max_spread.get(session_types, self._max_spread['default'])
+        else:
+            default = self._max_spread['default']
+            max_spread = np.array([self._max_spread.get(s, default) for s in session_types],
+                                  dtype=np.float64)
+        
+        code = np.select(
+            [
+                spread > max_spread,
+                (atr_average > 0) & (atr > atr_average * 2.5),
+                np.asarray(equity) <= 0,
+                np.asarray(open_positions_count) >= self.max_positions
+            ],
+            [REJECT_SPREAD, REJECT_ATR_SPIKE, REJECT_EQUITY, REJECT_MAX_POSITIONS],
+            VALID
+        ).astype(np.int8)
+        return code == VALID, code
     
     def check_spread(self, spread: float, session_type: str = 'prime') -> Dict[str, Any]:
         """
@@ -91,14 +162,16 @@ class RiskValidator:
         Returns:
             Dictionary with 'valid' and 'reason'
         """
-        if session_type == 'prime':
-            max_spread = self.spread_config.get('prime_max', 25.0)
-        elif session_type == 'acceptable':
-            max_spread = self.spread_config.get('acceptable_max', 35.0)
-        else:
-            max_spread = self.spread_config.get('default_max', 30.0)
+        return self._spread_failure(spread, session_type) or {
+            'valid': True,
+            'reason': f'Spread {spread:.2f} within limits'
+        }
+    
+    def _spread_failure(self, spread: float, session_type: str) -> Optional[Dict[str, Any]]:
+        """Spread check that only builds a result when the spread is rejected (None if it passes)."""
+        max_spread = self._max_spread.get(session_type, self._max_spread['default'])
         
-        logger.info(f"Spread check: {spread:.2f} points vs limit {max_spread:.2f} ({session_type} session)")
+        logger.info("Spread check: %.2f points vs limit %.2f (%s session)", spread, max_spread, session_type)
         
         if spread > max_spread:
             return {
@@ -106,11 +179,8 @@ class RiskValidator:
                 'reason': f'Spread {spread:.2f} exceeds limit {max_spread:.2f} for {session_type} session'
             }
         
-        logger.info(f"✓ Spread validation passed: {spread:.2f} <= {max_spread:.2f}")
-        return {
-            'valid': True,
-            'reason': f'Spread {spread:.2f} within limits'
-        }
+        logger.info("✓ Spread validation passed: %.2f <= %.2f", spread, max_spread)
+        return None
     
     def check_atr(self, atr_value: float, atr_average: float) -> Dict[str, Any]:
         """
@@ -123,9 +193,9 @@ class RiskValidator:
         Returns:
             Dictionary with 'valid' and 'reason'
         """
-        min_atr = self.atr_config.get('min_points', 6.0)
-        max_atr = self.atr_config.get('max_points', 12.0)
-        spike_multiplier = self.atr_config.get('spike_multiplier', 1.8)
+        min_atr = self._min_atr
+        max_atr = self._max_atr
+        spike_multiplier = self._spike_mult
         
         if atr_value < min_atr:
             return {
@@ -151,7 +221,7 @@ class RiskValidator:
             'reason': f'ATR {atr_value:.2f} within acceptable range'
         }
     
-    def check_equity(self, equity: float, required_margin: float) -> Dict[str, Any]:
+    def check_equity(self, equity: float, required_margin: float) -> Mapping[str, Any]:
         """
         Ensure sufficient equity for trade.
         
@@ -168,9 +238,6 @@ class RiskValidator:
                 'reason': f'Insufficient equity: {equity:.2f} < {required_margin * 1.1:.2f}'
             }
         
-        return {
-            'valid': True,
-            'reason': 'Sufficient equity available'
-        }
+        return _EQUITY_OK
 
 
@@ -0,0 +1,30 @@
+"""
+Pure lot-size arithmetic, free of configuration and logging.
+
+lot_size_kernel carries an explicit signature so numba compiles it at import
+(cached on disk); without numba it runs as plain Python. PositionSizer
+validates inputs, resolves the limits from config and logs around it, so
+backtest sweeps that size millions of trades only pay for the arithmetic.
+"""
+from ..utils.jit import njit
+
+
+@njit('float64(float64, float64, float64, float64, float64, float64, float64)', cache=True)
+def lot_size_kernel(equity, risk_percent, stop_distance_points, point_value_per_lot,
+                    min_lot, lot_cap, max_risk_percent):
+    """
+    Lot size for a risk percentage, clamped to the lot limits (not yet rounded).
+
+    Risk is linear in lots, so the max-risk limit is applied as a lot cap
+    alongside lot_cap (configured max and hard cap combined). The result is
+    never below min_lot, even if min_lot alone exceeds the risk limit.
+    Rounding to the lot step is left to the caller: numba's round() does not
+    break decimal ties exactly like Python's, and lot sizes must match.
+    """
+    denom = stop_distance_points * point_value_per_lot
+    lots = equity * (risk_percent / 100.0) / denom
+    max_risk_lots = equity * (max_risk_percent / 100.0) / denom
+    # Clamp with plain comparisons (minsd/maxsd when compiled, no builtin call otherwise)
+    hi = lot_cap if lot_cap < max_risk_lots else max_risk_lots
+    lots = lots if lots < hi else hi
+    return min_lot if lots < min_lot else lots
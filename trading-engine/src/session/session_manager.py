@@ -1,12 +1,65 @@
 """
 Time-based trading windows and session management (Local Time).
 """
-from typing import Dict, List, Any, Optional
+from bisect import bisect_right
+from dataclasses import dataclass
+from time import monotonic_ns
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, time, timedelta
+import numpy as np
+from ..utils.types import SessionResult
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Session ids (SessionResult.session_id), for get_risk_multiplier_by_id
+SESSION_PRIME = 0
+SESSION_ACCEPTABLE = 1
+SESSION_CLOSED = 2
+_SESSION_IDS = {'prime': SESSION_PRIME, 'acceptable': SESSION_ACCEPTABLE}
+
+# Default: closed (no active window configured)
+_CLOSED_DEFAULT = SessionResult(
+    active=False,
+    session_type='closed',
+    risk_multiplier=0.0,
+    reason='No active trading window',
+    session_id=SESSION_CLOSED
+)
+_CLOSED_FRIDAY = SessionResult(
+    active=False,
+    session_type='closed',
+    risk_multiplier=0.0,
+    reason='Friday after cut-off Local Time',
+    session_id=SESSION_CLOSED
+)
+_CLOSED_EARLY = SessionResult(
+    active=False,
+    session_type='closed',
+    risk_multiplier=0.0,
+    reason='Outside trading hours (early morning)',
+    session_id=SESSION_CLOSED
+)
+
+# Minute-map codes for the closed results; windows are numbered after these
+_CODE_CLOSED = 0
+_CODE_FRIDAY = 1
+_CODE_EARLY = 2
+
+
+@dataclass(frozen=True, slots=True)
+class SessionWindow:
+    """An enabled trading window, parsed once from its HH:MM config strings."""
+    start_min: int  # Minutes since midnight
+    end_min: int  # Before start_min when the window spans midnight
+    session_type: str  # 'prime' or 'acceptable'
+    risk_multiplier: float
+    reason: str
+    start: str  # Original HH:MM strings
+    end: str
+    start_time: time
+    result: SessionResult  # is_trading_window result while inside the window
+
 
 class SessionManager:
     """Manages trading sessions based on local time windows."""
@@ -23,112 +76,288 @@ class SessionManager:
         self.prime_windows = self.sessions_config.get('prime', [])
         self.acceptable_windows = self.sessions_config.get('acceptable', [])
         self.risk_multipliers = self.sessions_config.get('risk_multiplier', {})
+        
+        # Windows are fixed for the lifetime of the manager; parse them once
+        self._risk_prime = self.risk_multipliers.get('prime', 1.0)
+        self._risk_acceptable = self.risk_multipliers.get('acceptable', 0.75)
+        # get_risk_multiplier's values indexed by session id (same defaults)
+        self._risk_by_id = (
+            self.risk_multipliers.get('prime', 0.0),
+            self.risk_multipliers.get('acceptable', 0.0),
+            self.risk_multipliers.get('closed', 0.0)
+        )
+        self._prime_parsed = self._parse_windows(self.prime_windows, 'prime', self._risk_prime)
+        self._acceptable_parsed = self._parse_windows(self.acceptable_windows, 'acceptable',
+                                                      self._risk_acceptable)
+        # Window bounds as parallel arrays (priority order) for vectorized resolution
+        self._windows = self._prime_parsed + self._acceptable_parsed
+        self._window_starts = np.array([w.start_min for w in self._windows], dtype=np.int16)
+        self._window_ends = np.array([w.end_min for w in self._windows], dtype=np.int16)
+        self._segment_starts, self._segment_windows = self._build_segments()
+        
+        # Windows by start minute (stable: prime first on ties) for get_next_window
+        self._sorted_windows = sorted(self._windows, key=lambda w: w.start_min)
+        self._sorted_starts = [w.start_min for w in self._sorted_windows]
+        
+        # Optional restrictions (HH:MM); unset means disabled and costs nothing per check
+        self._friday_cutoff_min = self._parse_optional_time('friday_cutoff')
+        self._early_morning_end_min = self._parse_optional_time('early_morning_end')
+        
+        # Every minute of the week resolved up front: lookups are a single index
+        self._results, self._minute_map = self._build_minute_map()
+        
+        # Live result for the current wall-clock minute (answers only change per minute),
+        # valid until the monotonic clock reaches the end of that minute
+        self._cache_expires_ns = 0
+        self._cache_result: Optional[SessionResult] = None
     
-    def is_trading_window(self, current_time_local: Optional[datetime] = None) -> Dict[str, Any]:
+    def _parse_optional_time(self, key: str) -> Optional[int]:
         """
-        Check if current time is in trading window.
+        Minutes since midnight for an optional HH:MM session setting.
         
         Args:
-            current_time_local: Current local time (default: now)
+            key: Key under the 'sessions' config
         
         Returns:
-            Dictionary with 'active', 'session_type', 'risk_multiplier'
-        """
-        if current_time_local is None:
-            current_time_local = datetime.now()  # Use local time
-        
-        current_time = current_time_local.time()
-        current_weekday = current_time_local.weekday()  # 0=Monday, 4=Friday
-        
-        # TEMPORARY: Disabled Friday restriction for testing
-        # Check if Friday after 16:00 Local Time (closed)
-        # if current_weekday == 4 and current_time >= time(16, 0):
-        #     return {
-        #         'active': False,
-        #         'session_type': 'closed',
-        #         'risk_multiplier': 0.0,
-        #         'reason': 'Friday after 16:00 Local Time'
-        #     }
-        
-        # Check prime sessions
-        for window in self.prime_windows:
-            if not window.get('enabled', True):
+            Minutes since midnight, or None when unset or malformed (logged)
+        """
+        value = self.sessions_config.get(key)
+        if not value:
+            return None
+        try:
+            return self._parse_hhmm(value)
+        except (ValueError, IndexError, TypeError):
+            logger.warning(f"Invalid sessions.{key} time: {value!r}; restriction disabled")
+            return None
+    
+    def _build_segments(self) -> Tuple[List[int], List[Optional[SessionWindow]]]:
+        """
+        Flatten windows into non-overlapping day segments for bisect lookup.
+        
+        Each minute of the day belongs to the first window (in priority order)
+        containing it, so overlaps resolve exactly as a prime-then-acceptable
+        scan would, and midnight-spanning windows split at 00:00 naturally.
+        All windows are tested against all 1440 minutes in one array operation.
+        
+        Returns:
+            (starts, windows): sorted segment start minutes (the first is 0) and
+            the window covering each segment (None when closed)
+        """
+        minutes = np.arange(24 * 60)
+        starts = self._window_starts.astype(np.int64)[:, None]
+        lengths = (self._window_ends.astype(np.int64)[:, None] - starts) % 1440
+        # Offsets from each window start, modulo one day: one comparison covers both
+        # same-day and midnight-spanning windows (start == end is an empty window)
+        hits = (minutes - starts) % 1440 < lengths
+        owner = np.full(24 * 60, -1)
+        if self._windows:
+            owner = np.where(hits.any(axis=0), hits.argmax(axis=0), -1)
+        
+        segment_starts = [0] + (np.flatnonzero(np.diff(owner)) + 1).tolist()
+        owners = [self._windows[i] if i >= 0 else None for i in owner[segment_starts].tolist()]
+        return segment_starts, owners
+    
+    def _build_minute_map(self) -> Tuple[Tuple[SessionResult, ...], np.ndarray]:
+        """
+        Resolve every minute of the week to a result code.
+        
+        Windows are painted from the segments (so overlaps resolve as before),
+        the early-morning closure fills closed minutes before its end, and the
+        Friday cut-off overrides everything after it.
+        
+        Returns:
+            (results, minute_map): results indexed by code, and the code for
+            each minute of the week (index weekday * 1440 + minutes since midnight)
+        """
+        results = [_CLOSED_DEFAULT, _CLOSED_FRIDAY, _CLOSED_EARLY]
+        codes: Dict[int, int] = {}
+        day = np.full(24 * 60, _CODE_CLOSED, dtype=np.uint16)
+        bounds = self._segment_starts + [24 * 60]
+        for i, window in enumerate(self._segment_windows):
+            if window is None:
                 continue
-            
-            start_str = window.get('start', '')
-            end_str = window.get('end', '')
-            
-            if self._time_in_window(current_time, start_str, end_str):
-                return {
-                    'active': True,
-                    'session_type': 'prime',
-                    'risk_multiplier': self.risk_multipliers.get('prime', 1.0),
-                    'reason': f'Prime session: {start_str}-{end_str} Local Time'
-                }
-        
-        # Check acceptable sessions
-        for window in self.acceptable_windows:
+            if id(window) not in codes:
+                codes[id(window)] = len(results)
+                results.append(window.result)
+            day[bounds[i]:bounds[i + 1]] = codes[id(window)]
+        
+        if self._early_morning_end_min is not None:
+            early = day[:self._early_morning_end_min]
+            early[early == _CODE_CLOSED] = _CODE_EARLY
+        
+        dtype = np.uint8 if len(results) <= 256 else np.uint16
+        minute_map = np.tile(day, 7).astype(dtype)
+        if self._friday_cutoff_min is not None:
+            minute_map[4 * 1440 + self._friday_cutoff_min:5 * 1440] = _CODE_FRIDAY  # 4=Friday
+        return tuple(results), minute_map
+    
+    @staticmethod
+    def _parse_windows(windows: List[Dict[str, Any]], session_type: str,
+                       risk_multiplier: float) -> List[SessionWindow]:
+        """
+        Parse the enabled windows of one session type.
+        
+        Args:
+            windows: Window configs with 'start'/'end' (HH:MM) and 'enabled'
+            session_type: 'prime' or 'acceptable'
+            risk_multiplier: Risk multiplier for this session type
+        
+        Returns:
+            Parsed windows in config order; malformed ones are logged and skipped
+        """
+        parsed = []
+        for window in windows:
             if not window.get('enabled', True):
                 continue
             
             start_str = window.get('start', '')
             end_str = window.get('end', '')
+            try:
+                start_min = SessionManager._parse_hhmm(start_str)
+                end_min = SessionManager._parse_hhmm(end_str)
+            except (ValueError, IndexError):
+                logger.warning(f"Invalid time window format: {start_str}-{end_str}")
+                continue
             
-            if self._time_in_window(current_time, start_str, end_str):
-                return {
-                    'active': True,
-                    'session_type': 'acceptable',
-                    'risk_multiplier': self.risk_multipliers.get('acceptable', 0.75),
-                    'reason': f'Acceptable session: {start_str}-{end_str} Local Time'
-                }
-        
-        # TEMPORARY: Disabled early morning restriction for testing
-        # Check if in closed hours (00:00-07:00) - Only early morning restriction
-        # Note: 18:00-24:00 restriction removed to allow test windows
-        # if current_time < time(7, 0):
-        #     return {
-        #         'active': False,
-        #         'session_type': 'closed',
-        #         'risk_multiplier': 0.0,
-        #         'reason': 'Outside trading hours (early morning)'
-        #     }
-        
-        # Default: closed (no active window configured)
-        return {
-            'active': False,
-            'session_type': 'closed',
-            'risk_multiplier': 0.0,
-            'reason': 'No active trading window'
-        }
-    
-    def _time_in_window(self, current_time: time, start_str: str, end_str: str) -> bool:
-        """
-        Check if current time is within window.
+            reason = f'{session_type.capitalize()} session: {start_str}-{end_str} Local Time'
+            parsed.append(SessionWindow(
+                start_min=start_min,
+                end_min=end_min,
+                session_type=session_type,
+                risk_multiplier=risk_multiplier,
+                reason=reason,
+                start=start_str,
+                end=end_str,
+                start_time=time(start_min // 60, start_min % 60),
+                result=SessionResult(
+                    active=True,
+                    session_type=session_type,
+                    risk_multiplier=risk_multiplier,
+                    reason=reason,
+                    session_id=_SESSION_IDS[session_type]
+                )
+            ))
+        return parsed
+    
+    def is_trading_window(self, current_time_local: Optional[datetime] = None) -> SessionResult:
+        """
+        Check if current time is in trading window.
         
         Args:
-            current_time: Current time
-            start_str: Start time string (HH:MM)
-            end_str: End time string (HH:MM)
+            current_time_local: Current local time (default: now)
         
         Returns:
-            True if in window
+            SessionResult (shared, precomputed instance; to_dict() for the dictionary form)
         """
-        try:
-            start_parts = start_str.split(':')
-            end_parts = end_str.split(':')
-            
-            start_time = time(int(start_parts[0]), int(start_parts[1]))
-            end_time = time(int(end_parts[0]), int(end_parts[1]))
-            
-            if start_time <= end_time:
-                # Normal window (same day)
-                return start_time <= current_time < end_time
-            else:
-                # Window spans midnight
-                return current_time >= start_time or current_time < end_time
-        except (ValueError, IndexError):
-            logger.warning(f"Invalid time window format: {start_str}-{end_str}")
-            return False
+        if current_time_local is not None:
+            return self._evaluate_window(current_time_local)
+        
+        # Cache hits skip building a datetime; a wall-clock jump (DST, NTP step)
+        # is picked up by the next minute boundary at the latest
+        mono_ns = monotonic_ns()
+        if mono_ns < self._cache_expires_ns:
+            return self._cache_result
+        
+        now = datetime.now()  # Use local time
+        self._cache_result = self._evaluate_window(now)
+        self._cache_expires_ns = mono_ns + (60 - now.second) * 1_000_000_000 - now.microsecond * 1000
+        return self._cache_result
+    
+    def _evaluate_window(self, current_time_local: datetime) -> SessionResult:
+        """
+        Trading window lookup for a given local time (uncached).
+        
+        Args:
+            current_time_local: Local time to evaluate
+        
+        Returns:
+            SessionResult
+        """
+        # Window priority, the Friday cut-off (sessions.friday_cutoff) and the
+        # early-morning closure (sessions.early_morning_end) are baked into the map
+        minute_of_week = (current_time_local.weekday() * 1440
+                          + current_time_local.hour * 60 + current_time_local.minute)
+        return self._results[self._minute_map[minute_of_week]]
+    
+    @staticmethod
+    def _parse_hhmm(hhmm: str) -> int:
+        """
+        Parse an HH:MM string into minutes since midnight.
+        
+        Args:
+            hhmm: Time string (HH:MM)
+        
+        Returns:
+            Minutes since midnight
+        
+        Raises:
+            ValueError, IndexError: Malformed string or hour/minute out of range
+        """
+        if (len(hhmm) == 5 and hhmm[2] == ':' and hhmm.isascii()
+                and hhmm[:2].isdigit() and hhmm[3:].isdigit()):
+            # Fixed-width HH:MM: digit arithmetic, no split or int() parsing
+            hour = (ord(hhmm[0]) - 48) * 10 + (ord(hhmm[1]) - 48)
+            minute = (ord(hhmm[3]) - 48) * 10 + (ord(hhmm[4]) - 48)
+        else:
+            parts = hhmm.split(':')
+            hour = int(parts[0])
+            minute = int(parts[1])
+        if not (0 <= hour < 24 and 0 <= minute < 60):
+            raise ValueError(f"time out of range: {hhmm}")
+        return hour * 60 + minute
+    
+    def seconds_until_next_transition(self, now: Optional[datetime] = None) -> float:
+        """
+        Seconds until the trading window next changes (opens, closes or switches session).
+        
+        Lets a caller that only needs to act on window changes sleep to the next
+        boundary, e.g. time.sleep(min(sm.seconds_until_next_transition(), max_poll)),
+        instead of polling is_trading_window.
+        
+        Args:
+            now: Current local time (default: now)
+        
+        Returns:
+            Seconds to the next window boundary or Friday cut-off (inf if the
+            schedule never changes); may be early, never late, while closed by
+            a restriction
+        """
+        if now is None:
+            now = datetime.now()  # Use local time
+        
+        starts = self._segment_starts
+        owners = self._segment_windows
+        if len(starts) == 1 and self._friday_cutoff_min is None:
+            return float('inf')
+        
+        current_minutes = now.hour * 60 + now.minute
+        idx = bisect_right(starts, current_minutes)
+        if idx < len(starts):
+            next_minute = starts[idx]
+        elif len(starts) > 1 and owners[-1] is owners[0]:
+            # The last segment continues past midnight into the first one
+            next_minute = 24 * 60 + starts[1]
+        else:
+            next_minute = 24 * 60
+        
+        cutoff = self._friday_cutoff_min
+        if cutoff is not None and current_minutes < cutoff < next_minute and now.weekday() == 4:
+            next_minute = cutoff
+        
+        elapsed = now.hour * 3600 + now.minute * 60 + now.second + now.microsecond / 1e6
+        return next_minute * 60 - elapsed
+    
+    def snapshot(self, now: Optional[datetime] = None) -> 'SessionSnapshot':
+        """
+        Answer several session queries against a single reading of the clock.
+        
+        Args:
+            now: Local time to evaluate (default: now, read once)
+        
+        Returns:
+            SessionSnapshot (also usable as a context manager)
+        """
+        return SessionSnapshot(self, now if now is not None else datetime.now())
     
     def get_session_type(self, current_time: Optional[datetime] = None) -> str:
         """
@@ -140,82 +369,121 @@ class SessionManager:
         Returns:
             'prime', 'acceptable', or 'closed'
         """
-        window_info = self.is_trading_window(current_time)
-        return window_info['session_type']
+        return self.is_trading_window(current_time).session_type
     
-    def get_risk_multiplier(self, session_type: Optional[str] = None) -> float:
+    def get_risk_multiplier(self, session_type: Optional[str] = None,
+                            now: Optional[datetime] = None) -> float:
         """
         Get risk multiplier for session type.
         
         Args:
-            session_type: Session type (default: current session)
+            session_type: Session type (default: session at `now`)
+            now: Local time used when session_type is omitted (default: now)
         
         Returns:
             Risk multiplier (0.0-1.0)
         """
         if session_type is None:
-            window_info = self.is_trading_window()
-            session_type = window_info['session_type']
+            session_type = self.is_trading_window(now).session_type
         
         return self.risk_multipliers.get(session_type, 0.0)
     
-    def get_next_window(self) -> Optional[Dict[str, Any]]:
+    def get_risk_multiplier_by_id(self, session_id: int) -> float:
+        """
+        Get risk multiplier for a session id (tuple index, no string hashing).
+        
+        Args:
+            session_id: SESSION_PRIME, SESSION_ACCEPTABLE or SESSION_CLOSED
+                (e.g. SessionResult.session_id)
+        
+        Returns:
+            Risk multiplier, as get_risk_multiplier returns for the matching type
+        """
+        return self._risk_by_id[session_id]
+    
+    def get_next_window(self, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
         """
         Get next trading window start time.
         
+        Args:
+            now: Current local time (default: now)
+        
         Returns:
             Dictionary with next window info or None
         """
-        current_time = datetime.now()  # Use local time
+        current_time = now if now is not None else datetime.now()  # Use local time
         current_date = current_time.date()
+        current_minutes = current_time.hour * 60 + current_time.minute
         
-        # Collect all windows
-        all_windows = []
-        for window in self.prime_windows:
-            if window.get('enabled', True):
-                all_windows.append({
-                    'start': window['start'],
-                    'end': window['end'],
-                    'type': 'prime'
-                })
-        
-        for window in self.acceptable_windows:
-            if window.get('enabled', True):
-                all_windows.append({
-                    'start': window['start'],
-                    'end': window['end'],
-                    'type': 'acceptable'
-                })
-        
-        # Sort windows by start time
-        all_windows.sort(key=lambda w: w['start'])
-        
-        # Find next window
-        for window in all_windows:
-            start_parts = window['start'].split(':')
-            window_start = datetime.combine(current_date, time(int(start_parts[0]), int(start_parts[1])))
-            
-            if window_start > current_time:
-                return {
-                    'start_time': window_start,
-                    'type': window['type'],
-                    'start': window['start'],
-                    'end': window['end']
-                }
+        # First window starting after this minute (one starting now has already started)
+        idx = bisect_right(self._sorted_starts, current_minutes)
+        if idx < len(self._sorted_windows):
+            window = self._sorted_windows[idx]
+            return {
+                'start_time': datetime.combine(current_date, window.start_time),
+                'type': window.session_type,
+                'start': window.start,
+                'end': window.end
+            }
         
         # If no window today, return first window tomorrow
-        if all_windows:
-            first_window = all_windows[0]
-            start_parts = first_window['start'].split(':')
+        if self._sorted_windows:
+            first_window = self._sorted_windows[0]
             next_date = current_date + timedelta(days=1)
-            window_start = datetime.combine(next_date, time(int(start_parts[0]), int(start_parts[1])))
+            window_start = datetime.combine(next_date, first_window.start_time)
             
             return {
                 'start_time': window_start,
-                'type': first_window['type'],
-                'start': first_window['start'],
-                'end': first_window['end']
+                'type': first_window.session_type,
+                'start': first_window.start,
+                'end': first_window.end
             }
         
         return None
 
+
+class SessionSnapshot:
+    """
+    Session queries pinned to one local time.
+    
+    Each query otherwise reads the clock itself; a snapshot reads it once, so
+    the window, risk multiplier and next window are mutually consistent even
+    across a minute boundary.
+    
+    Example:
+        with session_manager.snapshot() as session:
+            if session.window.active:
+                risk = base_risk * session.risk_multiplier
+    """
+    
+    def __init__(self, manager: SessionManager, now: datetime):
+        """
+        Initialize snapshot.
+        
+        Args:
+            manager: Session manager to query
+            now: Local time all queries are evaluated at
+        """
+        self.manager = manager
+        self.now = now
+        self.window = manager.is_trading_window(now)
+    
+    def __enter__(self) -> 'SessionSnapshot':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+    
+    @property
+    def session_type(self) -> str:
+        """'prime', 'acceptable', or 'closed' at the snapshot time."""
+        return self.window.session_type
+    
+    @property
+    def risk_multiplier(self) -> float:
+        """Configured risk multiplier for the snapshot's session type."""
+        return self.manager.get_risk_multiplier_by_id(self.window.session_id)
+    
+    def next_window(self) -> Optional[Dict[str, Any]]:
+        """Next window start after the snapshot time (see SessionManager.get_next_window)."""
+        return self.manager.get_next_window(self.now)
@@ -1,8 +1,11 @@
 """
 ATR-based market condition filtering and volatility validation.
 """
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+import numpy as np
+from ..utils.jit import NUMBA_AVAILABLE
 from ..utils.logger import setup_logger
+from .volatility_kernel import validate_atr_kernel
 
 logger = setup_logger(__name__)
 
@@ -84,6 +87,40 @@ class VolatilityFilter:
             'confidence_adjustment': 0
         }
     
+    def validate_atr_batch(self, atr_values: np.ndarray,
+                           atr_averages: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Apply validate_atr's checks to many bars at once (backtesting/analysis).
+        
+        Args:
+            atr_values: ATR per bar
+            atr_averages: Average ATR per bar
+        
+        Returns:
+            (valid, confidence_adjustment): boolean mask and int8 adjustments
+            (-10 for the suboptimal range, else 0), as validate_atr would give
+        """
+        atr = np.ascontiguousarray(atr_values, dtype=np.float64)
+        avg = np.ascontiguousarray(atr_averages, dtype=np.float64)
+        
+        if NUMBA_AVAILABLE:
+            # One fused parallel pass, no temporaries
+            valid = np.empty(atr.shape[0], dtype=np.bool_)
+            confidence_adjustment = np.empty(atr.shape[0], dtype=np.int8)
+            validate_atr_kernel(atr, avg, valid, confidence_adjustment,
+                                float(self.min_atr), float(self.max_atr),
+                                float(self.optimal_min), float(self.optimal_max),
+                                float(self.spike_multiplier))
+            return valid, confidence_adjustment
+        
+        valid = ~((atr < self.min_atr) | (atr > self.max_atr)
+                  | ((avg > 0) & (atr > avg * self.spike_multiplier)))
+        optimal = (self.optimal_min <= atr) & (atr <= self.optimal_max)
+        suboptimal = (((self.min_atr <= atr) & (atr < self.optimal_min))
+                      | ((self.optimal_max < atr) & (atr <= self.max_atr)))
+        confidence_adjustment = np.where(valid & ~optimal & suboptimal, -10, 0).astype(np.int8)
+        return valid, confidence_adjustment
+    
     def is_market_choppy(self, atr: float, atr_average: float) -> bool:
         """
         Determine if market is too choppy for trading.
@@ -0,0 +1,31 @@
+"""
+Fused ATR validation over arrays of bars.
+
+validate_atr_kernel applies VolatilityFilter.validate_atr's rules in a single
+parallel pass, writing straight into caller-supplied outputs instead of
+building one temporary array per comparison. The explicit signature makes
+numba compile it at import (cached on disk). Comparisons must see NaN as
+IEEE does, so fastmath is deliberately off. Without numba the loop would run
+per element in Python, so VolatilityFilter only calls it when NUMBA_AVAILABLE.
+"""
+from ..utils.jit import njit, prange
+
+
+@njit('void(float64[::1], float64[::1], boolean[::1], int8[::1], '
+      'float64, float64, float64, float64, float64)', cache=True, parallel=True)
+def validate_atr_kernel(atr, avg, out_valid, out_conf, min_atr, max_atr,
+                        optimal_min, optimal_max, spike_multiplier):
+    """Per-bar validity and confidence adjustment (-10 suboptimal, else 0)."""
+    for i in prange(atr.shape[0]):
+        a = atr[i]
+        if a < min_atr or a > max_atr or (avg[i] > 0 and a > avg[i] * spike_multiplier):
+            out_valid[i] = False
+            out_conf[i] = 0
+        else:
+            out_valid[i] = True
+            if optimal_min <= a <= optimal_max:
+                out_conf[i] = 0
+            elif (min_atr <= a < optimal_min) or (optimal_max < a <= max_atr):
+                out_conf[i] = -10
+            else:
+                out_conf[i] = 0
@@ -0,0 +1,102 @@
+"""
+Confidence scoring for SignalGenerator, from scalars (and the last few M1
+volumes) to the score components it copies into a ConfidenceBreakdown.
+"""
+from ..utils.jit import njit
+from .momentum_kernel import DIRECTION_BUY, DIRECTION_SELL
+
+# RSI score per 10-point zone. Buys index it with floor(rsi / 10), so [30, 40)
+# scores 5; sells with the mirrored 10 - ceil(rsi / 10), so (60, 70] scores 5
+RSI_ZONE_SCORES = (10.0, 10.0, 10.0, 5.0, 0.0, -5.0, -10.0, -10.0, -10.0, -10.0)
+
+
+@njit('UniTuple(float64, 8)(float64, boolean, float64[::1], float64, float64, float64, '
+      'float64, float64, boolean, boolean, float64, int64, boolean, '
+      'float64, float64, float64, float64, float64, float64, float64)', cache=True)
+def confidence_kernel(alignment_score, volume_spike, volumes, body_ratio, strong_body_ratio,
+                      min_body_ratio, wick_ratio, max_wick_ratio, at_key_level, has_rsi, rsi,
+                      direction, has_atr, atr_value, atr_average, optimal_min, optimal_max,
+                      min_atr, max_atr, sell_penalty):
+    """
+    Score components and final confidence (base 60, clamped to 0-100).
+
+    volumes holds the last (up to) 5 M1 volumes, oldest first; volume_spike is
+    the analyzer's strong spike check; at_key_level is the price sitting at the
+    nearest support/resistance. has_rsi/has_atr mark whether rsi and
+    the ATR values are present; direction is a momentum_kernel direction code.
+
+    Returns:
+        (volume, momentum_strength, wick_ratio, price_level, rsi, atr,
+        sell_penalty, final_confidence); sell_penalty is 0 unless applied
+    """
+    confidence = 60.0 + alignment_score
+
+    # Volume: strong spike, else moderate increase over the 4 before the current
+    volume_score = 0.0
+    if volume_spike:
+        volume_score = 10.0
+    elif volumes.shape[0] >= 5:
+        prior_sum = 0.0
+        for i in range(4):
+            prior_sum += volumes[i]
+        current_volume = volumes[4]
+        if prior_sum + current_volume > 0:
+            avg_volume = prior_sum / 4
+            if avg_volume > 0 and current_volume >= avg_volume * 1.2:
+                volume_score = 5.0
+    confidence += volume_score
+
+    # Momentum strength
+    momentum_score = 0.0
+    if body_ratio >= strong_body_ratio:
+        momentum_score = 10.0
+    elif body_ratio >= min_body_ratio:
+        momentum_score = 5.0
+    confidence += momentum_score
+
+    # Wick ratio: clean candle bonus, rejection wick penalty
+    wick_score = 0.0
+    if wick_ratio <= 0.20:
+        wick_score = 5.0
+    elif not wick_ratio <= max_wick_ratio:
+        wick_score = -10.0
+    confidence += wick_score
+
+    # Price exactly at a key level
+    price_level_score = 10.0 if at_key_level else 0.0
+    confidence += price_level_score
+
+    # RSI zones (oversold favours buys, overbought favours sells)
+    rsi_score = 0.0
+    if has_rsi and (direction == DIRECTION_BUY or direction == DIRECTION_SELL):
+        if rsi != rsi:
+            rsi_score = -10.0  # NaN is in no zone
+        else:
+            # Out-of-range values score like the nearest end of the scale
+            level = 0.0 if rsi < 0.0 else (100.0 if rsi > 100.0 else rsi)
+            if direction == DIRECTION_BUY:
+                zone = level // 10
+            else:
+                zone = 10.0 + (-level) // 10  # 10 - ceil(level / 10)
+            rsi_score = RSI_ZONE_SCORES[int(zone) if zone < 9.0 else 9]
+    confidence += rsi_score
+
+    # ATR: bonus in the optimal band, heavy penalty on a spike over the average
+    atr_score = 0.0
+    if has_atr:
+        if optimal_min <= atr_value <= optimal_max:
+            atr_score = 5.0
+        elif min_atr <= atr_value < optimal_min or optimal_max < atr_value <= max_atr:
+            atr_score = 0.0
+        if atr_average > 0 and atr_value > atr_average * 1.8:
+            atr_score = -15.0
+    confidence += atr_score
+
+    applied_penalty = 0.0
+    if direction == DIRECTION_SELL and sell_penalty != 0:
+        applied_penalty = sell_penalty
+        confidence += applied_penalty
+
+    final_confidence = min(max(confidence, 0.0), 100.0)
+    return (volume_score, momentum_score, wick_score, price_level_score, rsi_score,
+            atr_score, applied_penalty, final_confidence)
@@ -0,0 +1,166 @@
+"""
+Momentum checks for MomentumAnalyzer, which converts candles to arrays and
+turns the returned codes into log lines and result dictionaries.
+"""
+from ..utils.jit import njit
+
+# Direction codes
+DIRECTION_NONE = 0
+DIRECTION_BUY = 1
+DIRECTION_SELL = 2
+
+# Stage codes: where a rejected candle sequence failed
+STAGE_PASSED = 0
+STAGE_1_FAILED = 1
+STAGE_2_FAILED = 2
+
+
+@njit('Tuple((int64, int64, float64, float64, float64, float64, boolean, float64, float64))'
+      '(float64[::1], float64[::1], float64[::1], float64[::1], float64[::1], '
+      'int64, float64, float64, float64, float64, float64, boolean)', cache=True)
+def two_stage_kernel(open_, high, low, close, volume, lookback, min_body_ratio,
+                     size_multiplier, volume_multiplier, weighted_threshold,
+                     strong_threshold, skip_if_strong):
+    """
+    Weighted stage 1 scoring, stage 2 size/volume check and final strength.
+
+    Arrays hold the last max(6, lookback) candles, oldest first (at least 5).
+    size_multiplier is the effective stage 2 multiplier (after the lenient band).
+
+    Returns:
+        (direction, stage, bullish_score, bearish_score, avg_body_size,
+        current_body_size, volume_spike, strength, avg_body_ratio).
+        stage is STAGE_PASSED or the stage that rejected (direction is then
+        DIRECTION_NONE); the stage 2 fields are 0/False when stage 2 did not
+        run, and strength/avg_body_ratio are only set when it passed.
+    """
+    n = close.shape[0]
+
+    # Stage 1: current candle weighs 60%, previous 40%
+    bullish_score = 0.0
+    bearish_score = 0.0
+    for j in range(min(lookback, 2)):
+        i = n - 1 - j
+        o = open_[i]
+        c = close[i]
+        range_ = high[i] - low[i]
+        ratio = abs(c - o) / range_ if range_ != 0 else 0.0
+        score = min(ratio / min_body_ratio, 1.0)  # Normalize to 0-1
+        weight = 0.6 if j == 0 else 0.4
+        if c > o and ratio >= min_body_ratio:
+            bullish_score += weight * score
+        elif c < o and ratio >= min_body_ratio:
+            bearish_score += weight * score
+
+    if bullish_score >= weighted_threshold and bullish_score > bearish_score:
+        direction = DIRECTION_BUY
+    elif bearish_score >= weighted_threshold and bearish_score > bullish_score:
+        direction = DIRECTION_SELL
+    else:
+        return DIRECTION_NONE, STAGE_1_FAILED, bullish_score, bearish_score, 0.0, 0.0, False, 0.0, 0.0
+
+    # Stage 2: current body vs the average of the (up to) 5 before it, or a volume spike
+    avg_body_size = 0.0
+    current_body_size = 0.0
+    volume_spike = False
+    winning_score = bullish_score if bullish_score > bearish_score else bearish_score
+    if not (skip_if_strong and winning_score >= strong_threshold):
+        start = n - 6 if n >= 6 else 0
+        body_sum = 0.0
+        for i in range(start, n - 1):
+            body_sum += abs(close[i] - open_[i])
+        avg_body_size = body_sum / (n - 1 - start)
+        current_body_size = abs(close[n - 1] - open_[n - 1])
+
+        size_check = current_body_size >= avg_body_size * size_multiplier
+
+        if n >= 6:
+            volume_sum = 0.0
+            for i in range(n - 6, n - 1):
+                volume_sum += volume[i]
+            current_volume = volume[n - 1]
+            if volume_sum != 0 and current_volume != 0:
+                volume_spike = current_volume >= (volume_sum / 5) * volume_multiplier
+
+        if not (size_check or volume_spike):
+            return (DIRECTION_NONE, STAGE_2_FAILED, bullish_score, bearish_score,
+                    avg_body_size, current_body_size, volume_spike, 0.0, 0.0)
+
+    # Strength: total body over total range of the stage 1 candles
+    ratio_sum = 0.0
+    body_sum = 0.0
+    range_sum = 0.0
+    for i in range(n - lookback, n):
+        body = abs(close[i] - open_[i])
+        range_ = high[i] - low[i]
+        ratio_sum += body / range_ if range_ != 0 else 0.0
+        body_sum += body
+        range_sum += range_
+    strength = body_sum / range_sum if range_sum > 0 else 0.0
+    return (direction, STAGE_PASSED, bullish_score, bearish_score, avg_body_size,
+            current_body_size, volume_spike, strength, ratio_sum / lookback)
+
+
+@njit('Tuple((int64, float64, float64))(float64[::1], float64[::1], float64[::1], float64[::1], float64)',
+      cache=True)
+def legacy_kernel(open_, high, low, close, min_body_ratio):
+    """
+    Legacy check: every candle strongly bullish (buy) or strongly bearish (sell).
+
+    One pass tracks both directions and the sums for strength, stopping as
+    soon as neither run is possible.
+
+    Returns:
+        (direction, strength, avg_body_ratio); strength and ratio are 0 for DIRECTION_NONE
+    """
+    n = close.shape[0]
+    bullish_run = True
+    bearish_run = True
+    ratio_sum = 0.0
+    body_sum = 0.0
+    range_sum = 0.0
+    for i in range(n):
+        o = open_[i]
+        c = close[i]
+        body = abs(c - o)
+        range_ = high[i] - low[i]
+        ratio = body / range_ if range_ != 0 else 0.0
+        strong = ratio >= min_body_ratio
+        bullish_run = bullish_run and c > o and strong
+        bearish_run = bearish_run and c < o and strong
+        if not (bullish_run or bearish_run):
+            return DIRECTION_NONE, 0.0, 0.0
+        ratio_sum += ratio
+        body_sum += body
+        range_sum += range_
+
+    strength = body_sum / range_sum if range_sum > 0 else 0.0
+    return (DIRECTION_BUY if bullish_run else DIRECTION_SELL), strength, ratio_sum / n
+
+
+@njit('boolean(float64[::1], float64[::1], float64[::1], float64[::1], float64)', cache=True)
+def strong_bodies_kernel(open_, high, low, close, min_body_ratio):
+    """True if every candle's body ratio is >= min_body_ratio (stops at the first weak one)."""
+    for i in range(close.shape[0]):
+        range_ = high[i] - low[i]
+        ratio = abs(close[i] - open_[i]) / range_ if range_ != 0 else 0.0
+        if not ratio >= min_body_ratio:
+            return False
+    return True
+
+
+@njit('boolean(float64[::1], int64, float64)', cache=True)
+def volume_spike_kernel(volume, lookback, multiplier):
+    """
+    True if the last volume exceeds multiplier x the average of the lookback - 1 before it.
+
+    volume holds at least lookback + 1 values; an all-zero window is no spike.
+    """
+    n = volume.shape[0]
+    prior_sum = 0.0
+    for i in range(n - lookback, n - 1):
+        prior_sum += volume[i]
+    current = volume[n - 1]
+    if prior_sum + current == 0:
+        return False  # No volume data
+    return current > prior_sum / (lookback - 1) * multiplier
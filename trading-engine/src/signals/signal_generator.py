@@ -1,16 +1,64 @@
 """
 Combines structure and momentum analysis to generate trading signals.
 """
-from typing import Dict, List, Any, Optional
+import logging
+from math import fabs
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
-from ..utils.types import Signal
-from ..signals.structure_analyzer import StructureAnalyzer
+from ..utils.types import (
+    Signal, MomentumResult, AlignmentResult, EntryTriggers, ConfidenceBreakdown, Candles
+)
+from ..signals.structure_analyzer import StructureAnalyzer, TREND_NAMES
 from ..signals.momentum_analyzer import MomentumAnalyzer
+from .confidence_kernel import confidence_kernel
+from .momentum_kernel import DIRECTION_NONE, DIRECTION_BUY, DIRECTION_SELL
+from .structure_kernel import TREND_BULLISH, TREND_NEUTRAL, TREND_BEARISH
 from ..market_data.indicators import calculate_rsi
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Momentum direction strings as kernel direction codes
+_DIRECTION_CODES = {'buy': DIRECTION_BUY, 'sell': DIRECTION_SELL}
+
+# Trend codes index the alignment table (M1 momentum maps buy/sell/other onto the same)
+_TREND_INDEX = {'bullish': TREND_BULLISH, 'neutral': TREND_NEUTRAL, 'bearish': TREND_BEARISH}
+_MOMENTUM_INDEX = {'buy': TREND_BULLISH, 'sell': TREND_BEARISH}
+
+# Alignment type per (M5 trend, M1 momentum) cell
+_ALIGNMENT_TYPES = (
+    ('both_bullish', 'm5_bullish_m1_neutral', 'conflicting'),
+    ('m5_neutral_m1_bullish', 'both_neutral', 'm5_neutral_m1_bearish'),
+    ('conflicting', 'm5_bearish_m1_neutral', 'both_bearish'),
+)
+
+# Alignment table marker for M5 and M1 pointing in opposite directions
+_CONFLICT = object()
+
+
+def _classify_price_vs_swings(current_price: float, swing_high_max: Optional[float],
+                              swing_low_min: Optional[float], resistance_level: float,
+                              support_level: float) -> Tuple[bool, bool]:
+    """
+    Where the price sits relative to the M5 swing levels.
+    
+    Args:
+        current_price: Current M5 close
+        swing_high_max: Highest swing high (None if there are none)
+        swing_low_min: Lowest swing low (None if there are none)
+        resistance_level: Nearest resistance from the structure analysis
+        support_level: Nearest support from the structure analysis
+    
+    Returns:
+        (structure_break, at_key_level): structure_break if price is within
+        0.1% of (or beyond) the outermost swing high or low; at_key_level if it
+        is within 1 point (0.01) of the nearest resistance or support
+    """
+    structure_break = ((swing_high_max is not None and current_price >= swing_high_max * 0.999)
+                       or (swing_low_min is not None and current_price <= swing_low_min * 1.001))
+    at_key_level = fabs(current_price - resistance_level) < 0.01 or fabs(current_price - support_level) < 0.01
+    return structure_break, at_key_level
+
 
 class SignalGenerator:
     """Generates trading signals from market structure and momentum."""
@@ -36,19 +84,28 @@ class SignalGenerator:
         self.min_body_ratio = self.signal_config.get('min_body_ratio', 0.35)
         self.strong_body_ratio = self.signal_config.get('strong_body_ratio', 0.70)
         
+        # Confidence scoring thresholds (wick rejection filter, ATR bands)
+        rejection_filter = self.signal_config.get('momentum_validation', {}).get('rejection_filter', {})
+        self.max_wick_ratio = rejection_filter.get('max_wick_ratio', 0.40)
+        atr_config = config.get('atr', {})
+        self.atr_optimal_min = atr_config.get('optimal_min', 8.0)
+        self.atr_optimal_max = atr_config.get('optimal_max', 11.0)
+        self.atr_min_points = atr_config.get('min_points', 6.0)
+        self.atr_max_points = atr_config.get('max_points', 22.0)
+        
         # RSI Scalping Configuration
         rsi_config = self.signal_config.get('rsi_conditions', {})
         self.rsi_mode = rsi_config.get('mode', 'divergence_and_zone')
         
-        # Buy conditions
+        # Buy conditions (RSI ranges frozen to (low, high) float tuples)
         buy_config = rsi_config.get('buy_conditions', {})
-        self.buy_m1_rsi_range = buy_config.get('m1_rsi_range', [25, 45])
+        self.buy_m1_rsi_range = tuple(float(v) for v in buy_config.get('m1_rsi_range', [25, 45]))
         self.buy_m5_rsi_minimum = buy_config.get('m5_rsi_minimum', 45)
         self.buy_divergence_enabled = buy_config.get('OR_divergence_detected', {}).get('enabled', False)
         
         # Sell conditions
         sell_config = rsi_config.get('sell_conditions', {})
-        self.sell_m1_rsi_range = sell_config.get('m1_rsi_range', [55, 75])
+        self.sell_m1_rsi_range = tuple(float(v) for v in sell_config.get('m1_rsi_range', [55, 75]))
         self.sell_m5_rsi_maximum = sell_config.get('m5_rsi_maximum', 55)
         
         # Trend Alignment Configuration
@@ -67,6 +124,28 @@ class SignalGenerator:
             'm5_neutral_m1_bearish': scoring.get('m5_neutral_m1_bearish', 0),
             'conflicting': scoring.get('conflicting', 'REJECT')
         }
+        # Scores indexed [m5 trend][m1 momentum], resolved once from the scoring config
+        scores = self.alignment_scores
+        self._alignment_matrix = (
+            (scores['both_bullish'], scores['m5_bullish_m1_neutral'], _CONFLICT),
+            (scores['m5_neutral_m1_bullish'], 0, scores['m5_neutral_m1_bearish']),
+            (_CONFLICT, scores['m5_bearish_m1_neutral'], scores['both_bearish']),
+        )
+        
+        # Conflicting alignments depend only on config: build both results once,
+        # keyed by the M5 trend. A numeric 'conflicting' score keeps the signal
+        # (counter-trend) with that score; anything else ("REJECT") rejects it.
+        conflicting_score = scores['conflicting']
+        conflict_is_scored = isinstance(conflicting_score, (int, float))
+        self._conflict_results = {}
+        for m5_index, m1_index in ((TREND_BULLISH, TREND_BEARISH), (TREND_BEARISH, TREND_BULLISH)):
+            reason = f'Conflicting: M5 {TREND_NAMES[m5_index]} but M1 {TREND_NAMES[m1_index]}'
+            if conflict_is_scored:
+                result = AlignmentResult(False, reason + ' (counter-trend)', conflicting_score,
+                                         False, 'conflicting')
+            else:
+                result = AlignmentResult(True, reason, 0, False, 'conflicting')
+            self._conflict_results[m5_index] = result
         
         neutral_rules = alignment_config.get('neutral_trend_rules', {})
         self.allow_neutral_trades = neutral_rules.get('allow_trades', True)
@@ -75,7 +154,7 @@ class SignalGenerator:
         self.neutral_stop_percent = neutral_rules.get('tighter_stop', 0.25)
         
         # Store confidence breakdown for detailed logging
-        self._last_confidence_breakdown = {}
+        self._last_confidence_breakdown = ConfidenceBreakdown()
         self._last_final_confidence = 0.0
     
     def generate_signal(self, m5_data: Dict[str, Any], 
@@ -85,249 +164,225 @@ class SignalGenerator:
         Main signal generation logic using Structure Break Momentum algorithm.
         
         Args:
-            m5_data: Dictionary with 'candles', 'ema21', 'swing_points'
-            m1_data: Dictionary with 'candles', 'rsi'
+            m5_data: Dictionary with 'candles', 'ema21', 'swing_points' and
+                optionally 'batch' (the same candles as a CandleBatch)
+            m1_data: Dictionary with 'candles', 'rsi' and optionally 'batch'
             indicators: Dictionary with calculated indicators
         
         Returns:
             Signal object or None if no valid signal
         """
+        # Both timeframes need candles; everything below relies on a last candle
+        if not m5_data or not m1_data:
+            return None
+        m5_candles = m5_data.get('candles', [])
+        m1_candles = m1_data.get('candles', [])
+        if not m5_candles or not m1_candles:
+            logger.debug("Signal skipped - missing M5 or M1 candles")
+            return None
+        
+        # Step 1: M1 Momentum Confirmation
+        m1_rsi_values = m1_data.get('rsi', [])
+        
+        # Prefer the array form of the same candles when the caller has it
+        m1_batch = m1_data.get('batch')
+        m1_series = m1_batch if m1_batch is not None else m1_candles
         try:
-            # Step 1: M5 Structure Analysis
-            m5_candles = m5_data.get('candles', [])
-            m5_ema21 = m5_data.get('ema21', [])
-            m5_swing_points = m5_data.get('swing_points', {})
-            
+            momentum = self.momentum_analyzer.analyze_m1_momentum(m1_series, m1_rsi_values)
+        except Exception as e:
+            logger.error("Error analyzing M1 momentum: %s", e, exc_info=True)
+            return None
+        direction = momentum.direction
+        
+        # Most cycles have no M1 momentum, and without it the entry conditions
+        # always fail. Skip the structure work unless INFO logging wants the
+        # rejection banner (which reports the M5 trend).
+        if direction == 'none' and not logger.isEnabledFor(logging.INFO):
+            return None
+        
+        # Step 2: M5 Structure Analysis
+        m5_ema21 = m5_data.get('ema21', [])
+        m5_swing_points = m5_data.get('swing_points', {})
+        m5_batch = m5_data.get('batch')
+        m5_series = m5_batch if m5_batch is not None else m5_candles
+        try:
+            current_price = m5_candles[-1]['close']
             structure = self.structure_analyzer.analyze_m5_structure(
-                m5_candles, m5_ema21, m5_swing_points
+                m5_series, m5_ema21, m5_swing_points
             )
-            
-            # Step 2: M1 Momentum Confirmation
-            m1_candles = m1_data.get('candles', [])
-            m1_rsi_values = m1_data.get('rsi', [])
-            
-            momentum = self.momentum_analyzer.analyze_m1_momentum(m1_candles, m1_rsi_values)
-            
-            # Step 3: Trend Alignment Check
-            alignment_result = self._check_trend_alignment(structure, momentum)
-            if alignment_result['reject']:
-                current_price = m5_candles[-1]['close'] if m5_candles else 0
-                m5_trend = structure.get('trend', 'unknown')
-                m1_direction = momentum.get('direction', 'none')
-                
+        except Exception as e:
+            logger.error("Error analyzing M5 structure: %s", e, exc_info=True)
+            return None
+        m5_trend = structure['trend']
+        
+        # Swing extremes used by the entry checks, scanned once per signal
+        swing_highs = m5_swing_points.get('swing_highs', [])
+        swing_lows = m5_swing_points.get('swing_lows', [])
+        swing_high_max = max(swing_highs) if swing_highs else None
+        swing_low_min = min(swing_lows) if swing_lows else None
+        
+        # Step 3: Trend Alignment Check
+        alignment_result = self._check_trend_alignment(m5_trend, direction)
+        if alignment_result.reject:
+            if logger.isEnabledFor(logging.INFO):
                 logger.info("=" * 80)
-                logger.info(f"❌ SIGNAL REJECTED: Trend alignment conflict")
-                logger.info(f"   M5 Trend: {m5_trend} | M1 Direction: {m1_direction} | Price: ${current_price:.2f}")
-                logger.info(f"   Reason: {alignment_result.get('reason', 'Unknown alignment issue')}")
+                logger.info("❌ SIGNAL REJECTED: Trend alignment conflict")
+                logger.info("   M5 Trend: %s | M1 Direction: %s | Price: $%.2f",
+                            m5_trend, direction, current_price)
+                logger.info("   Reason: %s", alignment_result.reason)
                 logger.info("=" * 80)
-                return None
-            
-            # Step 4: Entry Condition Validation
-            entry_validation = self._validate_entry_conditions(structure, momentum, m5_candles, 
-                                                   m1_candles, m5_ema21, m1_rsi_values, 
-                                                   m5_swing_points, alignment_result)
-            if not entry_validation:
-                # Enhanced logging to identify which condition failed
-                m5_trend = structure.get('trend', 'unknown')
-                m1_direction = momentum.get('direction', 'none')
-                current_price = m5_candles[-1]['close'] if m5_candles else 0
-                
+            return None
+        
+        # Step 4: Entry Condition Validation
+        entry_triggers = self._validate_entry_conditions(direction, current_price,
+                                                         m5_series, m1_series, m5_ema21,
+                                                         m1_rsi_values, m5_swing_points,
+                                                         alignment_result,
+                                                         swing_high_max, swing_low_min)
+        if entry_triggers is None:
+            # Enhanced logging to identify which condition failed
+            if logger.isEnabledFor(logging.INFO):
                 logger.info("=" * 80)
-                logger.info(f"❌ SIGNAL REJECTED: Entry conditions not met")
-                logger.info(f"   M5 Trend: {m5_trend} | M1 Direction: {m1_direction} | Price: ${current_price:.2f}")
-                logger.info(f"   Alignment Reject: {alignment_result.get('reject', False)} | Reason: {alignment_result.get('reason', 'N/A')}")
-                logger.info(f"   Momentum: Strength={momentum.get('strength', 0):.2f}, Body Ratio={momentum.get('body_ratio', 0):.2%}")
+                logger.info("❌ SIGNAL REJECTED: Entry conditions not met")
+                logger.info("   M5 Trend: %s | M1 Direction: %s | Price: $%.2f",
+                            m5_trend, direction, current_price)
+                logger.info("   Alignment Reject: %s | Reason: %s",
+                            alignment_result.reject, alignment_result.reason)
+                logger.info("   Momentum: Strength=%.2f, Body Ratio=%.2f%%",
+                            momentum.strength, momentum.body_ratio * 100)
                 logger.info("=" * 80)
-                return None
-            
-            # Step 5: Determine entry type
-            entry_type = self._determine_entry_type(structure, m5_candles, m5_swing_points)
-            
-            # Step 6: Calculate confidence score (includes alignment scoring)
-            confidence = self._calculate_confidence(
-                structure, momentum, m1_candles, m1_rsi_values, m5_candles, alignment_result, indicators
-            )
-            
-            if confidence < self.min_confidence:
+            return None
+        
+        # Price against the swing levels, shared by entry type and confidence
+        structure_break, at_key_level = _classify_price_vs_swings(
+            current_price, swing_high_max, swing_low_min,
+            structure.get('resistance_level', 0), structure.get('support_level', 0)
+        )
+        
+        # Step 5: Determine entry type
+        entry_type = self._determine_entry_type(direction, m5_series, swing_lows, swing_low_min,
+                                                entry_triggers, structure_break)
+        
+        # Step 6: Calculate confidence score (includes alignment scoring)
+        confidence = self._calculate_confidence(
+            momentum, direction, m1_series, m1_rsi_values, at_key_level,
+            alignment_result, indicators
+        )
+        
+        if confidence < self.min_confidence:
+            if logger.isEnabledFor(logging.INFO):
                 m1_rsi_current = m1_rsi_values[-1] if m1_rsi_values else 0
                 breakdown = self._last_confidence_breakdown
                 atr_value = indicators.get('atr', 0) if indicators else 0
                 
                 logger.info("=" * 80)
-                logger.info(f"❌ SIGNAL REJECTED: Confidence too low")
-                logger.info(f"   Direction: {momentum.get('direction', 'none').upper()} | M5 Trend: {structure.get('trend', 'unknown')} | Price: ${m5_candles[-1]['close']:.2f}")
-                logger.info(f"   Confidence: {confidence:.1f}% < Minimum: {self.min_confidence}% (Gap: {self.min_confidence - confidence:.1f}%)")
-                logger.info(f"   Confidence Breakdown:")
-                logger.info(f"      Base: {breakdown.get('base', 0):.1f}% | Alignment: {breakdown.get('alignment', 0):+.1f}% | Volume: {breakdown.get('volume', 0):+.1f}%")
-                logger.info(f"      Momentum: {breakdown.get('momentum_strength', 0):+.1f}% | Wick: {breakdown.get('wick_ratio', 0):+.1f}% | Price Level: {breakdown.get('price_level', 0):+.1f}%")
-                logger.info(f"      RSI: {breakdown.get('rsi', 0):+.1f}% (M1 RSI={m1_rsi_current:.1f}) | ATR: {breakdown.get('atr', 0):+.1f}% (ATR={atr_value:.2f})")
-                if breakdown.get('sell_penalty', 0) != 0:
-                    logger.info(f"      Sell Penalty: {breakdown.get('sell_penalty', 0):+.1f}%")
+                logger.info("❌ SIGNAL REJECTED: Confidence too low")
+                logger.info("   Direction: %s | M5 Trend: %s | Price: $%.2f",
+                            direction.upper(), m5_trend, current_price)
+                logger.info("   Confidence: %.1f%% < Minimum: %s%% (Gap: %.1f%%)",
+                            confidence, self.min_confidence, self.min_confidence - confidence)
+                logger.info("   Confidence Breakdown:")
+                logger.info("      Base: %.1f%% | Alignment: %+.1f%% | Volume: %+.1f%%",
+                            breakdown.base, breakdown.alignment, breakdown.volume)
+                logger.info("      Momentum: %+.1f%% | Wick: %+.1f%% | Price Level: %+.1f%%",
+                            breakdown.momentum_strength, breakdown.wick_ratio, breakdown.price_level)
+                logger.info("      RSI: %+.1f%% (M1 RSI=%.1f) | ATR: %+.1f%% (ATR=%.2f)",
+                            breakdown.rsi, m1_rsi_current, breakdown.atr, atr_value)
+                if breakdown.sell_penalty != 0:
+                    logger.info("      Sell Penalty: %+.1f%%", breakdown.sell_penalty)
                 logger.info("=" * 80)
-                return None
-            
-            # Create signal
-            current_price = m5_candles[-1]['close']
-            direction = momentum['direction']
-            
-            reason = self._generate_reason(structure, momentum, entry_type, confidence, alignment_result)
-            
-            signal = Signal(
-                direction=direction,
-                entry_type=entry_type,
-                confidence=confidence,
-                timestamp=datetime.now(),
-                reason=reason,
-                price=current_price,
-                alignment_result=alignment_result
-            )
-            
-            # Enhanced signal logging with detailed breakdown
+            return None
+        
+        # Create signal
+        reason = self._generate_reason(m5_trend, direction, momentum, entry_type, confidence,
+                                       alignment_result)
+        
+        signal = Signal(
+            direction=direction,
+            entry_type=entry_type,
+            confidence=confidence,
+            timestamp=datetime.now(),
+            reason=reason,
+            price=current_price,
+            alignment_result=alignment_result
+        )
+        
+        # Enhanced signal logging with detailed breakdown
+        if logger.isEnabledFor(logging.INFO):
             m1_rsi_current = m1_rsi_values[-1] if m1_rsi_values else 0
             breakdown = self._last_confidence_breakdown
             atr_value = indicators.get('atr', 0) if indicators else 0
             atr_avg = indicators.get('atr_average', 0) if indicators else 0
             
             logger.info("=" * 80)
-            logger.info(f"✅ SIGNAL GENERATED: {direction.upper()} {entry_type}")
-            logger.info(f"   Price: ${current_price:.2f} | M5 Trend: {structure.get('trend', 'unknown')} | M1 Direction: {direction}")
-            logger.info(f"   Confidence: {confidence:.1f}% (Min Required: {self.min_confidence}%)")
-            logger.info(f"   Confidence Breakdown:")
-            logger.info(f"      Base: {breakdown.get('base', 0):.1f}% | Alignment: {breakdown.get('alignment', 0):+.1f}% | Volume: {breakdown.get('volume', 0):+.1f}%")
-            logger.info(f"      Momentum: {breakdown.get('momentum_strength', 0):+.1f}% | Wick: {breakdown.get('wick_ratio', 0):+.1f}% | Price Level: {breakdown.get('price_level', 0):+.1f}%")
-            logger.info(f"      RSI: {breakdown.get('rsi', 0):+.1f}% (M1 RSI={m1_rsi_current:.1f}) | ATR: {breakdown.get('atr', 0):+.1f}% (ATR={atr_value:.2f}, Avg={atr_avg:.2f})")
-            if breakdown.get('sell_penalty', 0) != 0:
-                logger.info(f"      Sell Penalty: {breakdown.get('sell_penalty', 0):+.1f}%")
-            logger.info(f"   Momentum: Strength={momentum.get('strength', 0):.2f}, Body Ratio={momentum.get('body_ratio', 0):.2%}, Wick Ratio={momentum.get('wick_ratio', 0):.2%}")
-            logger.info(f"   Alignment: {alignment_result.get('alignment_type', 'unknown')} | Neutral Trend: {alignment_result.get('is_neutral_trend', False)}")
+            logger.info("✅ SIGNAL GENERATED: %s %s", direction.upper(), entry_type)
+            logger.info("   Price: $%.2f | M5 Trend: %s | M1 Direction: %s",
+                        current_price, m5_trend, direction)
+            logger.info("   Confidence: %.1f%% (Min Required: %s%%)", confidence, self.min_confidence)
+            logger.info("   Confidence Breakdown:")
+            logger.info("      Base: %.1f%% | Alignment: %+.1f%% | Volume: %+.1f%%",
+                        breakdown.base, breakdown.alignment, breakdown.volume)
+            logger.info("      Momentum: %+.1f%% | Wick: %+.1f%% | Price Level: %+.1f%%",
+                        breakdown.momentum_strength, breakdown.wick_ratio, breakdown.price_level)
+            logger.info("      RSI: %+.1f%% (M1 RSI=%.1f) | ATR: %+.1f%% (ATR=%.2f, Avg=%.2f)",
+                        breakdown.rsi, m1_rsi_current, breakdown.atr, atr_value, atr_avg)
+            if breakdown.sell_penalty != 0:
+                logger.info("      Sell Penalty: %+.1f%%", breakdown.sell_penalty)
+            logger.info("   Momentum: Strength=%.2f, Body Ratio=%.2f%%, Wick Ratio=%.2f%%",
+                        momentum.strength, momentum.body_ratio * 100, momentum.wick_ratio * 100)
+            logger.info("   Alignment: %s | Neutral Trend: %s",
+                        alignment_result.alignment_type,
+                        alignment_result.is_neutral_trend)
             logger.info("=" * 80)
-            
-            return signal
         
-        except Exception as e:
-            logger.error(f"Error generating signal: {e}", exc_info=True)
-            return None
+        return signal
     
-    def _check_trend_alignment(self, structure: Dict[str, Any], 
-                               momentum: Dict[str, Any]) -> Dict[str, Any]:
+    def _check_trend_alignment(self, m5_trend: str, m1_direction: str) -> AlignmentResult:
         """
         Check trend alignment between M5 structure and M1 momentum.
         
+        Args:
+            m5_trend: M5 structure trend ('bullish', 'bearish' or 'neutral')
+            m1_direction: M1 momentum direction ('buy', 'sell' or 'none')
+        
         Returns:
-            Dictionary with:
-            {
-                'reject': bool,
-                'reason': str,
-                'alignment_score': float,
-                'is_neutral_trend': bool,
-                'alignment_type': str
-            }
+            AlignmentResult
         """
-        m5_trend = structure.get('trend', 'neutral')
-        m1_direction = momentum.get('direction', 'none')
-        
         # Map momentum direction to trend classification
-        if m1_direction == 'buy':
-            m1_momentum = 'bullish'
-        elif m1_direction == 'sell':
-            m1_momentum = 'bearish'
-        else:
-            m1_momentum = 'neutral'
-        
-        # Check for conflicting signals (scoring-based instead of rejection)
-        conflicting_score = self.alignment_scores.get('conflicting', 'REJECT')
-        
-        if m5_trend == 'bullish' and m1_momentum == 'bearish':
-            # If conflicting is a number, use it as score. If "REJECT", reject the signal.
-            if isinstance(conflicting_score, (int, float)):
-                return {
-                    'reject': False,
-                    'reason': 'Conflicting: M5 bullish but M1 bearish (counter-trend)',
-                    'alignment_score': conflicting_score,
-                    'is_neutral_trend': False,
-                    'alignment_type': 'conflicting'
-                }
-            else:
-                return {
-                    'reject': True,
-                    'reason': 'Conflicting: M5 bullish but M1 bearish',
-                    'alignment_score': 0,
-                    'is_neutral_trend': False,
-                    'alignment_type': 'conflicting'
-                }
-        
-        if m5_trend == 'bearish' and m1_momentum == 'bullish':
-            # If conflicting is a number, use it as score. If "REJECT", reject the signal.
-            if isinstance(conflicting_score, (int, float)):
-                return {
-                    'reject': False,
-                    'reason': 'Conflicting: M5 bearish but M1 bullish (counter-trend)',
-                    'alignment_score': conflicting_score,
-                    'is_neutral_trend': False,
-                    'alignment_type': 'conflicting'
-                }
-            else:
-                return {
-                    'reject': True,
-                    'reason': 'Conflicting: M5 bearish but M1 bullish',
-                    'alignment_score': 0,
-                    'is_neutral_trend': False,
-                    'alignment_type': 'conflicting'
-                }
-        
-        # Determine alignment type and score
-        alignment_type = None
-        alignment_score = 0
-        is_neutral_trend = (m5_trend == 'neutral')
-        
-        if m5_trend == 'bullish' and m1_momentum == 'bullish':
-            alignment_type = 'both_bullish'
-            alignment_score = self.alignment_scores['both_bullish']
-        elif m5_trend == 'bearish' and m1_momentum == 'bearish':
-            alignment_type = 'both_bearish'
-            alignment_score = self.alignment_scores['both_bearish']
-        elif m5_trend == 'bullish' and m1_momentum == 'neutral':
-            alignment_type = 'm5_bullish_m1_neutral'
-            alignment_score = self.alignment_scores['m5_bullish_m1_neutral']
-        elif m5_trend == 'neutral' and m1_momentum == 'bullish':
-            alignment_type = 'm5_neutral_m1_bullish'
-            alignment_score = self.alignment_scores['m5_neutral_m1_bullish']
-        elif m5_trend == 'bearish' and m1_momentum == 'neutral':
-            alignment_type = 'm5_bearish_m1_neutral'
-            alignment_score = self.alignment_scores['m5_bearish_m1_neutral']
-        elif m5_trend == 'neutral' and m1_momentum == 'bearish':
-            alignment_type = 'm5_neutral_m1_bearish'
-            alignment_score = self.alignment_scores['m5_neutral_m1_bearish']
-        elif m5_trend == 'neutral' and m1_momentum == 'neutral':
-            alignment_type = 'both_neutral'
+        m1_index = _MOMENTUM_INDEX.get(m1_direction, TREND_NEUTRAL)
+        m1_momentum = TREND_NAMES[m1_index]
+        
+        m5_index = _TREND_INDEX.get(m5_trend)
+        if m5_index is None:
+            # Not a trend StructureAnalyzer reports: no alignment type or score
+            alignment_type = None
             alignment_score = 0
+        else:
+            alignment_type = _ALIGNMENT_TYPES[m5_index][m1_index]
+            alignment_score = self._alignment_matrix[m5_index][m1_index]
+        
+        if alignment_score is _CONFLICT:
+            # Scoring-based or rejection, as configured (shared result)
+            return self._conflict_results[m5_index]
+        
+        is_neutral_trend = m5_index == TREND_NEUTRAL
         
         # Check if neutral trend is allowed
         if is_neutral_trend and not self.allow_neutral_trades:
-            return {
-                'reject': True,
-                'reason': 'Neutral trend trades not allowed',
-                'alignment_score': 0,
-                'is_neutral_trend': True,
-                'alignment_type': alignment_type
-            }
-        
-        return {
-            'reject': False,
-            'reason': f'M5 {m5_trend} + M1 {m1_momentum}',
-            'alignment_score': alignment_score,
-            'is_neutral_trend': is_neutral_trend,
-            'alignment_type': alignment_type
-        }
+            return AlignmentResult(True, 'Neutral trend trades not allowed', 0, True, alignment_type)
+        
+        return AlignmentResult(False, f'M5 {m5_trend} + M1 {m1_momentum}', alignment_score,
+                               is_neutral_trend, alignment_type)
     
-    def _validate_entry_conditions(self, structure: Dict[str, Any], 
-                                   momentum: Dict[str, Any],
-                                   m5_candles: List[Dict[str, Any]],
-                                   m1_candles: List[Dict[str, Any]],
+    def _validate_entry_conditions(self, direction: str, current_price: float,
+                                   m5_series: Candles,
+                                   m1_candles: Candles,
                                    m5_ema21: List[float],
                                    m1_rsi: List[float],
                                    m5_swing_points: Dict[str, List[float]],
-                                   alignment_result: Dict[str, Any]) -> bool:
+                                   alignment_result: AlignmentResult,
+                                   swing_high_max: Optional[float],
+                                   swing_low_min: Optional[float]) -> Optional[EntryTriggers]:
         """
         SIMPLIFIED: Validate only 3 core conditions (hard gates):
         1. Directional bias (M5 trend) - no conflicting signals
@@ -337,28 +392,31 @@ class SignalGenerator:
         All other filters (RSI, volume, wick, ATR) are now scoring-based, not rejection.
         
         Args:
+            direction: M1 momentum direction ('buy', 'sell' or 'none')
+            current_price: Last M5 close
+            m5_series: M5 candle dictionaries or the same candles as a CandleBatch
             alignment_result: Result from _check_trend_alignment
+            swing_high_max: Highest swing high (None if there are none)
+            swing_low_min: Lowest swing low (None if there are none)
         
         Returns:
-            True if all 3 core conditions met
+            EntryTriggers found if all 3 core conditions met (the triggers are
+            optional), else None
         """
         # CORE CONDITION 1: Momentum direction exists (M1 momentum candle)
-        if momentum['direction'] == 'none':
+        if direction == 'none':
             logger.info("Signal rejected - Entry condition 1 FAILED: No momentum direction detected")
-            return False
-        
-        direction = momentum['direction']
+            return None
         
         # CORE CONDITION 2: No conflicting directional bias (M5 trend alignment)
         # Only reject if M5 and M1 are directly conflicting
-        if alignment_result.get('reject', False):
-            logger.info(f"Signal rejected - Entry condition 2 FAILED: {alignment_result.get('reason', 'Trend conflict')}")
-            return False
+        if alignment_result.reject:
+            logger.info("Signal rejected - Entry condition 2 FAILED: %s", alignment_result.reason)
+            return None
         
         # CORE CONDITION 3 (RELAXED FOR SCALPING): Entry triggers are now optional
         # For scalping, we prioritize momentum over specific entry patterns
         # Entry triggers will be used for confidence scoring instead of rejection
-        current_price = m5_candles[-1]['close'] if m5_candles else 0
         swing_highs = m5_swing_points.get('swing_highs', [])
         swing_lows = m5_swing_points.get('swing_lows', [])
         
@@ -371,88 +429,106 @@ class SignalGenerator:
         # SCALPING MODE: Entry triggers are optional
         # Having an entry trigger will boost confidence, but not having one won't reject the signal
         # This allows the bot to catch momentum moves without waiting for perfect setups
-        entry_trigger_met = False
-        
-        if direction == 'buy':
-            # Check for any valid entry trigger (optional)
-            if swing_lows and self.structure_analyzer.is_price_near_level(
-                current_price, min(swing_lows), candles=m5_candles
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.is_pullback_to_ema(
-                current_price, current_ema, m1_candles=m1_candles
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.detect_liquidity_sweep(
-                m5_candles, swing_lows, swing_highs=None
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.detect_breakout_entry(
-                m1_candles, swing_highs, swing_lows, 'buy'
-            ):
-                entry_trigger_met = True
-        
-        elif direction == 'sell':
-            # Check for any valid entry trigger (optional)
-            if swing_highs and self.structure_analyzer.is_price_near_level(
-                current_price, max(swing_highs), candles=m5_candles
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.is_pullback_to_ema(
-                current_price, current_ema, m1_candles=m1_candles
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.detect_liquidity_sweep(
-                m5_candles, swing_lows=None, swing_highs=swing_highs
-            ):
-                entry_trigger_met = True
-            elif self.structure_analyzer.detect_breakout_entry(
-                m1_candles, swing_highs, swing_lows, 'sell'
-            ):
-                entry_trigger_met = True
+        triggers = self._compute_entry_triggers(direction, current_price, current_ema,
+                                                m5_series, m1_candles,
+                                                swing_highs, swing_lows,
+                                                swing_high_max, swing_low_min)
+        entry_trigger_met = any(triggers)
         
         # SCALPING: Entry trigger is no longer required - just logged for confidence scoring
         if not entry_trigger_met:
-            logger.debug(f"No specific entry trigger, but allowing signal for scalping (direction: {direction})")
-        # Don't return False - allow signal to pass
+            logger.debug("No specific entry trigger, but allowing signal for scalping (direction: %s)", direction)
+        # Don't reject - allow signal to pass
         
         # All 3 core conditions met - signal passes hard gates
         # RSI, volume, wick, ATR are now scoring-based (handled in _calculate_confidence)
-        logger.debug(f"Entry conditions PASSED: direction={direction}, alignment_ok=True, entry_trigger={'found' if entry_trigger_met else 'optional'}")
-        return True
+        logger.debug("Entry conditions PASSED: direction=%s, alignment_ok=True, entry_trigger=%s",
+                     direction, 'found' if entry_trigger_met else 'optional')
+        return triggers
     
-    def _determine_entry_type(self, structure: Dict[str, Any],
-                             m5_candles: List[Dict[str, Any]],
-                             swing_points: Dict[str, List[float]]) -> str:
+    def _compute_entry_triggers(self, direction: str, current_price: float, current_ema: float,
+                                m5_series: Candles,
+                                m1_candles: Candles,
+                                swing_highs: List[float], swing_lows: List[float],
+                                swing_high_max: Optional[float],
+                                swing_low_min: Optional[float]) -> EntryTriggers:
+        """
+        Evaluate every entry trigger for a direction once.
+        
+        Buys look at the swing lows (near level, sweep below), sells at the
+        swing highs; pullback and breakout take the direction into account.
+        
+        Args:
+            direction: 'buy' or 'sell'
+        
+        Returns:
+            EntryTriggers
+        """
+        analyzer = self.structure_analyzer
+        if direction == 'buy':
+            return EntryTriggers(
+                swing_low_min is not None and analyzer.is_price_near_level(
+                    current_price, swing_low_min, candles=m5_series),
+                analyzer.is_pullback_to_ema(current_price, current_ema, m1_candles=m1_candles),
+                analyzer.detect_liquidity_sweep(m5_series, swing_lows, swing_highs=None,
+                                                swing_low_min=swing_low_min),
+                analyzer.detect_breakout_entry(m1_candles, swing_highs, swing_lows, 'buy',
+                                               swing_high_max=swing_high_max)
+            )
+        return EntryTriggers(
+            swing_high_max is not None and analyzer.is_price_near_level(
+                current_price, swing_high_max, candles=m5_series),
+            analyzer.is_pullback_to_ema(current_price, current_ema, m1_candles=m1_candles),
+            analyzer.detect_liquidity_sweep(m5_series, swing_lows=None, swing_highs=swing_highs,
+                                            swing_high_max=swing_high_max),
+            analyzer.detect_breakout_entry(m1_candles, swing_highs, swing_lows, 'sell',
+                                           swing_low_min=swing_low_min)
+        )
+    
+    def _determine_entry_type(self, direction: str,
+                             m5_series: Candles,
+                             swing_lows: List[float],
+                             swing_low_min: Optional[float],
+                             entry_triggers: EntryTriggers,
+                             structure_break: bool) -> str:
         """
         Determine entry type classification.
         
+        Args:
+            direction: Signal direction ('buy' or 'sell')
+            m5_series: M5 candle dictionaries or the same candles as a CandleBatch
+            swing_lows: M5 swing lows
+            swing_low_min: Lowest swing low (None if there are none)
+            entry_triggers: Triggers from _validate_entry_conditions
+            structure_break: Price at or beyond the outermost swing levels
+                (from _classify_price_vs_swings)
+        
         Returns:
             Entry type string
         """
-        current_price = m5_candles[-1]['close']
-        swing_highs = swing_points.get('swing_highs', [])
-        swing_lows = swing_points.get('swing_lows', [])
-        
-        # Check for liquidity sweep first
-        if self.structure_analyzer.detect_liquidity_sweep(m5_candles, swing_lows):
+        # Check for liquidity sweep below the swing lows first (a buy's entry
+        # triggers already checked exactly that)
+        if direction == 'buy':
+            sweep = entry_triggers.sweep
+        else:
+            sweep = self.structure_analyzer.detect_liquidity_sweep(m5_series, swing_lows,
+                                                                   swing_low_min=swing_low_min)
+        if sweep:
             return 'liquidity_sweep'
         
         # Check for structure break
-        if swing_highs and current_price >= max(swing_highs) * 0.999:
-            return 'structure_break'
-        if swing_lows and current_price <= min(swing_lows) * 1.001:
+        if structure_break:
             return 'structure_break'
         
         # Default to pullback continuation
         return 'pullback_continuation'
     
-    def _calculate_confidence(self, structure: Dict[str, Any],
-                            momentum: Dict[str, Any],
-                            m1_candles: List[Dict[str, Any]],
+    def _calculate_confidence(self, momentum: MomentumResult,
+                            direction: str,
+                            m1_candles: Candles,
                             m1_rsi: List[float],
-                            m5_candles: List[Dict[str, Any]],
-                            alignment_result: Dict[str, Any],
+                            at_key_level: bool,
+                            alignment_result: AlignmentResult,
                             indicators: Optional[Dict[str, Any]] = None) -> float:
         """
         Calculate confidence score (0-100) using scoring system.
@@ -460,163 +536,87 @@ class SignalGenerator:
         All filters (RSI, volume, wick, ATR) are now scoring-based, not rejection.
         
         Args:
+            direction: M1 momentum direction ('buy', 'sell' or 'none')
+            m1_candles: M1 candle dictionaries or the same candles as a CandleBatch
+            at_key_level: Price at the nearest support/resistance (from
+                _classify_price_vs_swings)
             alignment_result: Result from _check_trend_alignment
             indicators: Optional indicators dict with ATR values
         
         Returns:
             Confidence score
         """
-        confidence = 60.0  # Base confidence for scalping (increased from 55 to 60 to help reach circuit breaker threshold)
-        confidence_breakdown = {'base': 60.0}
-        
-        # Add alignment score
-        alignment_score = alignment_result.get('alignment_score', 0)
-        confidence += alignment_score
-        confidence_breakdown['alignment'] = alignment_score
-        
-        # VOLUME SCORING (was binary, now scoring)
-        volume_score = 0.0
-        if self.momentum_analyzer.check_volume_spike(m1_candles):
-            volume_score = 10.0  # Strong volume spike
-        elif len(m1_candles) >= 5:
-            # Check for moderate volume increase
-            recent_volumes = [c.get('volume', 0) for c in m1_candles[-5:]]
-            if recent_volumes and sum(recent_volumes) > 0:
-                avg_volume = sum(recent_volumes[:-1]) / (len(recent_volumes) - 1)
-                current_volume = recent_volumes[-1]
-                if avg_volume > 0 and current_volume >= avg_volume * 1.2:
-                    volume_score = 5.0  # Moderate volume increase
-        confidence += volume_score
-        confidence_breakdown['volume'] = volume_score
-        
-        # MOMENTUM STRENGTH SCORING
-        momentum_score = 0.0
-        if momentum['body_ratio'] >= self.strong_body_ratio:
-            momentum_score = 10.0  # Strong momentum
-        elif momentum['body_ratio'] >= self.min_body_ratio:
-            momentum_score = 5.0  # Acceptable momentum
-        confidence += momentum_score
-        confidence_breakdown['momentum_strength'] = momentum_score
-        
-        # WICK RATIO SCORING (was rejection, now scoring)
-        wick_ratio = momentum.get('wick_ratio', 0.5)  # Default to 50% if not available
-        max_wick_ratio = self.signal_config.get('momentum_validation', {}).get('rejection_filter', {}).get('max_wick_ratio', 0.40)
-        wick_score = 0.0
-        if wick_ratio <= 0.20:
-            wick_score = 5.0  # Clean candle (low wick)
-        elif wick_ratio <= max_wick_ratio:
-            wick_score = 0.0  # Acceptable wick
-        else:
-            wick_score = -10.0  # High wick (rejection wick) reduces confidence
-        confidence += wick_score
-        confidence_breakdown['wick_ratio'] = wick_score
-        
-        # PRICE LEVEL SCORING
-        current_price = m5_candles[-1]['close'] if m5_candles else 0
-        swing_highs = structure.get('resistance_level', 0)
-        swing_lows = structure.get('support_level', 0)
-        price_level_score = 0.0
-        if abs(current_price - swing_highs) < 0.01 or abs(current_price - swing_lows) < 0.01:
-            price_level_score = 10.0  # Exactly at key level
-        confidence += price_level_score
-        confidence_breakdown['price_level'] = price_level_score
-        
-        # RSI ZONE-BASED SCORING (already scoring-based)
-        rsi_score = 0.0
-        if m1_rsi:
-            m1_rsi_current = m1_rsi[-1]
-            direction = momentum.get('direction', 'none')
-            
-            if direction == 'buy':
-                if m1_rsi_current < 30:
-                    rsi_score = 10.0  # Extreme oversold
-                elif 30 <= m1_rsi_current < 40:
-                    rsi_score = 5.0  # Strong oversold
-                elif 40 <= m1_rsi_current < 50:
-                    rsi_score = 0.0  # Acceptable range
-                elif 50 <= m1_rsi_current < 60:
-                    rsi_score = -5.0  # Less ideal
-                else:
-                    rsi_score = -10.0  # Not ideal
-            
-            elif direction == 'sell':
-                if m1_rsi_current > 70:
-                    rsi_score = 10.0  # Extreme overbought
-                elif 60 < m1_rsi_current <= 70:
-                    rsi_score = 5.0  # Strong overbought
-                elif 50 < m1_rsi_current <= 60:
-                    rsi_score = 0.0  # Acceptable range
-                elif 40 < m1_rsi_current <= 50:
-                    rsi_score = -5.0  # Less ideal
-                else:
-                    rsi_score = -10.0  # Not ideal
-        confidence += rsi_score
-        confidence_breakdown['rsi'] = rsi_score
-        
-        # ATR SCORING (was rejection, now scoring)
-        atr_score = 0.0
+        # Base confidence for scalping is 60 (increased from 55 to help reach circuit breaker threshold)
+        alignment_score = alignment_result.alignment_score
+        
+        # Strong spike check, then the last (up to) 5 volumes for the moderate
+        # increase check, both from the analyzer's columns for these candles
+        volume_spike = self.momentum_analyzer.check_volume_spike(m1_candles)
+        recent_volumes = self.momentum_analyzer.candle_volumes(m1_candles)[-5:]
+        
         if indicators:
             atr_value = indicators.get('atr', 0)
             atr_average = indicators.get('atr_average', 0)
-            atr_config = self.config.get('atr', {})
-            optimal_min = atr_config.get('optimal_min', 8.0)
-            optimal_max = atr_config.get('optimal_max', 11.0)
-            min_atr = atr_config.get('min_points', 6.0)
-            max_atr = atr_config.get('max_points', 22.0)
-            
-            if optimal_min <= atr_value <= optimal_max:
-                atr_score = 5.0  # Optimal ATR range
-            elif min_atr <= atr_value < optimal_min or optimal_max < atr_value <= max_atr:
-                atr_score = 0.0  # Acceptable but suboptimal
-            # Don't penalize for ATR outside range (was rejection, now just no bonus)
-            
-            # Penalize ATR spikes
-            if atr_average > 0 and atr_value > atr_average * 1.8:
-                atr_score = -15.0  # ATR spike reduces confidence significantly
-        confidence += atr_score
-        confidence_breakdown['atr'] = atr_score
-        
-        # Apply sell signal penalty (requires higher confidence for sell signals)
-        direction = momentum.get('direction', 'none')
-        sell_penalty = 0.0
-        if direction == 'sell' and self.sell_confidence_penalty != 0:
-            sell_penalty = self.sell_confidence_penalty
-            confidence += sell_penalty
-        confidence_breakdown['sell_penalty'] = sell_penalty
-        
-        final_confidence = min(max(confidence, 0.0), 100.0)  # Clamp between 0 and 100
-        
-        # Store breakdown for logging
-        self._last_confidence_breakdown = confidence_breakdown
+        else:
+            atr_value = atr_average = 0.0
+        
+        (volume_score, momentum_score, wick_score, price_level_score, rsi_score, atr_score,
+         sell_penalty, final_confidence) = confidence_kernel(
+            alignment_score,
+            volume_spike,
+            recent_volumes,
+            momentum.body_ratio, self.strong_body_ratio, self.min_body_ratio,
+            momentum.wick_ratio,
+            self.max_wick_ratio,
+            at_key_level,
+            bool(m1_rsi), m1_rsi[-1] if m1_rsi else 0.0,
+            _DIRECTION_CODES.get(direction, DIRECTION_NONE),
+            bool(indicators), atr_value, atr_average,
+            self.atr_optimal_min, self.atr_optimal_max, self.atr_min_points, self.atr_max_points,
+            self.sell_confidence_penalty
+        )
+        
+        # Store breakdown for logging (every field is rewritten)
+        breakdown = self._last_confidence_breakdown
+        breakdown.base = 60.0
+        breakdown.alignment = alignment_score
+        breakdown.volume = volume_score
+        breakdown.momentum_strength = momentum_score
+        breakdown.wick_ratio = wick_score
+        breakdown.price_level = price_level_score
+        breakdown.rsi = rsi_score
+        breakdown.atr = atr_score
+        breakdown.sell_penalty = sell_penalty
         self._last_final_confidence = final_confidence
         
         return final_confidence
     
-    def _generate_reason(self, structure: Dict[str, Any],
-                        momentum: Dict[str, Any],
+    def _generate_reason(self, m5_trend: str,
+                        direction: str,
+                        momentum: MomentumResult,
                         entry_type: str,
                         confidence: float,
-                        alignment_result: Dict[str, Any]) -> str:
+                        alignment_result: AlignmentResult) -> str:
         """
         Generate human-readable reason for signal.
         
         Args:
+            m5_trend: M5 structure trend
+            direction: Signal direction ('buy' or 'sell')
             alignment_result: Result from _check_trend_alignment
         
         Returns:
             Reason string
         """
-        direction = momentum['direction']
-        trend = structure['trend']
-        alignment_type = alignment_result.get('alignment_type', 'unknown')
-        alignment_score = alignment_result.get('alignment_score', 0)
-        is_neutral = alignment_result.get('is_neutral_trend', False)
+        alignment_type = alignment_result.alignment_type
+        alignment_score = alignment_result.alignment_score
+        is_neutral = alignment_result.is_neutral_trend
         
         neutral_note = " [NEUTRAL]" if is_neutral else ""
         
         return (f"{direction.upper()} signal: {entry_type}{neutral_note} | "
-                f"M5 {trend} trend | "
-                f"M1 momentum strength {momentum['strength']:.2f} | "
+                f"M5 {m5_trend} trend | "
+                f"M1 momentum strength {momentum.strength:.2f} | "
                 f"Alignment: {alignment_type} (+{alignment_score}%) | "
                 f"Confidence {confidence:.1f}%")
 
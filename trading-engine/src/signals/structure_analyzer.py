@@ -2,12 +2,23 @@
 M5 market structure identification and analysis.
 """
 from typing import Dict, List, Any, Optional
-from ..market_data.indicators import identify_swing_points, detect_trend
-from ..market_data.candle_processor import CandleProcessor
+import numpy as np
+from ..market_data.indicators import identify_swing_points
+from ..utils.types import CandleBatch, Candles
+from .structure_kernel import liquidity_sweep_kernel, breakout_kernel, m5_structure_kernel
 from ..utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Labels for the structure_kernel trend and structure type codes
+TREND_NAMES = ('bullish', 'neutral', 'bearish')
+STRUCTURE_TYPES = ('none', 'uptrend', 'downtrend', 'pullback')
+
+
+def _never(*args: Any, **kwargs: Any) -> bool:
+    """Stand-in for a pattern check that is disabled in the configuration."""
+    return False
+
 
 class StructureAnalyzer:
     """Analyzes M5 market structure for trading signals."""
@@ -46,15 +57,29 @@ class StructureAnalyzer:
         # Breakout entry
         breakout_config = price_config.get('breakout_entry', {})
         self.breakout_enabled = breakout_config.get('enabled', True)
+        
+        # Default tolerances converted from points to price units once
+        # (XAUUSD: 1 point = 0.01)
+        self._swing_tolerance_price = self.swing_tolerance * 0.01
+        self._ema_tolerance_price = self.ema_tolerance * 0.01
+        self._sweep_threshold_price = self.sweep_threshold * 0.01
+        self._ema_pullback_tolerance_price = self.ema_pullback_tolerance * 0.01
+        
+        # Disabled pattern checks never fire: replace them on this instance so
+        # callers skip the method body (and the candle work) entirely
+        if not self.liquidity_sweep_enabled:
+            self.detect_liquidity_sweep = _never
+        if not self.breakout_enabled:
+            self.detect_breakout_entry = _never
     
-    def analyze_m5_structure(self, candles: List[Dict[str, Any]], 
+    def analyze_m5_structure(self, candles: Candles, 
                             ema21: List[float], 
                             swing_points: Dict[str, List[float]]) -> Dict[str, Any]:
         """
         Identify market structure on M5 timeframe.
         
         Args:
-            candles: M5 candle data
+            candles: M5 candle data, as dictionaries or a CandleBatch
             ema21: EMA21 values
             swing_points: Dictionary with swing_highs and swing_lows
         
@@ -75,11 +100,19 @@ class StructureAnalyzer:
                 'structure_type': 'none'
             }
         
-        current_price = candles[-1]['close']
-        current_ema = ema21[-1] if ema21 else current_price
+        if isinstance(candles, CandleBatch):
+            current_price = float(candles.close[-1])
+        else:
+            current_price = candles[-1]['close']
+        current_ema = ema21[-1]  # ema21 is non-empty (checked above)
         
-        # Determine trend
-        trend = detect_trend(ema21)
+        # Trend (EMA21 slope over the last 3 values) and structure type in one kernel call
+        has_trend_window = len(ema21) >= 3
+        trend_code, structure_code = m5_structure_kernel(
+            has_trend_window, ema21[-3] if has_trend_window else current_ema, current_ema,
+            current_price, self._ema_pullback_tolerance_price
+        )
+        trend = TREND_NAMES[trend_code]
         
         # Get key levels
         swing_highs = swing_points.get('swing_highs', [])
@@ -91,31 +124,18 @@ class StructureAnalyzer:
         support_level = max(swing_lows) if swing_lows else current_price * 0.999
         resistance_level = min(swing_highs) if swing_highs else current_price * 1.001
         
-        # Determine structure type
-        structure_type = 'none'
-        if trend == 'bullish':
-            if current_price > current_ema:
-                structure_type = 'uptrend'
-            elif self.is_pullback_to_ema(current_price, current_ema, self.ema_pullback_tolerance):
-                structure_type = 'pullback'
-        elif trend == 'bearish':
-            if current_price < current_ema:
-                structure_type = 'downtrend'
-            elif self.is_pullback_to_ema(current_price, current_ema, self.ema_pullback_tolerance):
-                structure_type = 'pullback'
-        
         return {
             'trend': trend,
             'support_level': support_level,
             'resistance_level': resistance_level,
-            'structure_type': structure_type,
+            'structure_type': STRUCTURE_TYPES[structure_code],
             'current_price': current_price,
             'ema21': current_ema
         }
     
     def is_price_near_level(self, price: float, level: float, 
                            tolerance: Optional[float] = None,
-                           candles: Optional[List[Dict[str, Any]]] = None) -> bool:
+                           candles: Optional[Candles] = None) -> bool:
         """
         Check if price is near a key level (swing high/low) with validation.
         
@@ -123,17 +143,18 @@ class StructureAnalyzer:
             price: Current price
             level: Key level to check
             tolerance: Tolerance in points (default: from config)
-            candles: M5 candles for bounce validation (optional)
+            candles: M5 candles for bounce validation (optional), as dictionaries
+                or a CandleBatch (counted on its arrays without conversion)
         
         Returns:
             True if price is within tolerance of level and level has minimum bounces
         """
-        if tolerance is None:
-            tolerance = self.swing_tolerance
-        
         # Convert tolerance from points to price units
         # For XAUUSD, 1 point = 0.01, so tolerance points = tolerance * 0.01
-        price_tolerance = tolerance * 0.01
+        if tolerance is None:
+            price_tolerance = self._swing_tolerance_price
+        else:
+            price_tolerance = tolerance * 0.01
         
         # Check if price is within tolerance
         if abs(price - level) > price_tolerance:
@@ -141,14 +162,15 @@ class StructureAnalyzer:
         
         # If candles provided, validate minimum bounces
         if candles and len(candles) >= self.swing_lookback:
-            # Check last N candles for bounces at this level
-            lookback_candles = candles[-self.swing_lookback:]
-            bounce_count = 0
-            
-            for candle in lookback_candles:
-                # Check if candle touched the level (high >= level >= low)
-                if candle['low'] <= level <= candle['high']:
-                    bounce_count += 1
+            # Check last N candles for bounces at this level: the candle
+            # touched it if high >= level >= low
+            n = self.swing_lookback
+            if isinstance(candles, CandleBatch):
+                bounce_count = int(np.count_nonzero(
+                    (candles.low[-n:] <= level) & (candles.high[-n:] >= level)))
+            else:
+                bounce_count = sum(1 for candle in candles[-n:]
+                                   if candle['low'] <= level <= candle['high'])
             
             # Level must have been tested at least minimum_bounces times
             if bounce_count < self.swing_min_bounces:
@@ -158,7 +180,7 @@ class StructureAnalyzer:
     
     def is_pullback_to_ema(self, price: float, ema: float, 
                           tolerance: Optional[float] = None,
-                          m1_candles: Optional[List[Dict[str, Any]]] = None) -> bool:
+                          m1_candles: Optional[Candles] = None) -> bool:
         """
         Detect pullback to EMA21 with touch validation.
         
@@ -166,15 +188,16 @@ class StructureAnalyzer:
             price: Current price
             ema: EMA21 value
             tolerance: Tolerance in points (default: from config)
-            m1_candles: M1 candles to check for EMA touch (optional)
+            m1_candles: M1 candles to check for EMA touch (optional), as
+                dictionaries or a CandleBatch
         
         Returns:
             True if price is within tolerance of EMA and (if required) touched EMA recently
         """
         if tolerance is None:
-            tolerance = self.ema_tolerance
-        
-        price_tolerance = tolerance * 0.01
+            price_tolerance = self._ema_tolerance_price
+        else:
+            price_tolerance = tolerance * 0.01
         
         # Check if price is within tolerance
         if abs(price - ema) > price_tolerance:
@@ -182,30 +205,32 @@ class StructureAnalyzer:
         
         # If must_have_touched is enabled, check last 3 M1 candles
         if self.ema_must_have_touched and m1_candles and len(m1_candles) >= 3:
-            recent_m1 = m1_candles[-3:]
-            touched_ema = False
-            
-            for candle in recent_m1:
-                # Check if candle touched EMA (low <= ema <= high)
-                if candle['low'] <= ema <= candle['high']:
-                    touched_ema = True
-                    break
+            # Check if a candle touched EMA (low <= ema <= high); on arrays
+            # all three candles are compared at once
+            if isinstance(m1_candles, CandleBatch):
+                touched_ema = bool(np.any((m1_candles.low[-3:] <= ema) & (m1_candles.high[-3:] >= ema)))
+            else:
+                touched_ema = any(candle['low'] <= ema <= candle['high'] for candle in m1_candles[-3:])
             
             if not touched_ema:
                 return False
         
         return True
     
-    def detect_liquidity_sweep(self, candles: List[Dict[str, Any]], 
+    def detect_liquidity_sweep(self, candles: Candles, 
                               swing_lows: List[float],
-                              swing_highs: Optional[List[float]] = None) -> bool:
+                              swing_highs: Optional[List[float]] = None,
+                              swing_low_min: Optional[float] = None,
+                              swing_high_max: Optional[float] = None) -> bool:
         """
         Detect liquidity sweep pattern (wick extends beyond swing level then recovery).
         
         Args:
-            candles: Recent M5 candles
+            candles: Recent M5 candles, as dictionaries or a CandleBatch
             swing_lows: List of swing low levels (for bullish sweep)
             swing_highs: List of swing high levels (for bearish sweep, optional)
+            swing_low_min: min(swing_lows) if the caller already has it
+            swing_high_max: max(swing_highs) if the caller already has it
         
         Returns:
             True if liquidity sweep detected
@@ -216,37 +241,37 @@ class StructureAnalyzer:
         if len(candles) < 3:
             return False
         
-        # Convert sweep threshold to price units
-        sweep_threshold_price = self.sweep_threshold * 0.01
+        if not swing_lows and not swing_highs:
+            return False
         
-        # Check for bullish sweep (wick below swing low)
-        if swing_lows:
-            min_swing_low = min(swing_lows)
+        # Last 3 candles' lows, highs and closes
+        if isinstance(candles, CandleBatch):
+            low, high, close = candles.low[-3:], candles.high[-3:], candles.close[-3:]
+        else:
             recent_candles = candles[-3:]
-            
-            for candle in recent_candles:
-                # Wick extends sweep_threshold points below swing low
-                sweep_level = min_swing_low - sweep_threshold_price
-                if candle['low'] < sweep_level and candle['close'] > min_swing_low:
-                    return True
-        
-        # Check for bearish sweep (wick above swing high)
-        if swing_highs:
-            max_swing_high = max(swing_highs)
-            recent_candles = candles[-3:]
-            
-            for candle in recent_candles:
-                # Wick extends sweep_threshold points above swing high
-                sweep_level = max_swing_high + sweep_threshold_price
-                if candle['high'] > sweep_level and candle['close'] < max_swing_high:
-                    return True
-        
-        return False
+            low, high, close = np.array([[c['low'] for c in recent_candles],
+                                         [c['high'] for c in recent_candles],
+                                         [c['close'] for c in recent_candles]], dtype=np.float64)
+        
+        # Bullish sweep below the lowest swing low, bearish above the highest
+        # swing high; the wick must extend sweep_threshold points beyond it
+        if swing_lows and swing_low_min is None:
+            swing_low_min = min(swing_lows)
+        if swing_highs and swing_high_max is None:
+            swing_high_max = max(swing_highs)
+        return liquidity_sweep_kernel(
+            low, high, close,
+            bool(swing_lows), swing_low_min if swing_lows else 0.0,
+            bool(swing_highs), swing_high_max if swing_highs else 0.0,
+            self._sweep_threshold_price
+        )
     
-    def detect_breakout_entry(self, m1_candles: List[Dict[str, Any]],
+    def detect_breakout_entry(self, m1_candles: Candles,
                              m5_swing_highs: List[float],
                              m5_swing_lows: List[float],
-                             direction: str) -> bool:
+                             direction: str,
+                             swing_high_max: Optional[float] = None,
+                             swing_low_min: Optional[float] = None) -> bool:
         """
         Detect clean breakout entry (momentum continuation).
         
@@ -256,10 +281,13 @@ class StructureAnalyzer:
         - Current price confirms the breakout direction
         
         Args:
-            m1_candles: Recent M1 candles (need at least 2)
+            m1_candles: Recent M1 candles (need at least 2), as dictionaries or
+                a CandleBatch
             m5_swing_highs: M5 swing high levels
             m5_swing_lows: M5 swing low levels
             direction: 'buy' or 'sell'
+            swing_high_max: max(m5_swing_highs) if the caller already has it
+            swing_low_min: min(m5_swing_lows) if the caller already has it
         
         Returns:
             True if clean breakout detected
@@ -272,56 +300,28 @@ class StructureAnalyzer:
         
         if direction == 'buy' and m5_swing_highs:
             # Bullish breakout: M1 breaks above M5 swing high
-            breakout_level = max(m5_swing_highs)
-            prev_candle = m1_candles[-2]
-            current_candle = m1_candles[-1]
-            current_price = current_candle['close']
-            
-            # Check if breakout occurred (price broke through level)
-            # Previous candle may have tested the level, current candle confirms breakout
-            prev_tested_level = prev_candle['high'] >= breakout_level
-            current_above_level = current_price > breakout_level
-            
-            # Enhanced: Check for momentum (strong body, not just wick)
-            body_ratio = CandleProcessor.calculate_body_ratio(current_candle)
-            is_bullish = CandleProcessor.is_bullish(current_candle)
-            
-            # Breakout confirmed if:
-            # 1. Current price is above breakout level (sustained)
-            # 2. Previous candle tested the level (resistance was there)
-            # 3. Current candle is bullish with decent body (momentum, not just wick)
-            if current_above_level and prev_tested_level and is_bullish and body_ratio >= 0.4:
-                return True
-            
-            # Alternative: Previous candle closed above, current opens above (original logic)
-            if prev_candle['close'] > breakout_level and current_candle['open'] > breakout_level:
-                return True
-        
+            breakout_level = swing_high_max if swing_high_max is not None else max(m5_swing_highs)
         elif direction == 'sell' and m5_swing_lows:
             # Bearish breakout: M1 breaks below M5 swing low
-            breakout_level = min(m5_swing_lows)
-            prev_candle = m1_candles[-2]
-            current_candle = m1_candles[-1]
-            current_price = current_candle['close']
-            
-            # Check if breakout occurred (price broke through level)
-            prev_tested_level = prev_candle['low'] <= breakout_level
-            current_below_level = current_price < breakout_level
-            
-            # Enhanced: Check for momentum (strong body, not just wick)
-            body_ratio = CandleProcessor.calculate_body_ratio(current_candle)
-            is_bearish = CandleProcessor.is_bearish(current_candle)
-            
-            # Breakout confirmed if:
-            # 1. Current price is below breakout level (sustained)
-            # 2. Previous candle tested the level (support was there)
-            # 3. Current candle is bearish with decent body (momentum, not just wick)
-            if current_below_level and prev_tested_level and is_bearish and body_ratio >= 0.4:
-                return True
-            
-            # Alternative: Previous candle closed below, current opens below (original logic)
-            if prev_candle['close'] < breakout_level and current_candle['open'] < breakout_level:
-                return True
+            breakout_level = swing_low_min if swing_low_min is not None else min(m5_swing_lows)
+        else:
+            return False
         
-        return False
+        # Breakout confirmed if the current candle closes beyond the level
+        # after the previous candle tested it, in the breakout direction with a
+        # decent body (momentum, not just wick); or if the previous candle
+        # closed and the current one opened beyond it
+        if isinstance(m1_candles, CandleBatch):
+            return breakout_kernel(
+                m1_candles.high[-2], m1_candles.low[-2], m1_candles.close[-2],
+                m1_candles.open[-1], m1_candles.high[-1], m1_candles.low[-1], m1_candles.close[-1],
+                breakout_level, direction == 'buy'
+            )
+        prev_candle = m1_candles[-2]
+        current_candle = m1_candles[-1]
+        return breakout_kernel(
+            prev_candle['high'], prev_candle['low'], prev_candle['close'],
+            current_candle['open'], current_candle['high'], current_candle['low'],
+            current_candle['close'], breakout_level, direction == 'buy'
+        )
 
@@ -0,0 +1,108 @@
+"""
+M5 trend/structure, liquidity sweep and breakout checks for StructureAnalyzer,
+which takes candle columns from a CandleBatch and keeps the configuration checks.
+"""
+from ..utils.jit import njit
+
+# M5 trend codes (also the alignment table indices in SignalGenerator)
+TREND_BULLISH = 0
+TREND_NEUTRAL = 1
+TREND_BEARISH = 2
+
+# M5 structure type codes
+STRUCTURE_NONE = 0
+STRUCTURE_UPTREND = 1
+STRUCTURE_DOWNTREND = 2
+STRUCTURE_PULLBACK = 3
+
+
+@njit('UniTuple(int64, 2)(boolean, float64, float64, float64, float64)', cache=True)
+def m5_structure_kernel(has_trend_window, ema_start, ema_last, current_price, pullback_tolerance):
+    """
+    M5 trend from the EMA21 slope and the structure type it implies, in one pass.
+
+    The trend follows detect_trend over the last 3 EMA values: ema_start is
+    the oldest of them, and has_trend_window is False (neutral trend) when
+    there are fewer than 3. With the trend, price beyond the EMA is an
+    up/downtrend; otherwise price within pullback_tolerance (price units) of
+    the EMA is a pullback.
+
+    Returns:
+        (trend, structure) codes
+    """
+    trend = TREND_NEUTRAL
+    if has_trend_window:
+        slope = ema_last - ema_start
+        threshold = ema_last * 0.0001  # 0.01% of EMA value
+        if slope > threshold:
+            trend = TREND_BULLISH
+        elif slope < -threshold:
+            trend = TREND_BEARISH
+
+    structure = STRUCTURE_NONE
+    near_ema = not abs(current_price - ema_last) > pullback_tolerance
+    if trend == TREND_BULLISH:
+        if current_price > ema_last:
+            structure = STRUCTURE_UPTREND
+        elif near_ema:
+            structure = STRUCTURE_PULLBACK
+    elif trend == TREND_BEARISH:
+        if current_price < ema_last:
+            structure = STRUCTURE_DOWNTREND
+        elif near_ema:
+            structure = STRUCTURE_PULLBACK
+    return trend, structure
+
+
+@njit('boolean(float64[::1], float64[::1], float64[::1], boolean, float64, boolean, float64, float64)',
+      cache=True)
+def liquidity_sweep_kernel(low, high, close, check_lows, min_swing_low, check_highs,
+                           max_swing_high, threshold):
+    """
+    True if a candle's wick swept beyond a swing level and it closed back inside.
+
+    Bullish sweep: low below min_swing_low - threshold, close above
+    min_swing_low. Bearish sweep: high above max_swing_high + threshold, close
+    below max_swing_high. check_lows/check_highs select the sides to test;
+    threshold is in price units.
+    """
+    if check_lows:
+        sweep_level = min_swing_low - threshold
+        for i in range(close.shape[0]):
+            if low[i] < sweep_level and close[i] > min_swing_low:
+                return True
+    if check_highs:
+        sweep_level = max_swing_high + threshold
+        for i in range(close.shape[0]):
+            if high[i] > sweep_level and close[i] < max_swing_high:
+                return True
+    return False
+
+
+@njit('boolean(float64, float64, float64, float64, float64, float64, float64, float64, boolean)',
+      cache=True)
+def breakout_kernel(prev_high, prev_low, prev_close, current_open, current_high, current_low,
+                    current_close, breakout_level, bullish):
+    """
+    True if the last two M1 candles broke through breakout_level with momentum.
+
+    A bullish breakout (bullish=True) needs the current candle closing above
+    the level after the previous high tested it, bullish with a body of at
+    least 40% of its range; or the previous close and current open both above
+    the level. A bearish breakout mirrors this below the level.
+    """
+    range_size = current_high - current_low
+    body_ratio = abs(current_close - current_open) / range_size if range_size != 0 else 0.0
+    if bullish:
+        if (current_close > breakout_level and prev_high >= breakout_level
+                and current_close > current_open and body_ratio >= 0.4):
+            return True
+        if prev_close > breakout_level and current_open > breakout_level:
+            return True
+    else:
+        if (current_close < breakout_level and prev_low <= breakout_level
+                and current_close < current_open and body_ratio >= 0.4):
+            return True
+        if prev_close < breakout_level and current_open < breakout_level:
+            return True
+    return False
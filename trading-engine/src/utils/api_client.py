@@ -2,8 +2,11 @@
 API client for fetching credentials from the server.
 """
 import os
+import time
 import requests
-from typing import Dict, Optional, Any
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Dict, Optional, Any, Tuple
 # Try to import logger, but handle if not available
 try:
     from ..utils.logger import setup_logger
@@ -12,23 +15,60 @@ except ImportError:
     import logging
     logger = logging.getLogger(__name__)
 
+# orjson is optional: faster decoding of JSON response bodies
+try:
+    import orjson
+
+    def _parse_json(content: bytes) -> Any:
+        """Decode a JSON response body."""
+        return orjson.loads(content)
+except ImportError:
+    import json
+
+    def _parse_json(content: bytes) -> Any:
+        """Decode a JSON response body."""
+        return json.loads(content)
+
 
 class APIClient:
     """Client for fetching MT5 credentials from the server API."""
     
-    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None,
+                 cache_ttl: float = 300.0):
         """
         Initialize API client.
         
         Args:
             api_url: Base URL of the API (defaults to TRADING_ENGINE_API_URL env var)
             api_key: API key for authentication (defaults to TRADING_ENGINE_API_KEY env var)
+            cache_ttl: Seconds fetched credentials are reused (0 disables caching)
         """
         self.api_url = api_url or os.getenv('TRADING_ENGINE_API_URL', 'http://localhost:3000')
         self.api_key = api_key or os.getenv('TRADING_ENGINE_API_KEY', 'trading-engine-key')
         
         # Remove trailing slash
         self.api_url = self.api_url.rstrip('/')
+        
+        # One pooled session so repeated requests reuse the keep-alive connection.
+        # Gateway errors are retried briefly; the last response is returned as is.
+        self._session = requests.Session()
+        self._session.headers.update({
+            'X-API-Key': self.api_key,
+            'Content-Type': 'application/json'
+        })
+        retry = Retry(total=2, backoff_factor=0.1, status_forcelist=[502, 503, 504],
+                      raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=retry)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        
+        # (user_id, mt5_account_id or 'active') -> (expiry on time.monotonic(), credentials)
+        self.cache_ttl = cache_ttl
+        self._credentials_cache: Dict[Tuple[str, str], Tuple[float, Dict[str, Any]]] = {}
+    
+    def close(self) -> None:
+        """Close the pooled connections."""
+        self._session.close()
     
     def get_mt5_credentials(self, user_id: str, mt5_account_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
@@ -41,6 +81,12 @@ class APIClient:
         Returns:
             Dictionary with credentials or None if error
         """
+        # Credentials rarely change within a session: reuse a recent successful fetch
+        cache_key = (user_id, mt5_account_id or 'active')
+        cached = self._credentials_cache.get(cache_key)
+        if cached is not None and time.monotonic() < cached[0]:
+            return dict(cached[1])
+        
         try:
             if mt5_account_id:
                 # Fetch specific account credentials
@@ -49,29 +95,29 @@ class APIClient:
                 # Fetch active account credentials
                 url = f"{self.api_url}/api/v1/internal/mt5/accounts/{user_id}/active/credentials"
             
-            headers = {
-                'X-API-Key': self.api_key,
-                'Content-Type': 'application/json'
-            }
-            
-            logger.debug(f"Fetching MT5 credentials from {url}")
-            response = requests.get(url, headers=headers, timeout=10)
+            logger.debug("Fetching MT5 credentials from %s", url)
+            response = self._session.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
-                logger.info(f"Successfully fetched MT5 credentials for user {user_id}, account {data.get('mt5_account_id')}")
+                data = _parse_json(response.content)
+                if self.cache_ttl > 0:
+                    self._credentials_cache[cache_key] = (time.monotonic() + self.cache_ttl, dict(data))
+                logger.info("Successfully fetched MT5 credentials for user %s, account %s",
+                            user_id, data.get('mt5_account_id'))
                 return data
             elif response.status_code == 404:
-                logger.warning(f"MT5 account not found: user_id={user_id}, mt5_account_id={mt5_account_id}")
+                logger.warning("MT5 account not found: user_id=%s, mt5_account_id=%s",
+                               user_id, mt5_account_id)
                 return None
             else:
-                logger.error(f"Failed to fetch MT5 credentials: {response.status_code} - {response.text}")
+                logger.error("Failed to fetch MT5 credentials: %s - %s",
+                             response.status_code, response.text)
                 return None
-                
+        
         except requests.exceptions.RequestException as e:
-            logger.error(f"Error fetching MT5 credentials from API: {e}")
+            logger.error("Error fetching MT5 credentials from API: %s", e)
             return None
         except Exception as e:
-            logger.error(f"Unexpected error fetching MT5 credentials: {e}", exc_info=True)
+            logger.error("Unexpected error fetching MT5 credentials: %s", e, exc_info=True)
             return None
 
@@ -0,0 +1,32 @@
+"""
+Optional Numba JIT support.
+
+Numerical kernels are decorated with ``njit`` from this module. When numba is
+installed they are compiled to machine code; otherwise the decorator is a no-op
+and the same functions run as plain Python over NumPy arrays. ``prange`` marks
+loops numba may parallelize and is plain ``range`` without it.
+
+Kernels live in ``*_kernel(s).py`` modules beside their callers and stay free
+of configuration parsing and logging. They carry explicit signatures so numba
+compiles them at import (``cache=True`` keeps the machine code on disk) rather
+than on the first live cycle. fastmath is off unless a module says otherwise,
+so comparisons (and NaN) behave exactly as in the Python code they replaced.
+"""
+from typing import Any, Callable
+
+try:
+    from numba import njit, prange  # type: ignore
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range  # Parallel loops run serially without numba
+
+    def njit(*args: Any, **kwargs: Any) -> Callable:
+        """No-op stand-in for numba.njit (supports bare and parameterized use)."""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func: Callable) -> Callable:
+            return func
+
+        return decorator
@@ -1,16 +1,107 @@
 """
 Structured logging with rotation for the trading engine.
 """
+import atexit
 import logging
 import os
+import queue
 import sys
+import threading
 import time
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
+from logging.handlers import (
+    RotatingFileHandler, TimedRotatingFileHandler, QueueHandler, QueueListener
+)
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Optional
 import gzip
 import shutil
 
+# zstandard is optional: faster, multi-threaded compression of old logs
+# (rotate_logs falls back to gzip without it)
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Block size for streaming old logs through the compressor
+_COMPRESS_BLOCK_SIZE = 1 << 20
+_COMPRESSED_SUFFIXES = ('.gz', '.zst')
+
+
+# No format here uses thread, process or task names: skip collecting them for
+# every record. Log calls pass %-style arguments (logger.debug("x=%s", x)), not
+# f-strings, so nothing is formatted for records below the logger's level.
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+logging.logAsyncioTasks = False  # Python 3.12+; ignored before
+
+# All configured loggers share one queue and one background listener thread.
+# Handler I/O (console writes, file writes, rotation) runs on that thread so the
+# trading loop only pays for a queue.put per record.
+_log_queue: queue.Queue = queue.Queue(-1)
+_listener: Optional[QueueListener] = None
+_listener_lock = threading.Lock()
+
+# Per-logger file handlers, looked up by record.name on the listener thread
+_file_handlers: Dict[str, logging.Handler] = {}
+
+
+class _FileDispatchHandler(logging.Handler):
+    """Send each record to the file handler of the logger that emitted it."""
+    
+    def handle(self, record):
+        # Records propagated from an unconfigured child go to the nearest
+        # configured ancestor's file, as they would without the queue
+        name = record.name
+        while True:
+            handler = _file_handlers.get(name)
+            if handler is not None:
+                if record.levelno >= handler.level:
+                    handler.handle(record)
+                return True
+            if '.' not in name:
+                return False
+            name = name.rsplit('.', 1)[0]
+
+
+def _start_log_listener() -> None:
+    """Start the shared listener (console + per-logger files) if not running."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            return
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        ))
+        _listener = QueueListener(_log_queue, console_handler, _FileDispatchHandler(),
+                                  respect_handler_level=True)
+        _listener.start()
+
+
+def stop_log_listeners() -> None:
+    """Flush queued records, stop the background listener and close log files."""
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            try:
+                _listener.stop()
+            except Exception:
+                pass
+            _listener = None
+    for handler in list(_file_handlers.values()):
+        try:
+            handler.close()
+        except Exception:
+            pass
+    _file_handlers.clear()
+
+
+atexit.register(stop_log_listeners)
+
 
 class WindowsSafeTimedRotatingFileHandler(TimedRotatingFileHandler):
     """
@@ -155,16 +246,6 @@ def setup_logger(name: str, log_dir: str = "logs", level: int = logging.INFO) ->
     # Remove existing handlers to avoid duplicates
     logger.handlers.clear()
     
-    # Console handler with formatted output
-    console_handler = logging.StreamHandler()
-    console_handler.setLevel(level)
-    console_format = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
-    console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
-    
     # File handler with daily rotation (Windows-safe)
     log_file = log_path / f"{name}.log"
     
@@ -192,7 +273,17 @@ def setup_logger(name: str, log_dir: str = "logs", level: int = logging.INFO) ->
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
+    
+    previous_handler = _file_handlers.get(name)
+    _file_handlers[name] = file_handler
+    if previous_handler is not None:
+        previous_handler.close()
+    
+    # Route records through the shared queue; the console and this logger's
+    # file are written by the background listener so slow disks never stall
+    # the caller. The logger's own level does the filtering.
+    logger.addHandler(QueueHandler(_log_queue))
+    _start_log_listener()
     
     return logger
 
@@ -212,20 +303,39 @@ def rotate_logs(log_dir: str = "logs") -> None:
     
     for log_file in log_path.glob("*.log*"):
         # Skip already compressed files
-        if log_file.suffix == '.gz':
+        if log_file.suffix in _COMPRESSED_SUFFIXES:
             continue
         
         # Check if file is older than 7 days
         if log_file.stat().st_mtime < cutoff_date:
-            # Compress the file
-            with open(log_file, 'rb') as f_in:
-                compressed_path = log_path / f"{log_file.name}.gz"
-                with gzip.open(compressed_path, 'wb') as f_out:
-                    shutil.copyfileobj(f_in, f_out)
+            _compress_log(log_file)
             
             # Remove original file
             log_file.unlink()
-            logging.getLogger(__name__).info(f"Compressed and removed old log file: {log_file.name}")
+            logging.getLogger(__name__).info("Compressed and removed old log file: %s", log_file.name)
+
+
+def _compress_log(log_file: Path) -> Path:
+    """
+    Compress a log file next to itself: .zst with zstandard, else .gz.
+    
+    Args:
+        log_file: Log file to compress (left in place)
+    
+    Returns:
+        Path of the compressed file
+    """
+    if zstandard is not None:
+        compressed_path = log_file.with_name(f"{log_file.name}.zst")
+        compressor = zstandard.ZstdCompressor(level=10, threads=-1)  # All cores
+        with open(log_file, 'rb') as f_in, open(compressed_path, 'wb') as f_out:
+            compressor.copy_stream(f_in, f_out, read_size=_COMPRESS_BLOCK_SIZE,
+                                   write_size=_COMPRESS_BLOCK_SIZE)
+    else:
+        compressed_path = log_file.with_name(f"{log_file.name}.gz")
+        with open(log_file, 'rb') as f_in, gzip.open(compressed_path, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, _COMPRESS_BLOCK_SIZE)
+    return compressed_path
 
 
 
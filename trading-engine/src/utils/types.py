@@ -2,8 +2,10 @@
 Type definitions for the trading engine.
 """
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Optional, List, Dict, Any
+from functools import cached_property
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Any, Iterator, NamedTuple, Union
+import numpy as np
 
 
 @dataclass
@@ -15,7 +17,7 @@ class Signal:
     timestamp: datetime
     reason: str  # Human-readable explanation
     price: float  # Entry price level
-    alignment_result: Optional[Dict[str, Any]] = None  # Trend alignment metadata
+    alignment_result: Optional['AlignmentResult'] = None  # Trend alignment metadata
 
 
 @dataclass
@@ -35,7 +37,7 @@ class Trade:
     hold_time_seconds: Optional[float] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     """Open position from MT5."""
     ticket: int
@@ -61,6 +63,8 @@ class MarketData:
     ask: float
     spread: float  # Spread in points
     indicators: Dict[str, Any]  # EMA, RSI, ATR values
+    m1_batch: Optional['CandleBatch'] = None  # Same M1 candles as arrays
+    m5_batch: Optional['CandleBatch'] = None  # Same M5 candles as arrays
 
 
 @dataclass
@@ -74,6 +78,290 @@ class Candle:
     volume: int = 0
 
 
+@dataclass
+class CandleBatch:
+    """
+    OHLC candles as parallel NumPy arrays (struct-of-arrays), oldest first.
+    
+    Built directly from the structured array MT5 returns, so indicator code can
+    work on contiguous float64 columns instead of per-candle dictionaries.
+    """
+    time: np.ndarray  # int64 epoch seconds
+    open: np.ndarray  # float64
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64 tick volume
+    
+    def __len__(self) -> int:
+        return len(self.close)
+    
+    @cached_property
+    def body_size(self) -> np.ndarray:
+        """Absolute body size per candle."""
+        return np.abs(self.close - self.open)
+    
+    @cached_property
+    def candle_range(self) -> np.ndarray:
+        """High - low per candle."""
+        return self.high - self.low
+    
+    @cached_property
+    def upper_wick(self) -> np.ndarray:
+        """High - max(open, close) per candle."""
+        return self.high - np.maximum(self.open, self.close)
+    
+    @cached_property
+    def lower_wick(self) -> np.ndarray:
+        """Min(open, close) - low per candle."""
+        return np.minimum(self.open, self.close) - self.low
+    
+    @cached_property
+    def body_ratio(self) -> np.ndarray:
+        """Body size as ratio of range (0 for zero-range candles)."""
+        range_ = self.candle_range
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(range_ > 0, self.body_size / range_, 0.0)
+    
+    @cached_property
+    def wick_ratio(self) -> np.ndarray:
+        """Larger wick as ratio of range (0 for zero-range candles)."""
+        range_ = self.candle_range
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(range_ > 0, np.maximum(self.upper_wick, self.lower_wick) / range_, 0.0)
+    
+    @cached_property
+    def columns(self) -> np.ndarray:
+        """(5, n) float64 open/high/low/close/volume rows, each contiguous."""
+        return np.vstack((self.open, self.high, self.low, self.close,
+                          self.volume.astype(np.float64)))
+    
+    def candle(self, index: int) -> Dict[str, float]:
+        """
+        One candle's OHLC and volume as a dictionary (no time).
+        
+        Args:
+            index: Candle position (negative counts from the newest)
+        
+        Returns:
+            Dictionary with open/high/low/close/volume keys
+        """
+        return {
+            'open': float(self.open[index]),
+            'high': float(self.high[index]),
+            'low': float(self.low[index]),
+            'close': float(self.close[index]),
+            'volume': int(self.volume[index])
+        }
+    
+    @classmethod
+    def from_rates(cls, rates: np.ndarray) -> 'CandleBatch':
+        """
+        Build a batch from an MT5 rates array (copy_rates_* result).
+        
+        Args:
+            rates: Structured array with time/open/high/low/close/tick_volume fields
+        
+        Returns:
+            CandleBatch
+        """
+        return cls(
+            time=rates['time'].astype(np.int64),
+            open=rates['open'].astype(np.float64),
+            high=rates['high'].astype(np.float64),
+            low=rates['low'].astype(np.float64),
+            close=rates['close'].astype(np.float64),
+            volume=rates['tick_volume'].astype(np.int64)
+        )
+    
+    @classmethod
+    def from_candles(cls, candles: List[Dict[str, Any]]) -> 'CandleBatch':
+        """
+        Build a batch from candle dictionaries.
+        
+        Args:
+            candles: List of candle dictionaries (time as datetime)
+        
+        Returns:
+            CandleBatch
+        """
+        count = len(candles)
+        return cls(
+            time=np.fromiter((int(c['time'].timestamp()) for c in candles), dtype=np.int64, count=count),
+            open=np.fromiter((c['open'] for c in candles), dtype=np.float64, count=count),
+            high=np.fromiter((c['high'] for c in candles), dtype=np.float64, count=count),
+            low=np.fromiter((c['low'] for c in candles), dtype=np.float64, count=count),
+            close=np.fromiter((c['close'] for c in candles), dtype=np.float64, count=count),
+            volume=np.fromiter((c.get('volume', 0) for c in candles), dtype=np.int64, count=count)
+        )
+    
+    def datetimes(self) -> List[datetime]:
+        """
+        Candle times as naive local datetimes (as datetime.fromtimestamp gives).
+        
+        Converted in one vectorized datetime64 cast; falls back to per-candle
+        conversion only when the batch spans a UTC-offset change (DST).
+        
+        Returns:
+            List of datetimes, oldest first
+        """
+        if len(self.time) == 0:
+            return []
+        first = int(self.time[0])
+        last = int(self.time[-1])
+        offset = _local_utc_offset(first)
+        if _local_utc_offset(last) != offset:
+            return [datetime.fromtimestamp(t) for t in self.time.tolist()]
+        return (self.time + offset).astype('datetime64[s]').tolist()
+    
+    def iter_candles(self) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield candles in the dictionary format used by signal/strategy code.
+        
+        Yields:
+            Candle dictionaries with keys: time, open, high, low, close, volume
+        """
+        keys = ('time', 'open', 'high', 'low', 'close', 'volume')
+        columns = (
+            self.datetimes(), self.open.tolist(), self.high.tolist(),
+            self.low.tolist(), self.close.tolist(), self.volume.tolist()
+        )
+        for row in zip(*columns):
+            yield dict(zip(keys, row))
+    
+    def to_candles(self) -> List[Dict[str, Any]]:
+        """
+        Convert to the candle dictionary format used by signal/strategy code.
+        
+        Returns:
+            List of candle dictionaries with keys: time, open, high, low, close, volume
+        """
+        return list(self.iter_candles())
+
+
+# Candle dictionaries or the same candles as a CandleBatch
+Candles = Union[List[Dict[str, Any]], CandleBatch]
+
+
+@dataclass
+class TradeHistory:
+    """
+    Closed trades as parallel NumPy arrays (struct-of-arrays), newest first.
+    
+    Holds only the columns the circuit breaker reads, so its window and reset
+    checks scan contiguous arrays instead of hashing into trade dictionaries.
+    """
+    pnl: np.ndarray  # float64
+    stopped_out: np.ndarray  # bool, exit_reason == 'stop_loss'
+    risk_amount_r: np.ndarray  # float64, initial risk (1R) in account currency, 0 if unknown
+    
+    def __len__(self) -> int:
+        return len(self.pnl)
+    
+    @classmethod
+    def from_trades(cls, trades: List[Dict[str, Any]]) -> 'TradeHistory':
+        """
+        Build the arrays from trade dictionaries (database rows).
+        
+        1R is the stop distance in points (0.01 price units for XAUUSD, $1 per
+        point per lot) times the lot size. It is 0 when entry, stop or lot size
+        is missing, or when the stop is on the wrong side of the entry.
+        
+        Args:
+            trades: Trade dictionaries, newest first; missing/NULL numbers count as 0
+        
+        Returns:
+            TradeHistory
+        """
+        count = len(trades)
+        entry = np.fromiter((t.get('entry_price') or 0 for t in trades), dtype=np.float64, count=count)
+        stop = np.fromiter((t.get('stop_loss') or 0 for t in trades), dtype=np.float64, count=count)
+        lots = np.fromiter((t.get('lot_size') or 0 for t in trades), dtype=np.float64, count=count)
+        # Stop distance is entry - stop for buys, stop - entry for anything else
+        sign = np.fromiter((1.0 if t.get('direction', 'buy') == 'buy' else -1.0 for t in trades),
+                           dtype=np.float64, count=count)
+        risk_r = sign * (entry - stop) / 0.01 * lots
+        known = (entry > 0) & (stop > 0) & (lots > 0) & (risk_r > 0)
+        return cls(
+            pnl=np.fromiter((t.get('pnl') or 0 for t in trades), dtype=np.float64, count=count),
+            stopped_out=np.fromiter((t.get('exit_reason') == 'stop_loss' for t in trades), dtype=bool, count=count),
+            risk_amount_r=np.where(known, risk_r, 0.0)
+        )
+
+
+def _local_utc_offset(timestamp: int) -> int:
+    """Local UTC offset in seconds at a given unix timestamp."""
+    local = datetime.fromtimestamp(timestamp)
+    utc = datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+    return int((local - utc).total_seconds())
+
+
+class MomentumResult(NamedTuple):
+    """M1 momentum analysis result (a plain tuple: cheap to build on every cycle)."""
+    direction: str  # 'buy', 'sell' or 'none'
+    strength: float  # Total body / total range of the confirming candles
+    body_ratio: float  # Average body ratio of the confirming candles
+    wick_ratio: float  # Larger wick / range of the current candle
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form ('direction', 'strength', 'body_ratio', 'wick_ratio')."""
+        return self._asdict()
+
+
+class AlignmentResult(NamedTuple):
+    """M5 trend / M1 momentum alignment check result."""
+    reject: bool
+    reason: str
+    alignment_score: float  # Confidence points added for this alignment
+    is_neutral_trend: bool  # M5 trend is neutral
+    alignment_type: Optional[str]  # e.g. 'both_bullish', 'conflicting' (None for an unknown trend)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form ('reject', 'reason', 'alignment_score', 'is_neutral_trend', 'alignment_type')."""
+        return self._asdict()
+
+
+class EntryTriggers(NamedTuple):
+    """Optional entry triggers checked for a signal direction (any() if one was found)."""
+    near_level: bool  # Price near the outermost swing level on the signal's side
+    pullback: bool  # Pullback to the M5 EMA21
+    sweep: bool  # Liquidity sweep beyond the swing levels on the signal's side
+    breakout: bool  # M1 breakout through an M5 swing level
+
+
+@dataclass(slots=True)
+class ConfidenceBreakdown:
+    """Confidence score components in percent (one instance, rewritten per calculation)."""
+    base: float = 0.0
+    alignment: float = 0.0
+    volume: float = 0.0
+    momentum_strength: float = 0.0
+    wick_ratio: float = 0.0
+    price_level: float = 0.0
+    rsi: float = 0.0
+    atr: float = 0.0
+    sell_penalty: float = 0.0
+
+
+@dataclass(frozen=True, slots=True)
+class SessionResult:
+    """Trading window state at a point in time (shared, immutable instances)."""
+    active: bool
+    session_type: str  # 'prime', 'acceptable' or 'closed'
+    risk_multiplier: float
+    reason: str
+    session_id: int  # SESSION_PRIME / SESSION_ACCEPTABLE / SESSION_CLOSED (session_manager)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Dictionary form ('active', 'session_type', 'risk_multiplier', 'reason')."""
+        return {
+            'active': self.active,
+            'session_type': self.session_type,
+            'risk_multiplier': self.risk_multiplier,
+            'reason': self.reason
+        }
+
+
 @dataclass
 class AccountInfo:
     """MT5 account information."""